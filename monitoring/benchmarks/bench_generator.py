@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Dashboard Generation Benchmark
+Times ComponentLibrary construction, component creation, panel rendering and whole-dashboard
+generation for synthetic templates of increasing size, offline, against a stored baseline
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import List
+
+from harness import (
+    BENCHMARKS_DIR, Results, compare, install_offline_config, load_baseline, measure,
+    peak_memory, print_results, save_baseline
+)
+
+import dashboard_generator
+from dashboard_generator import ComponentLibrary, DashboardTemplate, GridPosition
+from json_serializer import dumps
+from component_catalog import catalog_paths, compile_catalog, load_catalog
+
+BASELINE_PATH = BENCHMARKS_DIR / "baseline-generator.json"
+DEFAULT_SIZES = [10, 100, 1000]
+COMPONENTS_PER_SECTION = 10
+SIZES = [{"width": 6, "height": 4}, {"width": 8, "height": 6}, {"width": 12, "height": 8}, {"width": 24, "height": 4}]
+
+def synthetic_template(component_count: int, library: ComponentLibrary) -> DashboardTemplate:
+    """A template with component_count panels, cycling through every built-in component"""
+    names = library.names()
+    template = DashboardTemplate(f"bench-{component_count}", f"Benchmark {component_count}",
+                                 component_library=library)
+
+    for start in range(0, component_count, COMPONENTS_PER_SECTION):
+        template.add_section(f"Section {start // COMPONENTS_PER_SECTION + 1}", [
+            {"name": names[index % len(names)], "size": SIZES[index % len(SIZES)]}
+            for index in range(start, min(start + COMPONENTS_PER_SECTION, component_count))
+        ])
+
+    return template
+
+def run(sizes: List[int], repeat: int) -> Results:
+    """Measure every phase of dashboard generation"""
+    results: Results = {}
+    library = ComponentLibrary()
+    names = library.names()
+
+    results["library_init"] = measure(ComponentLibrary, repeat=repeat, number=20)
+    results["catalog_compile"] = measure(lambda: compile_catalog(catalog_paths()), repeat=repeat)
+    load_catalog()
+    results["catalog_load_cached"] = measure(lambda: load_catalog(memo=False), repeat=repeat)
+
+    timing = measure(lambda: [library.create_component(name) for name in names], repeat=repeat, number=20)
+    results["create_component"] = {"per_component_us": timing["min_ms"] * 1000 / len(names),
+                                    "components": len(names)}
+
+    components = [library.create_component(name) for name in names]
+    grid_pos = GridPosition(8, 12, 0, 0)
+    timing = measure(lambda: [component.generate_panel(grid_pos) for component in components],
+                     repeat=repeat, number=20)
+    _, peak = peak_memory(lambda: [component.generate_panel(grid_pos) for component in components])
+    results["generate_panel"] = {"per_panel_us": timing["min_ms"] * 1000 / len(components),
+                                 "peak_memory_bytes": peak,
+                                 "panels": len(components)}
+
+    for size in sizes:
+        template = synthetic_template(size, library)
+        dashboard, peak = peak_memory(lambda: template.generate_dashboard("dev"))
+        # Small dashboards are timed in batches so each sample is long enough to be stable
+        timing = measure(lambda: template.generate_dashboard("dev"), repeat=repeat, number=max(1, 1000 // size))
+        results[f"generate_dashboard[{size}]"] = {
+            **timing,
+            "peak_memory_bytes": peak,
+            "pretty_bytes": len(dumps(dashboard, "pretty").encode()),
+            "compact_bytes": len(dumps(dashboard, "compact").encode()),
+            "sections": len(template.sections)
+        }
+
+    return results
+
+def main():
+    """Run the generator benchmarks and compare them against the stored baseline"""
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard generation pipeline")
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES,
+                       help="Synthetic template sizes in components (default: 10 100 1000)")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repetitions per case")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--check-timings", action="store_true",
+                       help="Also fail on timing regressions; only meaningful against a baseline from this machine")
+    parser.add_argument("--time-tolerance", type=float, default=0.5,
+                       help="With --check-timings, allowed slowdown of a timing (default: 0.5 = 50%%)")
+    parser.add_argument("--size-tolerance", type=float, default=0.1,
+                       help="Allowed growth of output size and peak memory (default: 0.1 = 10%%)")
+
+    args = parser.parse_args()
+
+    install_offline_config(dashboard_generator)
+    results = run(args.sizes, args.repeat)
+    baseline = load_baseline(args.baseline)
+    print_results(results, baseline)
+
+    if args.update_baseline:
+        save_baseline(args.baseline, results)
+        print(f"✅ Baseline updated: {args.baseline}")
+        return
+
+    if baseline is None:
+        print(f"⚠️ No baseline at {args.baseline}; run with --update-baseline to create one")
+        return
+
+    regressions = compare(results, baseline, args.time_tolerance, args.size_tolerance, args.check_timings)
+    if regressions:
+        print("❌ Regressions against baseline:")
+        for regression in regressions:
+            print(f"   • {regression}")
+        sys.exit(1)
+    print("✅ No regressions against baseline")
+
+if __name__ == "__main__":
+    main()
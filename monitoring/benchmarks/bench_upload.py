@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Dashboard Upload Benchmark
+Measures uploads per second and per-upload p50/p99 latency of GrafanaUploader against an
+in-process fake Grafana, per transport and concurrency, offline, against a stored baseline
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Any
+
+from harness import BENCHMARKS_DIR, Results, compare, load_baseline, print_results, save_baseline
+
+from bulk_upload import upload_many
+from fake_grafana import FakeGrafana, FaultInjection
+from grafana_client import GrafanaClient
+from grafana_transport import TRANSPORTS, requests
+from json_serializer import write_json
+from retry_policy import CircuitBreaker
+from upload_manifest import UploadManifest
+from upload_to_grafana import GrafanaUploader
+
+BASELINE_PATH = BENCHMARKS_DIR / "baseline-upload.json"
+DEFAULT_CONCURRENCY = [1, 4, 16]
+DEFAULT_TRANSPORTS = ["requests", "http.client"] if requests is not None else ["http.client"]
+
+def synthetic_dashboards(directory: Path, count: int, panels: int) -> List[Path]:
+    """count dashboard files of panels timeseries panels each"""
+    paths = []
+    for index in range(count):
+        dashboard = {
+            "uid": f"bench-{index:04d}",
+            "title": f"Upload Benchmark {index}",
+            "tags": ["benchmark"],
+            "panels": [
+                {"id": panel, "type": "timeseries", "title": f"Panel {panel}",
+                 "gridPos": {"h": 8, "w": 12, "x": 12 * (panel % 2), "y": 8 * (panel // 2)},
+                 "targets": [{"refId": "A", "expr": f'sum(rate(http_requests_total{{panel="{panel}"}}[5m]))'}]}
+                for panel in range(panels)
+            ]
+        }
+        path = directory / f"bench-{index:04d}.json"
+        write_json(path, dashboard)
+        paths.append(path)
+    return paths
+
+def percentile(samples: List[float], fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def run_case(fake: FakeGrafana, paths: List[Path], transport: str, concurrency: int, repeat: int,
+             manifest_path: Path) -> Dict[str, Any]:
+    """Upload every path repeat times with a fresh uploader; report the best run and its latencies"""
+    runs = []
+    for _ in range(repeat):
+        client = GrafanaClient(fake.url, "bench", pool_size=concurrency, transport=transport,
+                               breaker=CircuitBreaker(fake.url, state_path=None))
+        # Force every upload through; the content hash check would skip all but the first run
+        uploader = GrafanaUploader(fake.url, "bench", client=client, manifest=UploadManifest(manifest_path),
+                                   skip_unchanged=False)
+        started = time.perf_counter()
+        outcomes = upload_many(uploader, paths, concurrency=concurrency, rate=None)
+        wall = time.perf_counter() - started
+        failed = sum(1 for outcome in outcomes if not outcome.result["success"])
+        runs.append((wall, outcomes, failed, client.connections_opened()))
+        client.close()
+
+    wall, outcomes, failed, connections = min(runs, key=lambda run: run[0])
+    latencies = [outcome.seconds * 1000 for outcome in outcomes]
+    return {
+        "wall_min_ms": wall * 1000,
+        "uploads_per_s": len(paths) / wall,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": percentile(latencies, 0.99),
+        "connections": connections,
+        "failed": failed
+    }
+
+def run(dashboards: int, panels: int, transports: List[str], concurrencies: List[int], repeat: int,
+        faults: FaultInjection) -> Results:
+    """Measure every transport at every concurrency against one fake Grafana"""
+    results: Results = {}
+    with tempfile.TemporaryDirectory() as directory, FakeGrafana(faults) as fake:
+        paths = synthetic_dashboards(Path(directory), dashboards, panels)
+        for transport in transports:
+            for concurrency in concurrencies:
+                results[f"upload[{transport},c={concurrency}]"] = run_case(
+                    fake, paths, transport, concurrency, repeat, Path(directory) / "manifest.json")
+        print(f"🧪 Fake Grafana served {fake.stats.requests} requests, {fake.stats.injected_errors} injected "
+              f"errors, {fake.stats.injected_429s} injected 429s")
+    return results
+
+def main():
+    """Run the upload benchmarks and compare them against the stored baseline"""
+    parser = argparse.ArgumentParser(description="Benchmark dashboard uploads against a fake Grafana")
+    parser.add_argument("--dashboards", type=int, default=100, help="Dashboards per run (default: 100)")
+    parser.add_argument("--panels", type=int, default=20, help="Panels per dashboard (default: 20)")
+    parser.add_argument("--transport", nargs="+", choices=TRANSPORTS[1:], default=DEFAULT_TRANSPORTS,
+                       help=f"Transports to measure (default: {' '.join(DEFAULT_TRANSPORTS)})")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=DEFAULT_CONCURRENCY,
+                       help="Concurrent uploads to measure (default: 1 4 16)")
+    parser.add_argument("--latency-ms", type=float, default=10.0,
+                       help="Fake server latency per request, standing in for the network (default: 10)")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Extra random fake server latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered 500")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Share of requests answered 429")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the fastest is reported")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--check-timings", action="store_true",
+                       help="Also fail on timing regressions; only meaningful against a baseline from this machine")
+    parser.add_argument("--time-tolerance", type=float, default=0.5,
+                       help="With --check-timings, allowed slowdown of a timing (default: 0.5 = 50%%)")
+
+    args = parser.parse_args()
+    faults = FaultInjection(args.latency_ms / 1000, args.jitter_ms / 1000, args.error_rate, args.rate_limit,
+                            retry_after=0.05, seed=1)
+    results = run(args.dashboards, args.panels, args.transport, args.concurrency, args.repeat, faults)
+    baseline = load_baseline(args.baseline)
+    print_results(results, baseline)
+
+    if args.update_baseline:
+        save_baseline(args.baseline, results)
+        print(f"✅ Baseline updated: {args.baseline}")
+        return
+
+    if baseline is None:
+        print(f"⚠️ No baseline at {args.baseline}; run with --update-baseline to create one")
+        return
+
+    regressions = compare(results, baseline, args.time_tolerance, check_timings=args.check_timings)
+    if regressions:
+        print("❌ Regressions against baseline:")
+        for regression in regressions:
+            print(f"   • {regression}")
+        sys.exit(1)
+    print("✅ No regressions against baseline")
+
+if __name__ == "__main__":
+    main()
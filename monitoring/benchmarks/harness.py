@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark Harness
+Timing, peak-memory measurement and baseline comparison shared by the monitoring benchmarks
+"""
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List, Any, Callable, Optional, Tuple
+
+BENCHMARKS_DIR = Path(__file__).parent
+SCRIPTS_DIR = BENCHMARKS_DIR.parent / "scripts"
+
+# Benchmarks import the monitoring scripts as siblings, like the scripts import each other
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+# Metrics compared against the baseline, by name suffix; for all of them lower is better.
+# Best-of-N timings are compared rather than medians, which scheduler noise moves around,
+# and only on request: a baseline's timings hold for the machine that stored it.
+TIME_SUFFIXES = ("min_ms", "_us")
+SIZE_SUFFIXES = ("_bytes",)
+
+Results = Dict[str, Dict[str, float]]
+
+class OfflineConfigManager:
+    """Stand-in for AdvancedConfigManager that never reads config files or starts a watcher"""
+
+    def __init__(self, environments: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.environments = environments or {
+            env: {
+                "prometheus_url": f"http://prometheus.{env}.bench:9090",
+                "pushgateway_url": f"http://pushgateway.{env}.bench:9091",
+                "grafana_url": f"http://grafana.{env}.bench:3000"
+            }
+            for env in ("dev", "staging", "prod")
+        }
+
+    def get_environment_config(self, environment: str) -> Dict[str, Any]:
+        if environment not in self.environments:
+            raise ValueError(f"Environment '{environment}' not found")
+        return self.environments[environment]
+
+def install_offline_config(*modules: Any) -> OfflineConfigManager:
+    """Point get_config_manager in each module at an OfflineConfigManager"""
+    manager = OfflineConfigManager()
+    for module in modules:
+        module.get_config_manager = lambda config_dir=None: manager
+    return manager
+
+def measure(func: Callable[[], Any], repeat: int = 5, number: int = 1) -> Dict[str, float]:
+    """Median and best wall time of func in milliseconds, per call"""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - started) * 1000 / number)
+    return {"median_ms": statistics.median(samples), "min_ms": min(samples)}
+
+def peak_memory(func: Callable[[], Any]) -> Tuple[Any, int]:
+    """Run func under tracemalloc and return its result with the peak bytes allocated"""
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+def environment_info() -> Dict[str, Any]:
+    """Where a set of results was measured, stored with baselines"""
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "cpus": os.cpu_count()
+    }
+
+def load_baseline(path: Path) -> Optional[Dict[str, Any]]:
+    """Stored baseline results, or None if there is none yet"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def save_baseline(path: Path, results: Results):
+    """Store results as the new baseline"""
+    baseline = {"environment": environment_info(), "results": results}
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def compare(results: Results, baseline: Dict[str, Any], time_tolerance: float = 0.5,
+            size_tolerance: float = 0.1, check_timings: bool = False) -> List[str]:
+    """Describe every metric that got worse than the baseline by more than its tolerance.
+
+    Output sizes and peak memory are deterministic for a given Python version and always
+    compared. Timings depend on the machine the baseline was stored on, so they are only
+    compared with check_timings, against a baseline refreshed on the same machine.
+    """
+    regressions = []
+    for case, metrics in results.items():
+        for metric, value in metrics.items():
+            previous = baseline.get("results", {}).get(case, {}).get(metric)
+            if not previous:
+                continue
+            if metric.endswith(TIME_SUFFIXES) and check_timings:
+                tolerance = time_tolerance
+            elif metric.endswith(SIZE_SUFFIXES):
+                tolerance = size_tolerance
+            else:
+                continue
+            if value > previous * (1 + tolerance):
+                regressions.append(f"{case}.{metric}: {value:,.2f} vs baseline {previous:,.2f} "
+                                   f"(+{(value / previous - 1) * 100:.0f}%)")
+    return regressions
+
+def print_results(results: Results, baseline: Optional[Dict[str, Any]] = None):
+    """Print one line per case and metric, with the change against the baseline"""
+    print(f"{'Case':<32} {'Metric':<24} {'Value':>16} {'Baseline':>16} {'Change':>8}")
+    print("─" * 100)
+    for case, metrics in results.items():
+        for metric, value in metrics.items():
+            previous = (baseline or {}).get("results", {}).get(case, {}).get(metric)
+            change = f"{(value / previous - 1) * 100:+.0f}%" if previous else "-"
+            previous_text = f"{previous:,.2f}" if previous is not None else "-"
+            print(f"{case[:31]:<32} {metric:<24} {value:>16,.2f} {previous_text:>16} {change:>8}")
+    print("─" * 100)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Dashboard Build Cache
+Content-addressed cache that lets the generator skip unchanged panels and dashboards
+"""
+import copy
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import asdict, is_dataclass
+from pathlib import Path
+from typing import Dict, Any, Optional, Callable, Iterable, Union
+
+CACHE_DIR = Path(__file__).parent.parent / ".cache" / "dashboards"
+
+def _encode(value: Any) -> Any:
+    """JSON fallback encoder for fingerprinted objects"""
+    if is_dataclass(value):
+        return asdict(value)
+    if isinstance(value, Path):
+        return str(value)
+    return repr(value)
+
+def fingerprint(*parts: Any) -> str:
+    """Stable SHA-256 digest of JSON-compatible parts"""
+    payload = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=_encode)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+def file_digest(path: Path) -> Optional[str]:
+    """SHA-256 digest of a file's bytes, or None if it does not exist"""
+    try:
+        with open(path, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except FileNotFoundError:
+        return None
+
+def _current_umask() -> int:
+    """Read the process umask without changing it"""
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+def write_if_changed(path: Path, content: Union[str, Iterable[str]]) -> bool:
+    """Write content only if it differs from the file on disk, keeping mtime stable otherwise.
+
+    content may be a string or an iterable of chunks, which is streamed to disk
+    without building the whole document in memory.
+    """
+    path = Path(path)
+
+    if isinstance(content, str):
+        data = content.encode()
+        if path.exists() and path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+        content = [content]
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        digest = hashlib.sha256()
+        with os.fdopen(fd, 'wb') as f:
+            for chunk in content:
+                data = chunk.encode()
+                digest.update(data)
+                f.write(data)
+
+        if file_digest(path) == digest.hexdigest():
+            os.unlink(temp_path)
+            return False
+
+        # mkstemp creates 0600 files; keep the permissions a plain open() would give
+        os.chmod(temp_path, path.stat().st_mode if path.exists() else 0o666 & ~_current_umask())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+    return True
+
+class DashboardBuildCache:
+    """Per-artifact cache of rendered panels and the last written output"""
+
+    VERSION = 1
+
+    def __init__(self, cache_path: Path):
+        self.cache_path = Path(cache_path)
+        self.panels: Dict[str, Dict[str, Any]] = {}
+        self.dashboard_key: Optional[str] = None
+        self.output_digest: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self._used_keys = set()
+        self._load()
+
+    @classmethod
+    def for_output(cls, output_path: Path, cache_dir: Path = CACHE_DIR) -> 'DashboardBuildCache':
+        """Get the cache belonging to a dashboard output file"""
+        output_path = Path(output_path)
+        path_key = hashlib.sha1(str(output_path.resolve()).encode()).hexdigest()[:8]
+        return cls(Path(cache_dir) / f"{output_path.stem}-{path_key}.json")
+
+    def _load(self):
+        """Load cache state, discarding it if unreadable or from another version"""
+        try:
+            with open(self.cache_path, 'r') as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+
+        if state.get("version") != self.VERSION:
+            return
+
+        self.panels = state.get("panels", {})
+        self.dashboard_key = state.get("dashboard_key")
+        self.output_digest = state.get("output_digest")
+
+    def panel(self, key: str, render: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return the cached panel for key, rendering and storing it on a miss"""
+        self._used_keys.add(key)
+
+        if key in self.panels:
+            self.hits += 1
+            return copy.deepcopy(self.panels[key])
+
+        self.misses += 1
+        panel = render()
+        self.panels[key] = copy.deepcopy(panel)
+        return panel
+
+    def is_fresh(self, dashboard_key: str, output_path: Path) -> bool:
+        """Check whether output_path already holds the dashboard for dashboard_key"""
+        if self.dashboard_key != dashboard_key or self.output_digest is None:
+            return False
+        return file_digest(output_path) == self.output_digest
+
+    def record_output(self, dashboard_key: str, output_path: Path):
+        """Remember which dashboard key produced the current output file"""
+        self.dashboard_key = dashboard_key
+        self.output_digest = file_digest(output_path)
+
+    def save(self):
+        """Persist cache state, pruning panels not used by the latest build"""
+        if self._used_keys:
+            self.panels = {key: panel for key, panel in self.panels.items() if key in self._used_keys}
+
+        state = {
+            "version": self.VERSION,
+            "dashboard_key": self.dashboard_key,
+            "output_digest": self.output_digest,
+            "panels": self.panels
+        }
+        write_if_changed(self.cache_path, json.dumps(state, sort_keys=True))
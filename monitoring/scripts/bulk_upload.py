@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Bulk Dashboard Upload
+Uploads many dashboards concurrently through one GrafanaUploader, with a concurrency cap
+and a token-bucket rate limit that backs off whenever Grafana answers 429
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Any, Callable, Optional
+
+DEFAULT_CONCURRENCY = 4
+# Uploads per second; bursts up to one second's worth
+DEFAULT_RATE = 10.0
+MAX_ATTEMPTS = 5
+# Backoff after a 429 without a usable Retry-After, doubled per attempt
+DEFAULT_RETRY_AFTER = 1.0
+
+class TokenBucket:
+    """Thread-safe token bucket. A 429 empties it and pauses every caller until the
+    delay Grafana asked for has passed."""
+
+    def __init__(self, rate: Optional[float], burst: Optional[float] = None):
+        # rate None means unlimited, apart from 429 pauses
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate or 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Block until a request may be sent; returns the seconds spent waiting"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if self.rate:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if now >= self.paused_until and (not self.rate or self.tokens >= 1):
+                    self.tokens -= 1
+                    return waited
+                delay = self.paused_until - now
+                if self.rate:
+                    delay = max(delay, (1 - self.tokens) / self.rate)
+            time.sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float):
+        """Hold back every caller for seconds, e.g. after a 429"""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+
+@dataclass
+class UploadOutcome:
+    """Result of uploading one dashboard file"""
+    path: Path
+    result: Dict[str, Any]
+    attempts: int
+    seconds: float
+    throttled_seconds: float
+    bytes: int
+
+def upload_many(uploader: Any, paths: List[Path], concurrency: int = DEFAULT_CONCURRENCY,
+                rate: Optional[float] = DEFAULT_RATE, folder_id: int = 0,
+                max_attempts: int = MAX_ATTEMPTS,
+                on_outcome: Optional[Callable[[UploadOutcome], None]] = None) -> List[UploadOutcome]:
+    """Upload paths with at most concurrency requests in flight and at most rate uploads per second.
+
+    Uploads rejected with 429 are retried up to max_attempts times after the Retry-After
+    delay, which pauses all workers, not just the one that was throttled. on_outcome is
+    called from the worker as each dashboard finishes, e.g. to journal it.
+    """
+    limiter = TokenBucket(rate)
+
+    def upload_one(path: Path) -> UploadOutcome:
+        started = time.perf_counter()
+        throttled = 0.0
+        attempts = 0
+        while True:
+            throttled += limiter.acquire()
+            attempts += 1
+            try:
+                result = uploader.upload_dashboard(str(path), folder_id=folder_id)
+            except (OSError, ValueError) as e:
+                result = {"success": False, "error": str(e)}
+            if result.get("status_code") != 429 or attempts >= max_attempts:
+                break
+            limiter.pause(result.get("retry_after") or DEFAULT_RETRY_AFTER * 2 ** (attempts - 1))
+        outcome = UploadOutcome(path, result, attempts, time.perf_counter() - started, throttled,
+                                path.stat().st_size if path.exists() else 0)
+        if on_outcome is not None:
+            on_outcome(outcome)
+        return outcome
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = [pool.submit(upload_one, Path(path)) for path in paths]
+        return [future.result() for future in futures]
+
+def upload_summary(outcomes: List[UploadOutcome], wall_seconds: float) -> Dict[str, Any]:
+    """Counts and throughput of a bulk upload; dashboards skipped as unchanged sent nothing,
+    so throughput covers uploaded dashboards only"""
+    uploaded = [outcome for outcome in outcomes
+                if outcome.result["success"] and outcome.result.get("status") != "unchanged"]
+    unchanged = sum(1 for outcome in outcomes
+                    if outcome.result["success"] and outcome.result.get("status") == "unchanged")
+    return {
+        "uploaded": len(uploaded),
+        "unchanged": unchanged,
+        "failed": len(outcomes) - len(uploaded) - unchanged,
+        "dashboards_per_s": len(uploaded) / wall_seconds if wall_seconds else 0.0,
+        "kb_per_s": sum(outcome.bytes for outcome in uploaded) / 1024 / wall_seconds if wall_seconds else 0.0,
+        "throttled_seconds": sum(outcome.throttled_seconds for outcome in outcomes)
+    }
+
+def print_upload_report(outcomes: List[UploadOutcome], wall_seconds: float):
+    """Per-dashboard results followed by aggregate throughput"""
+    print(f"{'Dashboard':<36} {'Status':<12} {'UID':<28} {'Version':>7} {'Tries':>5} {'Time':>8}")
+    print("─" * 102)
+    for outcome in outcomes:
+        result = outcome.result
+        if result["success"]:
+            status, uid, version = "✅ " + result.get("status", "ok"), result["dashboard_uid"], result.get("version", "-")
+        else:
+            status, uid, version = f"❌ {result.get('status_code') or 'error'}", "-", "-"
+        print(f"{outcome.path.name[:35]:<36} {status:<12} {uid[:27]:<28} {version:>7} {outcome.attempts:>5} "
+              f"{outcome.seconds * 1000:>6.0f}ms")
+        if not result["success"]:
+            print(f"   {result['error']}")
+    print("─" * 102)
+
+    summary = upload_summary(outcomes, wall_seconds)
+    print(f"📈 {summary['uploaded']} uploaded, {summary['unchanged']} unchanged and skipped, {summary['failed']} failed "
+          f"in {wall_seconds:.2f}s: {summary['dashboards_per_s']:.1f} uploaded dashboards/s, "
+          f"{summary['kb_per_s']:.0f} KB/s"
+          + (f", {summary['throttled_seconds']:.1f}s waiting on the rate limit"
+             if summary["throttled_seconds"] >= 0.05 else ""))
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Dashboard Component Catalog
+Loads declarative component definitions from YAML/JSON, validates them once and caches
+the compiled registry on disk so generator startup skips parsing
+"""
+import json
+import marshal
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+import yaml
+
+CONFIG_DIR = Path(__file__).parent.parent / "config"
+CATALOG_PATH = CONFIG_DIR / "components.yaml"
+# Team catalogs, loaded after the built-in one in name order
+EXTRA_CATALOGS_DIR = CONFIG_DIR / "components.d"
+CACHE_PATH = Path(__file__).parent.parent / ".cache" / "components.marshal"
+
+# Bump when the compiled spec layout changes so stale caches are recompiled
+CATALOG_FORMAT = 1
+
+# Options each panel type accepts besides title and targets
+PANEL_OPTIONS = {
+    "stat": {"unit": str, "decimals": int},
+    "timeseries": {"unit": str, "y_min": (int, float), "y_max": (int, float)},
+    "gauge": {"unit": str, "min_val": (int, float), "max_val": (int, float)},
+    "heatmap": {"unit": str},
+}
+TARGET_FIELDS = {"expr": str, "legend_format": str, "ref_id": str, "instant": bool}
+
+ComponentSpec = Dict[str, Any]
+
+class CatalogError(ValueError):
+    """A component catalog is malformed"""
+    pass
+
+def catalog_paths() -> List[Path]:
+    """The built-in catalog followed by team catalogs"""
+    paths = [CATALOG_PATH]
+    if EXTRA_CATALOGS_DIR.is_dir():
+        paths += sorted(path for path in EXTRA_CATALOGS_DIR.iterdir()
+                        if path.suffix in (".yaml", ".yml", ".json"))
+    return paths
+
+def _read_catalog(path: Path) -> Dict[str, Any]:
+    """Parse one catalog file"""
+    with open(path, 'r') as f:
+        document = json.load(f) if path.suffix == ".json" else yaml.safe_load(f)
+    if not isinstance(document, dict) or not isinstance(document.get("components"), dict):
+        raise CatalogError(f"{path}: expected a mapping with a 'components' mapping")
+    return document["components"]
+
+def _check_type(where: str, field: str, value: Any, expected: Any):
+    # bool is an int subclass; don't accept True as a number or a number as a flag
+    if isinstance(value, bool) != (expected is bool) or not isinstance(value, expected):
+        raise CatalogError(f"{where}: '{field}' has invalid value {value!r}")
+
+def compile_spec(name: str, definition: Any, source: str = "<catalog>") -> ComponentSpec:
+    """Validate one component definition and normalize it to a compiled spec"""
+    where = f"{source}: component '{name}'"
+    if not isinstance(definition, dict):
+        raise CatalogError(f"{where}: expected a mapping")
+
+    panel_type = definition.get("type")
+    if panel_type not in PANEL_OPTIONS:
+        raise CatalogError(f"{where}: unknown type {panel_type!r}, expected one of {sorted(PANEL_OPTIONS)}")
+    if not isinstance(definition.get("title"), str) or not definition["title"]:
+        raise CatalogError(f"{where}: missing title")
+
+    options = {}
+    for field, value in definition.items():
+        if field in ("type", "title", "targets", "description"):
+            continue
+        if field not in PANEL_OPTIONS[panel_type]:
+            raise CatalogError(f"{where}: unknown option '{field}' for {panel_type} panels")
+        _check_type(where, field, value, PANEL_OPTIONS[panel_type][field])
+        options[field] = value
+
+    targets = definition.get("targets")
+    if not isinstance(targets, list) or not targets:
+        raise CatalogError(f"{where}: needs at least one target")
+
+    compiled_targets = []
+    for index, target in enumerate(targets):
+        if not isinstance(target, dict) or not isinstance(target.get("expr"), str) or not target["expr"].strip():
+            raise CatalogError(f"{where}: target {index + 1} needs an expr")
+        for field, value in target.items():
+            if field not in TARGET_FIELDS:
+                raise CatalogError(f"{where}: target {index + 1} has unknown field '{field}'")
+            _check_type(where, field, value, TARGET_FIELDS[field])
+        # refIds default to A, B, C... by position
+        compiled_targets.append({"ref_id": chr(ord("A") + index), **target})
+
+    ref_ids = [target["ref_id"] for target in compiled_targets]
+    if len(set(ref_ids)) != len(ref_ids):
+        raise CatalogError(f"{where}: duplicate refIds {ref_ids}")
+
+    return {
+        "type": panel_type,
+        "title": definition["title"],
+        "options": options,
+        "targets": compiled_targets,
+        "source": source
+    }
+
+def compile_catalog(paths: List[Path]) -> Dict[str, ComponentSpec]:
+    """Validate and index every component in the given catalog files"""
+    specs: Dict[str, ComponentSpec] = {}
+    for path in paths:
+        for name, definition in _read_catalog(path).items():
+            if name in specs:
+                raise CatalogError(f"{path}: component '{name}' already defined in {specs[name]['source']}")
+            specs[name] = compile_spec(name, definition, str(path))
+    return specs
+
+def _source_signature(paths: List[Path]) -> List[Tuple[str, int, int]]:
+    """Cheap identity of the catalog files: path, size and modification time"""
+    signature = []
+    for path in paths:
+        stat = path.stat()
+        signature.append((str(path.resolve()), stat.st_size, stat.st_mtime_ns))
+    return signature
+
+# Registries already loaded by this process, by source signature
+_loaded: Dict[Any, Dict[str, ComponentSpec]] = {}
+
+def load_catalog(paths: Optional[List[Path]] = None, cache_path: Optional[Path] = CACHE_PATH,
+                 memo: bool = True) -> Dict[str, ComponentSpec]:
+    """The compiled component registry, from memory (unless memo is False), the on-disk
+    cache or the catalog files"""
+    paths = [Path(path) for path in (paths if paths is not None else catalog_paths())]
+    signature = [CATALOG_FORMAT] + _source_signature(paths)
+    memo_key = repr(signature)
+    if memo and memo_key in _loaded:
+        return _loaded[memo_key]
+
+    specs = None
+    if cache_path is not None:
+        try:
+            with open(cache_path, 'rb') as f:
+                cached = marshal.load(f)
+            if cached.get("signature") == signature:
+                specs = cached["specs"]
+        except (OSError, EOFError, ValueError, TypeError, AttributeError):
+            pass
+
+    if specs is None:
+        specs = compile_catalog(paths)
+        if cache_path is not None:
+            _write_cache(Path(cache_path), {"signature": signature, "specs": specs})
+
+    _loaded[memo_key] = specs
+    return specs
+
+def _write_cache(cache_path: Path, state: Dict[str, Any]):
+    """Atomically replace the compiled catalog cache; a failed write only costs a recompile"""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=cache_path.parent, prefix=f".{cache_path.name}.", suffix=".tmp")
+        with os.fdopen(fd, 'wb') as f:
+            marshal.dump(state, f)
+        os.replace(temp_path, cache_path)
+    except OSError as e:
+        print(f"⚠️ Could not cache component catalog: {e}")
+
+def main():
+    """Validate the component catalogs"""
+    try:
+        specs = compile_catalog(catalog_paths())
+    except (CatalogError, OSError, yaml.YAMLError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    by_type: Dict[str, int] = {}
+    for spec in specs.values():
+        by_type[spec["type"]] = by_type.get(spec["type"], 0) + 1
+    print(f"✅ {len(specs)} components valid: " + ", ".join(f"{count} {t}" for t, count in sorted(by_type.items())))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Dashboard Structural Diff
+Compares a local dashboard with the one stored in Grafana panel by panel, target by target
+and variable by variable, and prints the result as a plan before anything is uploaded
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+# Keys Grafana manages or users change while viewing; they never count as a change
+IGNORED_DASHBOARD_KEYS = frozenset({"id", "version", "iteration", "panels", "templating"})
+IGNORED_PANEL_KEYS = frozenset({"id", "targets", "panels", "pluginVersion"})
+IGNORED_VARIABLE_KEYS = frozenset({"current", "options"})
+
+ADD, CHANGE, REMOVE = "+", "~", "-"
+
+@dataclass(frozen=True)
+class Change:
+    """One difference between the local and the remote dashboard"""
+    action: str
+    kind: str
+    name: str
+    detail: str = ""
+    # Name of the panel a target change belongs to
+    parent: Optional[str] = None
+
+def _short(value: Any, limit: int = 60) -> str:
+    text = value if isinstance(value, str) else repr(value)
+    return text if len(text) <= limit else text[:limit - 1] + "…"
+
+def _delta(old: Any, new: Any, limit: int = 40) -> str:
+    """old → new, starting both shortly before the first difference"""
+    old, new = (value if isinstance(value, str) else repr(value) for value in (old, new))
+    common = 0
+    while common < min(len(old), len(new)) and old[common] == new[common]:
+        common += 1
+    skip = max(0, common - 10)
+    prefix = "…" if skip else ""
+    return f"{prefix}{_short(old[skip:], limit)} → {prefix}{_short(new[skip:], limit)}"
+
+def _changed_keys(local: Dict[str, Any], remote: Dict[str, Any], ignored: Iterable[str]) -> List[str]:
+    ignored = set(ignored)
+    return sorted(key for key in set(local) | set(remote)
+                  if key not in ignored and local.get(key) != remote.get(key))
+
+def flatten_panels(panels: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Panels including those nested in collapsed rows"""
+    flat = []
+    for panel in panels:
+        flat.append(panel)
+        flat.extend(flatten_panels(panel.get("panels", [])))
+    return flat
+
+def panel_name(panel: Dict[str, Any]) -> str:
+    return f'{panel.get("id", "?")} "{panel.get("title", "")}"'
+
+def _keyed_panels(dashboard: Dict[str, Any]) -> Dict[Any, Dict[str, Any]]:
+    # Panel ids are stable across generations; fall back to titles for hand-made panels
+    return {panel.get("id", panel.get("title")): panel for panel in flatten_panels(dashboard.get("panels", []))}
+
+def diff_targets(local: Dict[str, Any], remote: Dict[str, Any]) -> List[Change]:
+    """Changes to the queries of one panel, matched by refId"""
+    parent = panel_name(local)
+    local_targets = {target.get("refId", str(index)): target for index, target in enumerate(local.get("targets", []))}
+    remote_targets = {target.get("refId", str(index)): target for index, target in enumerate(remote.get("targets", []))}
+
+    changes = []
+    for ref_id in sorted(set(local_targets) | set(remote_targets)):
+        mine, theirs = local_targets.get(ref_id), remote_targets.get(ref_id)
+        if theirs is None:
+            changes.append(Change(ADD, "target", ref_id, _short(mine.get("expr", "")), parent))
+        elif mine is None:
+            changes.append(Change(REMOVE, "target", ref_id, _short(theirs.get("expr", "")), parent))
+        elif mine.get("expr") != theirs.get("expr"):
+            changes.append(Change(CHANGE, "target", ref_id, _delta(theirs.get("expr", ""), mine.get("expr", "")),
+                                  parent))
+        elif mine != theirs:
+            changes.append(Change(CHANGE, "target", ref_id, ", ".join(_changed_keys(mine, theirs, ())), parent))
+    return changes
+
+def diff_panels(local: Dict[str, Any], remote: Dict[str, Any]) -> List[Change]:
+    """Added, removed and changed panels, with their target changes"""
+    local_panels, remote_panels = _keyed_panels(local), _keyed_panels(remote)
+    changes = []
+    for key in local_panels:
+        if key not in remote_panels:
+            changes.append(Change(ADD, "panel", panel_name(local_panels[key]), local_panels[key].get("type", "")))
+            continue
+        mine, theirs = local_panels[key], remote_panels[key]
+        keys = _changed_keys(mine, theirs, IGNORED_PANEL_KEYS)
+        targets = diff_targets(mine, theirs)
+        if keys or targets:
+            changes.append(Change(CHANGE, "panel", panel_name(mine), ", ".join(keys)))
+            changes.extend(targets)
+    for key, panel in remote_panels.items():
+        if key not in local_panels:
+            changes.append(Change(REMOVE, "panel", panel_name(panel), panel.get("type", "")))
+    return changes
+
+def diff_variables(local: Dict[str, Any], remote: Dict[str, Any]) -> List[Change]:
+    """Changes to template variables, matched by name"""
+    local_vars = {variable["name"]: variable for variable in local.get("templating", {}).get("list", [])}
+    remote_vars = {variable["name"]: variable for variable in remote.get("templating", {}).get("list", [])}
+    changes = []
+    for name in sorted(set(local_vars) | set(remote_vars)):
+        if name not in remote_vars:
+            changes.append(Change(ADD, "variable", name, local_vars[name].get("type", "")))
+        elif name not in local_vars:
+            changes.append(Change(REMOVE, "variable", name, remote_vars[name].get("type", "")))
+        else:
+            keys = _changed_keys(local_vars[name], remote_vars[name], IGNORED_VARIABLE_KEYS)
+            if keys:
+                changes.append(Change(CHANGE, "variable", name, ", ".join(keys)))
+    return changes
+
+def diff_settings(local: Dict[str, Any], remote: Dict[str, Any]) -> List[Change]:
+    """Changes to dashboard-level settings such as title, tags, time range and refresh"""
+    return [Change(CHANGE, "setting", key, _delta(remote.get(key), local.get(key), 30))
+            for key in _changed_keys(local, remote, IGNORED_DASHBOARD_KEYS)]
+
+def diff_dashboards(local: Dict[str, Any], remote: Dict[str, Any]) -> List[Change]:
+    """Everything an upload of local would change in remote"""
+    return diff_settings(local, remote) + diff_variables(local, remote) + diff_panels(local, remote)
+
+def fetch_remote_dashboard(client: Any, uid: str) -> Optional[Dict[str, Any]]:
+    """The dashboard Grafana stores under uid, or None if there is none.
+
+    Raises grafana_transport.RequestException when Grafana cannot be asked.
+    """
+    response = client.get(f"/api/dashboards/uid/{uid}")
+    if response.status_code == 404:
+        return None
+    response.raise_for_status()
+    return response.json()["dashboard"]
+
+def plan_counts(changes: List[Change]) -> Tuple[int, int, int]:
+    """Panels and variables to add, change and remove; settings and targets count toward change"""
+    top = [change for change in changes if change.parent is None]
+    adds = sum(1 for change in top if change.action == ADD)
+    removes = sum(1 for change in top if change.action == REMOVE)
+    return adds, len(top) - adds - removes, removes
+
+def print_plan(uid: str, title: str, changes: Optional[List[Change]]):
+    """Print one dashboard's plan; changes None means it does not exist in Grafana yet"""
+    if changes is None:
+        print(f"  + dashboard {uid} \"{title}\" will be created")
+        return
+    if not changes:
+        print(f"    dashboard {uid} \"{title}\" is up to date")
+        return
+
+    print(f"  ~ dashboard {uid} \"{title}\" will be updated")
+    for change in changes:
+        indent = "        " if change.parent else "      "
+        detail = f": {change.detail}" if change.detail else ""
+        print(f"{indent}{change.action} {change.kind} {change.name}{detail}")
+
+def print_plan_summary(plans: List[Optional[List[Change]]]):
+    """Totals across dashboards, like the last line of terraform plan"""
+    created = sum(1 for changes in plans if changes is None)
+    updated = sum(1 for changes in plans if changes)
+    counts = [plan_counts(changes) for changes in plans if changes]
+    adds, modified, removes = (sum(column) for column in zip(*counts)) if counts else (0, 0, 0)
+    print(f"\n📋 Plan: {created} dashboards to create, {updated} to update, "
+          f"{len(plans) - created - updated} unchanged ({adds} to add, {modified} to change, {removes} to remove)")
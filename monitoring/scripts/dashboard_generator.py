@@ -3,42 +3,159 @@
 Modular Dashboard Generator
 Creates dynamic Grafana dashboards from modular components
 """
+import hashlib
 import json
-import yaml
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union
-from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Any, Optional, Set, Tuple
 from dataclasses import dataclass, asdict
 from config_manager import get_config_manager
+from build_cache import DashboardBuildCache, fingerprint, write_if_changed
+from promql_cost import DEFAULT_COST_BUDGET, CostBudgetExceeded, analyze_dashboard, analyze_file, check_budget
+from recording_rules import (
+    RecordingRuleSet, RecordingRuleSynthesizer, load_rule_set,
+    HAND_WRITTEN_RULES_PATH, GENERATED_RULES_PATH
+)
+from shared_queries import share_duplicate_queries
+from json_serializer import write_json
+from component_catalog import ComponentSpec, load_catalog
+from library_panels import link_library_panels, library_dir_for, resolve_library_panels, write_library_elements
+from panel_profiler import (
+    SORT_KEYS, PanelProfiler, active_profiler, print_profile_report, profiles_from_dicts, push_profiles,
+    write_profile_report
+)
 
-@dataclass
+MONITORING_DIR = Path(__file__).parent.parent
+DASHBOARDS_DIR = MONITORING_DIR / "dashboards"
+ENVIRONMENTS_PATH = MONITORING_DIR / "config" / "environments.json"
+
+# dataclass(slots=True) needs Python 3.10; macOS ships 3.9, where these classes keep a __dict__
+SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Panel IDs must stay within a signed 32-bit integer for Grafana
+PANEL_ID_SPACE = 2**31 - 1
+
+# Modules whose code shapes generated dashboards; editing any of them invalidates cached panels and dashboards
+GENERATOR_MODULES = ("dashboard_generator.py", "build_cache.py", "component_catalog.py", "json_serializer.py",
+                     "library_panels.py", "recording_rules.py", "shared_queries.py")
+GENERATOR_FINGERPRINT = fingerprint(*[(Path(__file__).parent / name).read_text() for name in GENERATOR_MODULES])
+
+@dataclass(frozen=True, **SLOTS)
 class GridPosition:
     """Dashboard panel grid position"""
     h: int  # height
     w: int  # width
     x: int  # x position
     y: int  # y position
+    
+    def to_json(self) -> Dict[str, int]:
+        """gridPos block, equal to asdict() without its recursive deep copy"""
+        return {"h": self.h, "w": self.w, "x": self.x, "y": self.y}
 
-@dataclass
+ThresholdStep = Tuple[str, Optional[float]]
+
+@lru_cache(maxsize=None)
+def _thresholds_fragment(mode: str, steps: Tuple[ThresholdStep, ...]) -> Dict[str, Any]:
+    return {"mode": mode, "steps": [{"color": color, "value": value} for color, value in steps]}
+
+@dataclass(frozen=True, **SLOTS)
 class PanelThresholds:
-    """Panel threshold configuration"""
+    """Panel threshold configuration as (color, value) steps"""
     mode: str = "absolute"
-    steps: List[Dict[str, Any]] = None
-    
-    def __post_init__(self):
-        if self.steps is None:
-            self.steps = [
-                {"color": "green", "value": None},
-                {"color": "red", "value": 80}
-            ]
+    steps: Tuple[ThresholdStep, ...] = (("green", None), ("red", 80))
+    
+    def to_json(self) -> Dict[str, Any]:
+        """thresholds block, built once per distinct configuration and shared by every panel
+        using it; treat it as read-only"""
+        return _thresholds_fragment(self.mode, self.steps)
 
-@dataclass
+DEFAULT_THRESHOLDS = PanelThresholds()
+GAUGE_THRESHOLDS = PanelThresholds(steps=(("green", None), ("yellow", 60), ("red", 80)))
+
+# Immutable panel JSON fragments shared by reference between panels instead of being rebuilt
+# for each one. Nothing edits these in place: query rewriting only touches targets, which are
+# built per panel, and query sharing replaces the datasource block rather than editing it.
+PROMETHEUS_DATASOURCE = {"type": "prometheus", "uid": "PBFA97CFB590B2093"}
+THRESHOLDS_COLOR = {"mode": "thresholds"}
+STAT_OPTIONS = {
+    "colorMode": "background",
+    "graphMode": "area",
+    "justifyMode": "center",
+    "orientation": "auto",
+    "reduceOptions": {"calcs": ["lastNotNull"]},
+    "textMode": "value_and_name"
+}
+TIMESERIES_COLOR = {"mode": "palette-classic"}
+TIMESERIES_CUSTOM = {
+    "drawStyle": "line",
+    "lineInterpolation": "smooth",
+    "lineWidth": 2,
+    "fillOpacity": 10,
+    "pointSize": 5
+}
+TIMESERIES_OPTIONS = {
+    "legend": {
+        "calcs": ["mean", "lastNotNull", "max"],
+        "displayMode": "list",
+        "placement": "bottom",
+        "showLegend": True
+    },
+    "tooltip": {"mode": "multi", "sort": "desc"}
+}
+GAUGE_OPTIONS = {
+    "orientation": "auto",
+    "reduceOptions": {"calcs": ["lastNotNull"]},
+    "showThresholdLabels": True,
+    "showThresholdMarkers": True
+}
+HEATMAP_FIELD_CONFIG = {"defaults": {"custom": {"hideFrom": {"legend": False, "tooltip": False, "viz": False}}}}
+HEATMAP_COLOR = {"mode": "scheme", "scheme": "Spectral"}
+
+def stable_panel_id(*parts: str, space: int = PANEL_ID_SPACE) -> int:
+    """Deterministic panel ID derived from a digest of its identifying parts"""
+    digest = hashlib.blake2b("/".join(parts).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % space + 1
+
+class PanelIdAllocator:
+    """Allocates stable, collision-free panel IDs within a dashboard"""
+    
+    def __init__(self, space: int = PANEL_ID_SPACE):
+        self.space = space
+        self.allocated: Dict[int, str] = {}
+        self.collisions = 0
+    
+    def allocate(self, *parts: str) -> int:
+        """Allocate the ID for parts, probing deterministically on collision"""
+        key = "/".join(parts)
+        panel_id = stable_panel_id(*parts, space=self.space)
+        probe = 0
+        
+        while panel_id in self.allocated:
+            self.collisions += 1
+            probe += 1
+            panel_id = stable_panel_id(*parts, f"#{probe}", space=self.space)
+        
+        self.allocated[panel_id] = key
+        return panel_id
+
+@dataclass(frozen=True, **SLOTS)
 class PanelTarget:
     """Prometheus query target for panel"""
     expr: str
     legend_format: str = ""
     ref_id: str = "A"
     instant: bool = False
+    
+    def to_json(self) -> Dict[str, Any]:
+        """Target block in Grafana's keys; a new dict for every panel, since query rewriting
+        edits targets in place"""
+        return {"expr": self.expr, "legendFormat": self.legend_format, "refId": self.ref_id,
+                "instant": self.instant}
 
 class DashboardComponent:
     """Base class for dashboard components"""
@@ -55,6 +172,10 @@ class DashboardComponent:
     def get_dependencies(self) -> List[str]:
         """Get component dependencies"""
         return self.dependencies
+    
+    def fingerprint(self) -> str:
+        """Stable digest of everything that affects the rendered panel"""
+        return fingerprint(type(self).__name__, vars(self))
 
 class StatPanel(DashboardComponent):
     """Stat panel component"""
@@ -68,27 +189,20 @@ class StatPanel(DashboardComponent):
     
     def generate_panel(self, grid_pos: GridPosition, **kwargs) -> Dict[str, Any]:
         return {
-            "datasource": {"type": "prometheus", "uid": "PBFA97CFB590B2093"},
+            "datasource": PROMETHEUS_DATASOURCE,
             "fieldConfig": {
                 "defaults": {
-                    "color": {"mode": "thresholds"},
+                    "color": THRESHOLDS_COLOR,
                     "decimals": self.decimals,
                     "mappings": [],
-                    "thresholds": asdict(PanelThresholds()),
+                    "thresholds": DEFAULT_THRESHOLDS.to_json(),
                     "unit": self.unit
                 }
             },
-            "gridPos": asdict(grid_pos),
-            "id": hash(self.component_id) % 10000,
-            "options": {
-                "colorMode": "background",
-                "graphMode": "area",
-                "justifyMode": "center",
-                "orientation": "auto",
-                "reduceOptions": {"calcs": ["lastNotNull"]},
-                "textMode": "value_and_name"
-            },
-            "targets": [asdict(target) for target in self.targets],
+            "gridPos": grid_pos.to_json(),
+            "id": kwargs.get("panel_id") or stable_panel_id(self.component_id),
+            "options": STAT_OPTIONS,
+            "targets": [target.to_json() for target in self.targets],
             "title": self.title,
             "type": "stat"
         }
@@ -107,14 +221,8 @@ class TimeSeriesPanel(DashboardComponent):
     def generate_panel(self, grid_pos: GridPosition, **kwargs) -> Dict[str, Any]:
         field_config = {
             "defaults": {
-                "color": {"mode": "palette-classic"},
-                "custom": {
-                    "drawStyle": "line",
-                    "lineInterpolation": "smooth",
-                    "lineWidth": 2,
-                    "fillOpacity": 10,
-                    "pointSize": 5
-                },
+                "color": TIMESERIES_COLOR,
+                "custom": TIMESERIES_CUSTOM,
                 "unit": self.unit
             }
         }
@@ -125,20 +233,12 @@ class TimeSeriesPanel(DashboardComponent):
             field_config["defaults"]["max"] = self.y_max
         
         return {
-            "datasource": {"type": "prometheus", "uid": "PBFA97CFB590B2093"},
+            "datasource": PROMETHEUS_DATASOURCE,
             "fieldConfig": field_config,
-            "gridPos": asdict(grid_pos),
-            "id": hash(self.component_id) % 10000,
-            "options": {
-                "legend": {
-                    "calcs": ["mean", "lastNotNull", "max"],
-                    "displayMode": "list",
-                    "placement": "bottom",
-                    "showLegend": True
-                },
-                "tooltip": {"mode": "multi", "sort": "desc"}
-            },
-            "targets": [asdict(target) for target in self.targets],
+            "gridPos": grid_pos.to_json(),
+            "id": kwargs.get("panel_id") or stable_panel_id(self.component_id),
+            "options": TIMESERIES_OPTIONS,
+            "targets": [target.to_json() for target in self.targets],
             "title": self.title,
             "type": "timeseries"
         }
@@ -156,33 +256,21 @@ class GaugePanel(DashboardComponent):
     
     def generate_panel(self, grid_pos: GridPosition, **kwargs) -> Dict[str, Any]:
         return {
-            "datasource": {"type": "prometheus", "uid": "PBFA97CFB590B2093"},
+            "datasource": PROMETHEUS_DATASOURCE,
             "fieldConfig": {
                 "defaults": {
-                    "color": {"mode": "thresholds"},
+                    "color": THRESHOLDS_COLOR,
                     "mappings": [],
                     "max": self.max_val,
                     "min": self.min_val,
-                    "thresholds": {
-                        "mode": "absolute",
-                        "steps": [
-                            {"color": "green", "value": None},
-                            {"color": "yellow", "value": 60},
-                            {"color": "red", "value": 80}
-                        ]
-                    },
+                    "thresholds": GAUGE_THRESHOLDS.to_json(),
                     "unit": self.unit
                 }
             },
-            "gridPos": asdict(grid_pos),
-            "id": hash(self.component_id) % 10000,
-            "options": {
-                "orientation": "auto",
-                "reduceOptions": {"calcs": ["lastNotNull"]},
-                "showThresholdLabels": True,
-                "showThresholdMarkers": True
-            },
-            "targets": [asdict(target) for target in self.targets],
+            "gridPos": grid_pos.to_json(),
+            "id": kwargs.get("panel_id") or stable_panel_id(self.component_id),
+            "options": GAUGE_OPTIONS,
+            "targets": [target.to_json() for target in self.targets],
             "title": self.title,
             "type": "gauge"
         }
@@ -190,9 +278,9 @@ class GaugePanel(DashboardComponent):
 class DashboardLayout:
     """Manages dashboard panel layout"""
     
-    def __init__(self, columns: int = 24):
+    def __init__(self, columns: int = 24, origin_y: int = 0):
         self.columns = columns
-        self.current_y = 0
+        self.current_y = origin_y
         self.current_x = 0
         self.row_height = 0
     
@@ -217,580 +305,258 @@ class DashboardLayout:
             self.current_y += self.row_height
             self.current_x = 0
             self.row_height = 0
+    
+    @property
+    def bottom(self) -> int:
+        """First free y coordinate below everything placed so far"""
+        return self.current_y + self.row_height
+    
+    def continue_below(self, y: int):
+        """Resume placement at the start of row y, e.g. after a section packed by another engine"""
+        if y > self.bottom or self.current_x > 0:
+            self.current_y = max(y, self.bottom)
+            self.current_x = 0
+            self.row_height = 0
 
-class ComponentLibrary:
-    """Library of reusable dashboard components"""
+class SkylineLayout:
+    """Skyline bin-packing over the dashboard grid: each panel goes to the lowest spot it fits,
+    so short panels fill the gaps greedy row-filling leaves beside tall ones"""
     
-    def __init__(self):
-        self.components = {}
-        self.templates = {}
-        self._register_builtin_components()
+    def __init__(self, columns: int = 24, origin_y: int = 0):
+        self.columns = columns
+        self.skyline = [origin_y] * columns
     
-    def _register_builtin_components(self):
-        """Register built-in components"""
-        
-        # Executive Overview Components
-        self.register_component("system_health_slo", self._create_system_health_slo)
-        self.register_component("build_success_rate", self._create_build_success_rate)
-        self.register_component("build_duration_p95", self._create_build_duration_p95)
-        self.register_component("error_rate", self._create_error_rate)
-        
-        # Infrastructure Components
-        self.register_component("cpu_memory_usage", self._create_cpu_memory_usage)
-        self.register_component("disk_usage", self._create_disk_usage)
-        self.register_component("system_load", self._create_system_load)
-        self.register_component("network_throughput", self._create_network_throughput)
-        self.register_component("resource_optimization", self._create_resource_optimization)
-        
-        # Build & CI/CD Components
-        self.register_component("build_timeline", self._create_build_timeline)
-        self.register_component("build_duration_heatmap", self._create_build_duration_heatmap)
-        self.register_component("pipeline_efficiency", self._create_pipeline_efficiency)
-        self.register_component("test_coverage_trends", self._create_test_coverage_trends)
-        self.register_component("deployment_success", self._create_deployment_success)
-        
-        # Application Performance Components
-        self.register_component("response_time_distribution", self._create_response_time_distribution)
-        self.register_component("cache_hit_ratio", self._create_cache_hit_ratio)
-        self.register_component("database_performance", self._create_database_performance)
-        self.register_component("api_health", self._create_api_health)
-        
-        # AI-Powered Analytics Components
-        self.register_component("predictive_alerts", self._create_predictive_alerts)
-        self.register_component("anomaly_detection", self._create_anomaly_detection)
-        self.register_component("capacity_forecasting", self._create_capacity_forecasting)
-        self.register_component("failure_prediction", self._create_failure_prediction)
-        self.register_component("optimization_suggestions", self._create_optimization_suggestions)
-        self.register_component("ai_prediction_accuracy", self._create_ai_prediction_accuracy)
-        
-        # Security & Compliance Components
-        self.register_component("security_score", self._create_security_score)
-        self.register_component("security_events", self._create_security_events)
-        self.register_component("vulnerability_scan", self._create_vulnerability_scan)
-        self.register_component("compliance_status", self._create_compliance_status)
-        self.register_component("threat_detection", self._create_threat_detection)
-        self.register_component("access_audit", self._create_access_audit)
-        
-        # Developer Experience Components
-        self.register_component("deployment_frequency", self._create_deployment_frequency)
-        self.register_component("lead_time", self._create_lead_time)
-        self.register_component("change_failure_rate", self._create_change_failure_rate)
-        self.register_component("developer_velocity", self._create_developer_velocity)
-        self.register_component("code_quality_trends", self._create_code_quality_trends)
-        self.register_component("developer_satisfaction", self._create_developer_satisfaction)
+    def next_position(self, width: int, height: int) -> GridPosition:
+        """Place a panel at the lowest, then tightest, then leftmost position"""
+        width = min(width, self.columns)
+        best = None
         
-        # Cost Optimization Components
-        self.register_component("cost_efficiency", self._create_cost_efficiency)
-        self.register_component("cost_breakdown", self._create_cost_breakdown)
-        self.register_component("resource_utilization", self._create_resource_utilization)
-        self.register_component("cost_trends", self._create_cost_trends)
-        self.register_component("savings_opportunities", self._create_savings_opportunities)
-        self.register_component("budget_alerts", self._create_budget_alerts)
+        for x in range(self.columns - width + 1):
+            span = self.skyline[x:x + width]
+            y = max(span)
+            wasted = sum(y - top for top in span)
+            if best is None or (y, wasted, x) < best:
+                best = (y, wasted, x)
         
-        # Collaboration & ChatOps Components
-        self.register_component("incident_response_time", self._create_incident_response_time)
-        self.register_component("team_communication", self._create_team_communication)
-        self.register_component("knowledge_sharing", self._create_knowledge_sharing)
-        self.register_component("on_call_metrics", self._create_on_call_metrics)
-        self.register_component("collaboration_health", self._create_collaboration_health)
+        y, _, x = best
+        self.skyline[x:x + width] = [y + height] * width
+        return GridPosition(height, width, x, y)
+    
+    @property
+    def bottom(self) -> int:
+        """First free y coordinate below every placed panel"""
+        return max(self.skyline)
+
+SECTION_LAYOUTS = ("grid", "skyline")
+
+class HeatmapPanel(DashboardComponent):
+    """Heatmap panel component over pre-bucketed histogram series"""
     
-    def register_component(self, name: str, factory_func):
-        """Register a component factory function"""
-        self.components[name] = factory_func
+    def __init__(self, component_id: str, title: str, targets: List[PanelTarget], unit: str = "s"):
+        super().__init__(component_id, title)
+        self.targets = targets
+        self.unit = unit
     
-    def create_component(self, name: str, **kwargs) -> DashboardComponent:
-        """Create a component instance"""
-        if name not in self.components:
-            raise ValueError(f"Unknown component: {name}")
-        
-        return self.components[name](**kwargs)
-    
-    def _create_system_health_slo(self, **kwargs) -> StatPanel:
-        targets = [PanelTarget(
-            expr="100 - (100 * nestory:http_error_rate)",
-            legend_format="System Health SLO"
-        )]
-        return StatPanel("system_health_slo", "System Health (SLO)", targets, unit="percent")
-    
-    def _create_build_success_rate(self, **kwargs) -> GaugePanel:
-        targets = [PanelTarget(
-            expr="100 * nestory:build_success_rate",
-            legend_format="Build Success Rate"
-        )]
-        return GaugePanel("build_success_rate", "Build Success Rate", targets)
-    
-    def _create_build_duration_p95(self, **kwargs) -> StatPanel:
-        targets = [PanelTarget(
-            expr="nestory:build_duration_p95",
-            legend_format="p95 Build Duration"
-        )]
-        return StatPanel("build_duration_p95", "Build Duration p95", targets, unit="s")
-    
-    def _create_error_rate(self, **kwargs) -> StatPanel:
-        targets = [PanelTarget(
-            expr="sum(rate(nestory_error_total[5m]))",
-            legend_format="Error Rate"
-        )]
-        return StatPanel("error_rate", "Error Rate", targets, unit="ops")
-    
-    def _create_cpu_memory_usage(self, **kwargs) -> TimeSeriesPanel:
-        targets = [
-            PanelTarget(
-                expr="nestory:cpu_usage_percent",
-                legend_format="CPU Usage %"
-            ),
-            PanelTarget(
-                expr="nestory:memory_usage_percent",
-                legend_format="Memory Usage %",
-                ref_id="B"
-            )
-        ]
-        return TimeSeriesPanel("cpu_memory_usage", "CPU & Memory Usage", targets, unit="percent", y_min=0, y_max=100)
-    
-    def _create_disk_usage(self, **kwargs) -> StatPanel:
-        targets = [PanelTarget(
-            expr="nestory:disk_usage_percent",
-            legend_format="Disk Usage"
-        )]
-        return StatPanel("disk_usage", "Disk Usage", targets, unit="percent")
-    
-    # AI-Powered Analytics Components
-    def _create_predictive_alerts(self, **kwargs) -> TimeSeriesPanel:
-        targets = [
-            PanelTarget(
-                expr="nestory:ai_predicted_issues",
-                legend_format="Predicted Issues"
-            ),
-            PanelTarget(
-                expr="nestory:ai_confidence_score",
-                legend_format="Confidence Score",
-                ref_id="B"
-            )
-        ]
-        return TimeSeriesPanel("predictive_alerts", "AI Predictive Alerts", targets, unit="short")
-    
-    def _create_anomaly_detection(self, **kwargs) -> TimeSeriesPanel:
-        targets = [PanelTarget(
-            expr="nestory:anomaly_score",
-            legend_format="Anomaly Score"
-        )]
-        return TimeSeriesPanel("anomaly_detection", "Anomaly Detection", targets, unit="short")
-    
-    def _create_capacity_forecasting(self, **kwargs) -> TimeSeriesPanel:
-        targets = [
-            PanelTarget(
-                expr="nestory:predicted_capacity_usage",
-                legend_format="Predicted Usage"
-            ),
-            PanelTarget(
-                expr="nestory:current_capacity_usage",
-                legend_format="Current Usage",
-                ref_id="B"
-            )
-        ]
-        return TimeSeriesPanel("capacity_forecasting", "Capacity Forecasting", targets, unit="percent")
-    
-    def _create_failure_prediction(self, **kwargs) -> StatPanel:
-        targets = [PanelTarget(
-            expr="nestory:failure_probability",
-            legend_format="Failure Risk"
-        )]
-        return StatPanel("failure_prediction", "Failure Prediction", targets, unit="percent")
-    
-    def _create_optimization_suggestions(self, **kwargs) -> StatPanel:
-        targets = [PanelTarget(
-            expr="nestory:optimization_count",
-            legend_format="Suggestions Available"
-        )]
-        return StatPanel("optimization_suggestions", "Optimization Suggestions", targets, unit="short")
-    
-    # Security & Compliance Components
-    def _create_security_score(self, **kwargs) -> GaugePanel:
-        targets = [PanelTarget(
-            expr="nestory:security_score",
-            legend_format="Security Score"
-        )]
-        return GaugePanel("security_score", "Security Score", targets, min_val=0, max_val=100)
-    
-    def _create_security_events(self, **kwargs) -> TimeSeriesPanel:
-        targets = [
-            PanelTarget(
-                expr="sum(rate(nestory_security_events_total[5m]))",
-                legend_format="Security Events"
-            )
-        ]
-        return TimeSeriesPanel("security_events", "Security Events", targets, unit="ops")
-    
-    def _create_vulnerability_scan(self, **kwargs) -> StatPanel:
-        targets = [PanelTarget(
-            expr="nestory:vulnerabilities_high",
-            legend_format="High Vulnerabilities"
-        )]
-        return StatPanel("vulnerability_scan", "Critical Vulnerabilities", targets, unit="short")
-    
-    def _create_compliance_status(self, **kwargs) -> GaugePanel:
-        targets = [PanelTarget(
-            expr="nestory:compliance_score",
-            legend_format="Compliance %"
-        )]
-        return GaugePanel("compliance_status", "Compliance Status", targets, min_val=0, max_val=100)
-    
-    def _create_threat_detection(self, **kwargs) -> StatPanel:
-        targets = [PanelTarget(
-            expr="nestory:active_threats",
-            legend_format="Active Threats"
-        )]
-        return StatPanel("threat_detection", "Active Threats", targets, unit="short")
-    
-    def _create_access_audit(self, **kwargs) -> TimeSeriesPanel:
-        targets = [
-            PanelTarget(
-                expr="sum(rate(nestory_access_attempts_total[5m]))",
-                legend_format="Access Attempts"
-            )
-        ]
-        return TimeSeriesPanel("access_audit", "Access Audit Trail", targets, unit="ops")
-    
-    # Developer Experience Components
-    def _create_deployment_frequency(self, **kwargs) -> StatPanel:
-        targets = [PanelTarget(
-            expr="nestory:deployments_per_day",
-            legend_format="Deployments/Day"
-        )]
-        return StatPanel("deployment_frequency", "Deployment Frequency", targets, unit="short")
-    
-    def _create_lead_time(self, **kwargs) -> StatPanel:
-        targets = [PanelTarget(
-            expr="nestory:lead_time_hours",
-            legend_format="Lead Time"
-        )]
-        return StatPanel("lead_time", "Lead Time for Changes", targets, unit="h")
-    
-    def _create_change_failure_rate(self, **kwargs) -> GaugePanel:
-        targets = [PanelTarget(
-            expr="100 * nestory:change_failure_rate",
-            legend_format="Change Failure Rate"
-        )]
-        return GaugePanel("change_failure_rate", "Change Failure Rate", targets, min_val=0, max_val=30)
-    
-    def _create_developer_velocity(self, **kwargs) -> TimeSeriesPanel:
-        targets = [
-            PanelTarget(
-                expr="nestory:commits_per_day",
-                legend_format="Commits/Day"
-            ),
-            PanelTarget(
-                expr="nestory:features_delivered",
-                legend_format="Features Delivered",
-                ref_id="B"
-            )
-        ]
-        return TimeSeriesPanel("developer_velocity", "Developer Velocity", targets, unit="short")
-    
-    def _create_code_quality_trends(self, **kwargs) -> TimeSeriesPanel:
-        targets = [
-            PanelTarget(
-                expr="nestory:code_coverage_percent",
-                legend_format="Test Coverage %"
-            ),
-            PanelTarget(
-                expr="nestory:code_quality_score",
-                legend_format="Quality Score",
-                ref_id="B"
-            )
-        ]
-        return TimeSeriesPanel("code_quality_trends", "Code Quality Trends", targets, unit="percent")
-    
-    def _create_developer_satisfaction(self, **kwargs) -> GaugePanel:
-        targets = [PanelTarget(
-            expr="nestory:developer_satisfaction_score",
-            legend_format="Developer Satisfaction"
-        )]
-        return GaugePanel("developer_satisfaction", "Developer Satisfaction", targets, min_val=0, max_val=10)
-    
-    # Cost Optimization Components
-    def _create_cost_efficiency(self, **kwargs) -> GaugePanel:
-        targets = [PanelTarget(
-            expr="nestory:cost_efficiency_score",
-            legend_format="Cost Efficiency"
-        )]
-        return GaugePanel("cost_efficiency", "Cost Efficiency", targets, min_val=0, max_val=100)
-    
-    def _create_cost_breakdown(self, **kwargs) -> TimeSeriesPanel:
-        targets = [
-            PanelTarget(
-                expr="nestory:compute_cost_usd",
-                legend_format="Compute"
-            ),
-            PanelTarget(
-                expr="nestory:storage_cost_usd",
-                legend_format="Storage",
-                ref_id="B"
-            ),
-            PanelTarget(
-                expr="nestory:network_cost_usd",
-                legend_format="Network",
-                ref_id="C"
-            )
-        ]
-        return TimeSeriesPanel("cost_breakdown", "Cost Breakdown", targets, unit="currencyUSD")
-    
-    def _create_resource_utilization(self, **kwargs) -> TimeSeriesPanel:
-        targets = [
-            PanelTarget(
-                expr="nestory:resource_utilization_cpu",
-                legend_format="CPU Utilization"
-            ),
-            PanelTarget(
-                expr="nestory:resource_utilization_memory",
-                legend_format="Memory Utilization",
-                ref_id="B"
-            )
-        ]
-        return TimeSeriesPanel("resource_utilization", "Resource Utilization", targets, unit="percent")
-    
-    def _create_cost_trends(self, **kwargs) -> TimeSeriesPanel:
-        targets = [PanelTarget(
-            expr="nestory:monthly_cost_usd",
-            legend_format="Monthly Cost"
-        )]
-        return TimeSeriesPanel("cost_trends", "Cost Trends", targets, unit="currencyUSD")
-    
-    def _create_savings_opportunities(self, **kwargs) -> StatPanel:
-        targets = [PanelTarget(
-            expr="nestory:potential_savings_usd",
-            legend_format="Potential Savings"
-        )]
-        return StatPanel("savings_opportunities", "Savings Opportunities", targets, unit="currencyUSD")
-    
-    def _create_budget_alerts(self, **kwargs) -> StatPanel:
-        targets = [PanelTarget(
-            expr="nestory:budget_usage_percent",
-            legend_format="Budget Usage"
-        )]
-        return StatPanel("budget_alerts", "Budget Usage", targets, unit="percent")
-    
-    # Enhanced Infrastructure Components
-    def _create_network_throughput(self, **kwargs) -> TimeSeriesPanel:
-        targets = [
-            PanelTarget(
-                expr="rate(nestory_network_bytes_sent[5m])",
-                legend_format="Bytes Sent"
-            ),
-            PanelTarget(
-                expr="rate(nestory_network_bytes_received[5m])",
-                legend_format="Bytes Received",
-                ref_id="B"
-            )
-        ]
-        return TimeSeriesPanel("network_throughput", "Network Throughput", targets, unit="binBps")
-    
-    def _create_resource_optimization(self, **kwargs) -> StatPanel:
-        targets = [PanelTarget(
-            expr="nestory:resource_optimization_score",
-            legend_format="Optimization Score"
-        )]
-        return StatPanel("resource_optimization", "Resource Optimization", targets, unit="percent")
-    
-    # AI Prediction Accuracy
-    def _create_ai_prediction_accuracy(self, **kwargs) -> GaugePanel:
-        targets = [PanelTarget(
-            expr="nestory:ai_prediction_accuracy",
-            legend_format="AI Accuracy"
-        )]
-        return GaugePanel("ai_prediction_accuracy", "AI Prediction Accuracy", targets, min_val=0, max_val=100)
-    
-    # Enhanced Application Performance
-    def _create_database_performance(self, **kwargs) -> TimeSeriesPanel:
-        targets = [
-            PanelTarget(
-                expr="nestory:db_query_duration_p95",
-                legend_format="Query Duration p95"
-            ),
-            PanelTarget(
-                expr="nestory:db_connections_active",
-                legend_format="Active Connections",
-                ref_id="B"
-            )
-        ]
-        return TimeSeriesPanel("database_performance", "Database Performance", targets, unit="ms")
-    
-    def _create_api_health(self, **kwargs) -> StatPanel:
-        targets = [PanelTarget(
-            expr="100 - (100 * nestory:api_error_rate)",
-            legend_format="API Health"
-        )]
-        return StatPanel("api_health", "API Health Score", targets, unit="percent")
-    
-    # Enhanced CI/CD Components  
-    def _create_pipeline_efficiency(self, **kwargs) -> GaugePanel:
-        targets = [PanelTarget(
-            expr="nestory:pipeline_efficiency_score",
-            legend_format="Pipeline Efficiency"
-        )]
-        return GaugePanel("pipeline_efficiency", "Pipeline Efficiency", targets, min_val=0, max_val=100)
-    
-    def _create_test_coverage_trends(self, **kwargs) -> TimeSeriesPanel:
-        targets = [
-            PanelTarget(
-                expr="nestory:test_coverage_percent",
-                legend_format="Test Coverage"
-            ),
-            PanelTarget(
-                expr="nestory:test_execution_time",
-                legend_format="Test Duration",
-                ref_id="B"
-            )
-        ]
-        return TimeSeriesPanel("test_coverage_trends", "Test Coverage & Duration", targets, unit="percent")
-    
-    def _create_deployment_success(self, **kwargs) -> StatPanel:
-        targets = [PanelTarget(
-            expr="100 * nestory:deployment_success_rate",
-            legend_format="Deployment Success"
-        )]
-        return StatPanel("deployment_success", "Deployment Success Rate", targets, unit="percent")
-    
-    # Collaboration & ChatOps Components
-    def _create_incident_response_time(self, **kwargs) -> StatPanel:
-        targets = [PanelTarget(
-            expr="nestory:incident_response_time_minutes",
-            legend_format="Response Time"
-        )]
-        return StatPanel("incident_response_time", "Incident Response Time", targets, unit="m")
-    
-    def _create_team_communication(self, **kwargs) -> TimeSeriesPanel:
-        targets = [
-            PanelTarget(
-                expr="nestory:chat_messages_per_hour",
-                legend_format="Messages/Hour"
-            ),
-            PanelTarget(
-                expr="nestory:active_team_members",
-                legend_format="Active Members",
-                ref_id="B"
-            )
-        ]
-        return TimeSeriesPanel("team_communication", "Team Communication", targets, unit="short")
-    
-    def _create_knowledge_sharing(self, **kwargs) -> StatPanel:
-        targets = [PanelTarget(
-            expr="nestory:knowledge_articles_created",
-            legend_format="Articles Created"
-        )]
-        return StatPanel("knowledge_sharing", "Knowledge Sharing", targets, unit="short")
-    
-    def _create_on_call_metrics(self, **kwargs) -> TimeSeriesPanel:
-        targets = [
-            PanelTarget(
-                expr="nestory:on_call_alerts",
-                legend_format="On-call Alerts"
-            ),
-            PanelTarget(
-                expr="nestory:escalations",
-                legend_format="Escalations",
-                ref_id="B"
-            )
-        ]
-        return TimeSeriesPanel("on_call_metrics", "On-call Metrics", targets, unit="short")
-    
-    def _create_collaboration_health(self, **kwargs) -> GaugePanel:
-        targets = [PanelTarget(
-            expr="nestory:collaboration_health_score",
-            legend_format="Collaboration Health"
-        )]
-        return GaugePanel("collaboration_health", "Collaboration Health", targets, min_val=0, max_val=100)
-    
-    def _create_system_load(self, **kwargs) -> TimeSeriesPanel:
-        targets = [
-            PanelTarget(
-                expr="node_load5",
-                legend_format="Load Average (5min)"
-            ),
-            PanelTarget(
-                expr="100 * (node_memory_MemAvailable_bytes / node_memory_MemTotal_bytes)",
-                legend_format="Free Memory %",
-                ref_id="B"
-            )
-        ]
-        return TimeSeriesPanel("system_load", "System Load & Free Memory", targets)
-    
-    def _create_build_timeline(self, **kwargs) -> TimeSeriesPanel:
-        targets = [PanelTarget(
-            expr="nestory_build_duration_seconds",
-            legend_format="{{scheme}}-{{configuration}}"
-        )]
-        return TimeSeriesPanel("build_timeline", "Build Performance Timeline", targets, unit="s")
-    
-    def _create_build_duration_heatmap(self, **kwargs) -> Dict[str, Any]:
-        # Heatmap panels need special handling
+    def generate_panel(self, grid_pos: GridPosition, **kwargs) -> Dict[str, Any]:
         return {
-            "datasource": {"type": "prometheus", "uid": "PBFA97CFB590B2093"},
-            "fieldConfig": {"defaults": {"custom": {"hideFrom": {"legend": False, "tooltip": False, "viz": False}}}},
-            "gridPos": {"h": 8, "w": 12, "x": 0, "y": 0},
-            "id": hash("build_duration_heatmap") % 10000,
+            "datasource": PROMETHEUS_DATASOURCE,
+            "fieldConfig": HEATMAP_FIELD_CONFIG,
+            "gridPos": grid_pos.to_json(),
+            "id": kwargs.get("panel_id") or stable_panel_id(self.component_id),
             "options": {
                 "calculate": False,
                 "cellGap": 1,
-                "color": {"mode": "scheme", "scheme": "Spectral"},
-                "yAxis": {"unit": "s"}
+                "color": HEATMAP_COLOR,
+                "yAxis": {"unit": self.unit}
             },
-            "targets": [{
-                "expr": "sum by (le) (rate(nestory_build_duration_seconds_bucket[5m]))",
-                "format": "heatmap",
-                "refId": "A"
-            }],
-            "title": "Build Duration Heatmap",
+            "targets": [
+                {"expr": target.expr, "format": "heatmap", "refId": target.ref_id}
+                for target in self.targets
+            ],
+            "title": self.title,
             "type": "heatmap"
         }
+
+# Component classes for each catalog panel type
+PANEL_TYPES = {
+    "stat": StatPanel,
+    "timeseries": TimeSeriesPanel,
+    "gauge": GaugePanel,
+    "heatmap": HeatmapPanel,
+}
+
+class ComponentLibrary:
+    """Library of reusable dashboard components"""
+    
+    def __init__(self, catalog: Optional[Dict[str, ComponentSpec]] = None):
+        self.components = {}
+        self.templates = {}
+        self._catalog = catalog
+    
+    @property
+    def catalog(self) -> Dict[str, ComponentSpec]:
+        """Compiled component specs, loaded on first use; components are only
+        instantiated when a template asks for them"""
+        if self._catalog is None:
+            self._catalog = load_catalog()
+        return self._catalog
+    
+    def reload_catalog(self) -> Set[str]:
+        """Re-read the catalog files and return the names of components whose spec changed"""
+        previous = self.catalog
+        self._catalog = load_catalog()
+        return {name for name in set(previous) | set(self._catalog) if previous.get(name) != self._catalog.get(name)}
     
-    def _create_response_time_distribution(self, **kwargs) -> TimeSeriesPanel:
-        targets = [
-            PanelTarget(
-                expr="histogram_quantile(0.50, sum by (le) (rate(nestory_http_request_duration_seconds_bucket[5m]))) * 1000",
-                legend_format="p50"
-            ),
-            PanelTarget(
-                expr="histogram_quantile(0.95, sum by (le) (rate(nestory_http_request_duration_seconds_bucket[5m]))) * 1000",
-                legend_format="p95",
-                ref_id="B"
-            ),
-            PanelTarget(
-                expr="histogram_quantile(0.99, sum by (le) (rate(nestory_http_request_duration_seconds_bucket[5m]))) * 1000",
-                legend_format="p99",
-                ref_id="C"
-            )
-        ]
-        return TimeSeriesPanel("response_time_distribution", "Response Time Distribution", targets, unit="ms")
-    
-    def _create_cache_hit_ratio(self, **kwargs) -> GaugePanel:
-        targets = [PanelTarget(
-            expr="100 * sum(rate(nestory_cache_hits_total[5m])) / clamp_min(sum(rate(nestory_cache_requests_total[5m])), 1)",
-            legend_format="Cache Hit Ratio"
-        )]
-        return GaugePanel("cache_hit_ratio", "Cache Hit Ratio", targets)
+    def register_component(self, name: str, factory_func):
+        """Register a component factory function, taking precedence over the catalog"""
+        self.components[name] = factory_func
+    
+    def names(self) -> List[str]:
+        """Names of every available component"""
+        return sorted(set(self.catalog) | set(self.components))
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self.components or name in self.catalog
+    
+    def create_component(self, name: str, **kwargs) -> DashboardComponent:
+        """Create a component instance"""
+        if name in self.components:
+            return self.components[name](**kwargs)
+        if name not in self.catalog:
+            raise ValueError(f"Unknown component: {name}")
+        
+        spec = self.catalog[name]
+        targets = [PanelTarget(**target) for target in spec["targets"]]
+        return PANEL_TYPES[spec["type"]](name, spec["title"], targets, **spec["options"])
+
+def environment_slice(environment: str) -> Dict[str, Any]:
+    """The parts of the environment config that end up in a dashboard"""
+    env_config = get_config_manager().get_environment_config(environment)
+    return {
+        "environment": environment,
+        "prometheus_url": env_config.get("prometheus_url", "http://localhost:9090")
+    }
+
+# Shared library instance
+_component_library = None
+
+def get_component_library() -> ComponentLibrary:
+    """Get the process-wide component library instance"""
+    global _component_library
+    if _component_library is None:
+        _component_library = ComponentLibrary()
+    return _component_library
 
 class DashboardTemplate:
     """Dashboard template with modular components"""
     
-    def __init__(self, template_name: str, title: str, description: str = ""):
+    def __init__(self, template_name: str, title: str, description: str = "",
+                 component_library: Optional[ComponentLibrary] = None):
         self.template_name = template_name
         self.title = title
         self.description = description
         self.sections = []
-        self.component_library = ComponentLibrary()
-    
-    def add_section(self, section_title: str, components: List[Dict[str, Any]]):
-        """Add a section with components to the dashboard"""
-        self.sections.append({
+        self.component_library = component_library or get_component_library()
+        self.shared_queries: List[Dict[str, Any]] = []
+        self.library_elements: Dict[str, Dict[str, Any]] = {}
+        self.component_errors: List[Dict[str, str]] = []
+    
+    def add_section(self, section_title: str, components: List[Dict[str, Any]],
+                    layout: str = "grid", prioritize: bool = False, collapsed: bool = False):
+        """Add a section with components to the dashboard.
+        
+        layout is "grid" (fill rows left to right) or "skyline" (bin-pack into the lowest gap);
+        with prioritize, components are placed by descending "priority" so critical panels
+        land above the fold. A collapsed section nests its panels in the row, and Grafana
+        only queries them once the row is expanded.
+        """
+        if layout not in SECTION_LAYOUTS:
+            raise ValueError(f"Unknown section layout '{layout}', expected one of {SECTION_LAYOUTS}")
+        
+        section = {
             "title": section_title,
             "components": components
+        }
+        if layout != "grid":
+            section["layout"] = layout
+        if prioritize:
+            section["prioritize"] = True
+        if collapsed:
+            section["collapsed"] = True
+        self.sections.append(section)
+    
+    @staticmethod
+    def _placement_order(section: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Components in the order they are placed; sorting is stable so ties keep template order"""
+        if section.get("prioritize"):
+            return sorted(section["components"], key=lambda config: -config.get("priority", 0))
+        return section["components"]
+    
+    def _component_fingerprint(self, component_name: str) -> str:
+        """Digest of a component's factory output"""
+        return self._fingerprint_component(self.component_library.create_component(component_name))
+    
+    @staticmethod
+    def _fingerprint_component(component: Any) -> str:
+        """Digest of a component already created by its factory"""
+        if isinstance(component, DashboardComponent):
+            return component.fingerprint()
+        # Raw panel factories: id and gridPos are always overwritten by the layout
+        return fingerprint({key: value for key, value in component.items() if key not in ("id", "gridPos")})
+    
+    def cache_key(self, environment: str, recording_rules: Optional[RecordingRuleSet] = None,
+                  render_options: Optional[Dict[str, Any]] = None) -> str:
+        """Digest of sections, component factory output, environment config slice, query rewrites
+        and the render options passed to generate_dashboard"""
+        component_names = sorted({
+            component_config["name"]
+            for section in self.sections
+            for component_config in section["components"]
         })
-    
-    def generate_dashboard(self, environment: str = "dev") -> Dict[str, Any]:
-        """Generate complete dashboard JSON"""
-        config_manager = get_config_manager()
-        env_config = config_manager.get_environment_config(environment)
+        
+        component_fingerprints = {}
+        for component_name in component_names:
+            try:
+                component_fingerprints[component_name] = self._component_fingerprint(component_name)
+            except Exception as e:
+                component_fingerprints[component_name] = f"error: {e}"
+        
+        return fingerprint(
+            GENERATOR_FINGERPRINT,
+            [self.template_name, self.title, self.description],
+            self.sections,
+            component_fingerprints,
+            environment_slice(environment),
+            recording_rules.fingerprint() if recording_rules else None,
+            render_options or {}
+        )
+    
+    def _render_panel(self, component_name: str, component: Any, grid_pos: GridPosition) -> Dict[str, Any]:
+        """Render a component into panel JSON"""
+        if isinstance(component, dict):
+            # Raw panel factories registered with register_component return finished JSON
+            return {**component, "gridPos": grid_pos.to_json()}
+        return component.generate_panel(grid_pos)
+    
+    def generate_dashboard(self, environment: str = "dev",
+                           build_cache: Optional[DashboardBuildCache] = None,
+                           recording_rules: Optional[RecordingRuleSet] = None,
+                           share_queries: bool = True, library_panels: bool = False,
+                           strict: bool = False) -> Dict[str, Any]:
+        """Generate complete dashboard JSON, reusing unchanged panels from build_cache,
+        rewriting queries to precomputed series from recording_rules and, with
+        share_queries, running each distinct query once via the -- Dashboard -- datasource.
+        
+        With library_panels, component panels become references to Grafana library panels
+        whose models are left in self.library_elements for publishing.
+        
+        A component that fails is left out and recorded in self.component_errors, or
+        re-raised with strict. Inside a PanelProfiler every component is timed and measured.
+        """
+        env_config = environment_slice(environment)
+        profiler = active_profiler()
+        profiled = []
+        self.component_errors = []
         
         # Base dashboard structure
         dashboard = {
@@ -817,7 +583,7 @@ class DashboardTemplate:
                     "targetBlank": True,
                     "title": "Prometheus",
                     "type": "link",
-                    "url": env_config.get("prometheus_url", "http://localhost:9090")
+                    "url": env_config["prometheus_url"]
                 }
             ],
             "panels": [],
@@ -833,46 +599,91 @@ class DashboardTemplate:
         
         # Generate panels from sections
         layout = DashboardLayout()
-        panel_id = 1
+        panel_ids = PanelIdAllocator()
+        component_panels = []
         
         for section in self.sections:
             # Add section row
+            collapsed = section.get("collapsed", False)
             section_row = {
-                "collapsed": False,
-                "gridPos": asdict(layout.next_position(24, 1)),
-                "id": panel_id,
+                "collapsed": collapsed,
+                "gridPos": layout.next_position(24, 1).to_json(),
+                "id": panel_ids.allocate(self.template_name, section["title"]),
                 "panels": [],
                 "title": section["title"],
                 "type": "row"
             }
             dashboard["panels"].append(section_row)
-            panel_id += 1
             
             # Add components in this section
             layout.add_row_break()
+            if section.get("layout") == "skyline":
+                packer = SkylineLayout(layout.columns, origin_y=layout.bottom)
+            else:
+                packer = DashboardLayout(layout.columns, origin_y=layout.bottom)
+            # Panels of a collapsed row live inside it and take no space until expanded
+            section_panels = section_row["panels"] if collapsed else dashboard["panels"]
             
-            for component_config in section["components"]:
+            for component_config in self._placement_order(section):
                 component_name = component_config["name"]
                 component_size = component_config.get("size", {"width": 8, "height": 8})
+                profile = (profiler.start(self.template_name, environment, section["title"], component_name)
+                           if profiler is not None else None)
                 
                 try:
+                    started = time.perf_counter()
                     component = self.component_library.create_component(component_name)
-                    grid_pos = layout.next_position(component_size["width"], component_size["height"])
+                    created = time.perf_counter()
+                    grid_pos = packer.next_position(component_size["width"], component_size["height"])
                     
-                    if component_name == "build_duration_heatmap":
-                        # Special handling for heatmap
-                        panel = self.component_library._create_build_duration_heatmap()
-                        panel["gridPos"] = asdict(grid_pos)
-                        panel["id"] = panel_id
+                    if build_cache is not None:
+                        hits = build_cache.hits
+                        panel_key = fingerprint(GENERATOR_FINGERPRINT, self._fingerprint_component(component))
+                        panel = build_cache.panel(
+                            panel_key, lambda: self._render_panel(component_name, component, grid_pos)
+                        )
+                        panel["gridPos"] = grid_pos.to_json()
                     else:
-                        panel = component.generate_panel(grid_pos)
-                        panel["id"] = panel_id
+                        panel = self._render_panel(component_name, component, grid_pos)
+                    panel["id"] = panel_ids.allocate(self.template_name, section["title"], component_name)
+                    
+                    if profile is not None:
+                        profile.create_seconds = created - started
+                        profile.render_seconds = time.perf_counter() - created
+                        profile.cached = build_cache is not None and build_cache.hits > hits
+                        profiled.append((profile, panel))
                     
-                    dashboard["panels"].append(panel)
-                    panel_id += 1
+                    section_panels.append(panel)
+                    component_panels.append((component_name, panel))
                     
                 except Exception as e:
-                    print(f"⚠️ Failed to create component '{component_name}': {e}")
+                    if strict:
+                        raise RuntimeError(f"Component '{component_name}' in section "
+                                           f"'{section['title']}' failed: {e}") from e
+                    error = f"{type(e).__name__}: {e}"
+                    self.component_errors.append(
+                        {"component": component_name, "section": section["title"], "error": error})
+                    if profile is not None:
+                        profile.error = error
+                    print(f"⚠️ Failed to create component '{component_name}': {error}")
+            
+            if not collapsed:
+                layout.continue_below(packer.bottom)
+        
+        if recording_rules is not None:
+            recording_rules.rewrite_panels(dashboard["panels"])
+        
+        # Rewriting can make queries identical, so share after it
+        if share_queries:
+            self.shared_queries = share_duplicate_queries(dashboard["panels"])
+        
+        # Last, so library models carry rewritten queries and bound panels stay inline
+        if library_panels:
+            self.library_elements = link_library_panels(component_panels)
+        
+        # Sizes are measured on the final panels, after rewriting, sharing and linking
+        for profile, panel in profiled:
+            profiler.measure_output(profile, panel)
         
         return dashboard
 
@@ -901,7 +712,7 @@ def create_unified_template() -> DashboardTemplate:
         {"name": "network_throughput", "size": {"width": 8, "height": 6}},
         {"name": "disk_usage", "size": {"width": 12, "height": 4}},
         {"name": "resource_optimization", "size": {"width": 12, "height": 4}}
-    ])
+    ], collapsed=True)
     
     # AI-Powered Analytics & Predictions
     template.add_section("AI Analytics & Predictions", [
@@ -910,7 +721,7 @@ def create_unified_template() -> DashboardTemplate:
         {"name": "capacity_forecasting", "size": {"width": 8, "height": 6}},
         {"name": "failure_prediction", "size": {"width": 12, "height": 4}},
         {"name": "optimization_suggestions", "size": {"width": 12, "height": 4}}
-    ])
+    ], collapsed=True)
     
     # Security & Compliance
     template.add_section("Security & Compliance", [
@@ -919,7 +730,7 @@ def create_unified_template() -> DashboardTemplate:
         {"name": "compliance_status", "size": {"width": 8, "height": 6}},
         {"name": "threat_detection", "size": {"width": 12, "height": 4}},
         {"name": "access_audit", "size": {"width": 12, "height": 4}}
-    ])
+    ], collapsed=True)
     
     # Developer Experience (DevEx)
     template.add_section("Developer Experience", [
@@ -929,7 +740,7 @@ def create_unified_template() -> DashboardTemplate:
         {"name": "change_failure_rate", "size": {"width": 6, "height": 4}},
         {"name": "developer_velocity", "size": {"width": 12, "height": 6}},
         {"name": "code_quality_trends", "size": {"width": 12, "height": 6}}
-    ])
+    ], collapsed=True)
     
     # Cost Optimization & Intelligence
     template.add_section("Cost Intelligence", [
@@ -938,7 +749,7 @@ def create_unified_template() -> DashboardTemplate:
         {"name": "cost_trends", "size": {"width": 8, "height": 6}},
         {"name": "savings_opportunities", "size": {"width": 12, "height": 4}},
         {"name": "budget_alerts", "size": {"width": 12, "height": 4}}
-    ])
+    ], collapsed=True)
     
     # Application Performance & Reliability
     template.add_section("Application Performance", [
@@ -947,7 +758,7 @@ def create_unified_template() -> DashboardTemplate:
         {"name": "cache_hit_ratio", "size": {"width": 8, "height": 6}},
         {"name": "database_performance", "size": {"width": 12, "height": 4}},
         {"name": "api_health", "size": {"width": 12, "height": 4}}
-    ])
+    ], collapsed=True)
     
     # Build & CI/CD Intelligence
     template.add_section("CI/CD Intelligence", [
@@ -956,7 +767,7 @@ def create_unified_template() -> DashboardTemplate:
         {"name": "pipeline_efficiency", "size": {"width": 8, "height": 6}},
         {"name": "test_coverage_trends", "size": {"width": 12, "height": 4}},
         {"name": "deployment_success", "size": {"width": 12, "height": 4}}
-    ])
+    ], collapsed=True)
     
     # Collaboration & ChatOps
     template.add_section("Collaboration & ChatOps", [
@@ -965,7 +776,7 @@ def create_unified_template() -> DashboardTemplate:
         {"name": "knowledge_sharing", "size": {"width": 8, "height": 6}},
         {"name": "on_call_metrics", "size": {"width": 12, "height": 4}},
         {"name": "collaboration_health", "size": {"width": 12, "height": 4}}
-    ])
+    ], collapsed=True)
     
     return template
 
@@ -990,19 +801,19 @@ def create_comprehensive_template() -> DashboardTemplate:
         {"name": "cpu_memory_usage", "size": {"width": 12, "height": 8}},
         {"name": "system_load", "size": {"width": 12, "height": 8}},
         {"name": "disk_usage", "size": {"width": 24, "height": 4}}
-    ])
+    ], collapsed=True)
     
     # Build & CI/CD Section
     template.add_section("Build & CI/CD Performance", [
         {"name": "build_timeline", "size": {"width": 12, "height": 8}},
         {"name": "build_duration_heatmap", "size": {"width": 12, "height": 8}}
-    ])
+    ], collapsed=True)
     
     # Application Performance Section
     template.add_section("Application Performance", [
         {"name": "response_time_distribution", "size": {"width": 12, "height": 8}},
         {"name": "cache_hit_ratio", "size": {"width": 12, "height": 8}}
-    ])
+    ], collapsed=True)
     
     return template
 
@@ -1035,46 +846,326 @@ def create_production_template() -> DashboardTemplate:
     
     return template
 
+TEMPLATE_FACTORIES = {
+    "comprehensive": create_comprehensive_template,
+    "production": create_production_template,
+    "unified": create_unified_template,
+}
+
+def load_environment_names() -> List[str]:
+    """List the environments defined in config/environments.json"""
+    with open(ENVIRONMENTS_PATH, 'r') as f:
+        return list(json.load(f).keys())
+
+@dataclass
+class BuildOptions:
+    """Options shared by single and matrix dashboard builds"""
+    use_cache: bool = True
+    recording_rules: bool = False
+    # Per-refresh PromQL cost a dashboard may not exceed; None builds without a budget
+    cost_budget: Optional[float] = DEFAULT_COST_BUDGET
+    share_queries: bool = True
+    library_panels: bool = False
+    profile: bool = False
+    strict: bool = False
+    
+    def render_options(self) -> Dict[str, Any]:
+        """Options that change generated output, for the build cache key"""
+        return {"share_queries": self.share_queries, "library_panels": self.library_panels}
+
+def build_dashboard(template_name: str, environment: str, output_path: Path,
+                    options: Optional[BuildOptions] = None) -> Dict[str, Any]:
+    """Generate a single template/environment dashboard and write it to disk if it changed"""
+    started = time.perf_counter()
+    output_path = Path(output_path)
+    options = options or BuildOptions()
+    
+    template = TEMPLATE_FACTORIES[template_name]()
+    recording_rules = load_rule_set() if options.recording_rules else None
+    build_cache = DashboardBuildCache.for_output(output_path) if options.use_cache else None
+    dashboard_key = (template.cache_key(environment, recording_rules, options.render_options())
+                     if options.use_cache else None)
+    
+    if build_cache is not None and build_cache.is_fresh(dashboard_key, output_path):
+        query_cost = None
+        if options.cost_budget is not None:
+            cost = analyze_file(output_path)
+            check_budget(cost, options.cost_budget)
+            query_cost = cost.cost_per_refresh
+        finished = time.perf_counter()
+        return {
+            "template": template_name,
+            "environment": environment,
+            "output": str(output_path),
+            "uid": f"nry-{template.template_name}-{environment}",
+            "panels": None,
+            "status": "cached",
+            "query_cost": query_cost,
+            "queries_on_open": None,
+            "shared_queries": None,
+            "component_errors": None,
+            "profile": None,
+            "generate_seconds": finished - started,
+            "write_seconds": 0.0,
+            "total_seconds": finished - started,
+            "pid": os.getpid()
+        }
+    
+    with PanelProfiler() if options.profile else nullcontext() as profiler:
+        dashboard_json = template.generate_dashboard(environment, build_cache=build_cache,
+                                                     recording_rules=recording_rules,
+                                                     share_queries=options.share_queries,
+                                                     library_panels=options.library_panels,
+                                                     strict=options.strict)
+    generated = time.perf_counter()
+    
+    # Refuse to write dashboards that would hammer Prometheus
+    cost = analyze_dashboard({**dashboard_json, "panels": resolve_library_panels(
+        dashboard_json["panels"], template.library_elements)})
+    if options.cost_budget is not None:
+        check_budget(cost, options.cost_budget)
+    
+    # Library panels first, so a written dashboard never references a missing model
+    write_library_elements(library_dir_for(output_path), template.library_elements)
+    changed = write_json(output_path, dashboard_json)
+    if build_cache is not None:
+        # A dashboard missing failed components is rebuilt, and its failures reported, next time
+        if not template.component_errors:
+            build_cache.record_output(dashboard_key, output_path)
+        build_cache.save()
+    finished = time.perf_counter()
+    
+    return {
+        "template": template_name,
+        "environment": environment,
+        "output": str(output_path),
+        "uid": dashboard_json["uid"],
+        "panels": len(dashboard_json["panels"]),
+        "status": "written" if changed else "unchanged",
+        "query_cost": cost.cost_per_refresh,
+        "queries_on_open": cost.queries_on_open,
+        "shared_queries": len(template.shared_queries),
+        "component_errors": template.component_errors,
+        "profile": [asdict(profile) for profile in profiler.profiles] if profiler else None,
+        "generate_seconds": generated - started,
+        "write_seconds": finished - generated,
+        "total_seconds": finished - started,
+        "pid": os.getpid()
+    }
+
+def _warm_matrix_worker():
+    """Pay the config manager and component library cold start once per worker"""
+    get_config_manager()
+    get_component_library()
+
+def build_matrix(templates: Optional[List[str]] = None, environments: Optional[List[str]] = None,
+                 output_dir: Optional[Path] = None, max_workers: Optional[int] = None,
+                 options: Optional[BuildOptions] = None) -> List[Dict[str, Any]]:
+    """Generate every template × environment combination in a process pool"""
+    templates = templates or list(TEMPLATE_FACTORIES)
+    environments = environments or load_environment_names()
+    output_dir = Path(output_dir) if output_dir else DASHBOARDS_DIR
+    
+    jobs = [(template_name, environment) for template_name in templates for environment in environments]
+    results = []
+    
+    with ProcessPoolExecutor(max_workers=max_workers or min(len(jobs), os.cpu_count() or 1),
+                             initializer=_warm_matrix_worker) as pool:
+        futures = {
+            pool.submit(build_dashboard, template_name, environment,
+                        output_dir / f"{template_name}-{environment}.json", options): (template_name, environment)
+            for template_name, environment in jobs
+        }
+        
+        for future in as_completed(futures):
+            template_name, environment = futures[future]
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append({"template": template_name, "environment": environment, "error": str(e)})
+    
+    return sorted(results, key=lambda r: (r["template"], r["environment"]))
+
+def print_matrix_report(results: List[Dict[str, Any]], wall_seconds: float):
+    """Print per-artifact timing for a matrix build"""
+    print(f"{'Template':<15} {'Env':<8} {'Panels':>6} {'Generate':>10} {'Write':>8} {'Total':>8} "
+          f"{'Cost':>7} {'Open':>5}  {'Status':<9} Output")
+    print("─" * 104)
+    for result in results:
+        if "error" in result:
+            print(f"{result['template']:<15} {result['environment']:<8} ❌ {result['error']}")
+            continue
+        panels = "-" if result["panels"] is None else result["panels"]
+        query_cost = "-" if result["query_cost"] is None else f"{result['query_cost']:.1f}"
+        on_open = "-" if result["queries_on_open"] is None else result["queries_on_open"]
+        print(f"{result['template']:<15} {result['environment']:<8} {panels:>6} "
+              f"{result['generate_seconds'] * 1000:>8.1f}ms {result['write_seconds'] * 1000:>6.1f}ms "
+              f"{result['total_seconds'] * 1000:>6.1f}ms {query_cost:>7} {on_open:>5}  {result['status']:<9} "
+              f"{Path(result['output']).name}")
+    print("─" * 104)
+    
+    built = [r for r in results if "error" not in r]
+    serial_seconds = sum(r["total_seconds"] for r in built)
+    written = sum(1 for r in built if r["status"] == "written")
+    print(f"✅ Built {len(built)}/{len(results)} dashboards in {wall_seconds:.2f}s "
+          f"(render time {serial_seconds:.2f}s across workers, {written} rewritten)")
+    print_component_errors(built)
+
+def print_component_errors(results: List[Dict[str, Any]]):
+    """List the components left out of built dashboards because they failed"""
+    for result in results:
+        for failure in result.get("component_errors") or []:
+            print(f"⚠️ {result['template']}-{result['environment']}: component '{failure['component']}' "
+                  f"in '{failure['section']}' left out: {failure['error']}")
+
+def report_profile(results: List[Dict[str, Any]], sort_by: str = "time", output: Optional[Path] = None,
+                   push: bool = False, limit: Optional[int] = None):
+    """Print, write and push the component profiles collected by profiled builds"""
+    profiles = profiles_from_dicts(row for result in results for row in result.get("profile") or [])
+    if not profiles:
+        print("⚠️ No components profiled: cached dashboards are not regenerated, use --no-cache")
+        return
+    
+    print_profile_report(profiles, sort_by, limit)
+    if output:
+        write_profile_report(output, profiles, sort_by)
+        print(f"📝 Profile written: {output}")
+    if push:
+        # Each environment's Pushgateway gets the profiles of that environment's dashboards
+        for environment in sorted({profile.environment for profile in profiles}):
+            pushgateway_url = get_config_manager().get_environment_config(environment).get("pushgateway_url")
+            if not pushgateway_url:
+                print(f"⚠️ No pushgateway_url for {environment}")
+                continue
+            if push_profiles([p for p in profiles if p.environment == environment], pushgateway_url,
+                             grouping={"environment": environment}):
+                print(f"📤 Pushed {environment} profile to {pushgateway_url}")
+
+def synthesize_recording_rules(output_path: Path = GENERATED_RULES_PATH, environment: str = "dev",
+                               min_occurrences: int = 2) -> RecordingRuleSet:
+    """Synthesize recording rules for the costly queries of every template"""
+    synthesizer = RecordingRuleSynthesizer(RecordingRuleSet.load(HAND_WRITTEN_RULES_PATH), min_occurrences)
+    for factory in TEMPLATE_FACTORIES.values():
+        synthesizer.add_dashboard(factory().generate_dashboard(environment))
+    
+    generated = synthesizer.synthesize()
+    write_if_changed(output_path, generated.to_yaml())
+    return generated
+
 # Command line interface
-if __name__ == "__main__":
-    import sys
+def main():
     import argparse
     
     parser = argparse.ArgumentParser(description="Generate modular Grafana dashboards")
-    parser.add_argument("--template", choices=["comprehensive", "production", "unified"], default="unified",
+    parser.add_argument("--template", choices=list(TEMPLATE_FACTORIES), default="unified",
                        help="Dashboard template to generate")
     parser.add_argument("--environment", choices=["dev", "staging", "prod"], default="dev",
                        help="Target environment")
     parser.add_argument("--output", type=str, default=None,
                        help="Output file path (default: dashboards/{template}-{env}.json)")
+    parser.add_argument("--matrix", action="store_true",
+                       help="Build every template for every environment in config/environments.json")
+    parser.add_argument("--templates", nargs="+", choices=list(TEMPLATE_FACTORIES), default=None,
+                       help="Restrict --matrix to these templates")
+    parser.add_argument("--environments", nargs="+", default=None,
+                       help="Restrict --matrix to these environments")
+    parser.add_argument("--workers", type=int, default=None,
+                       help="Worker processes for --matrix (default: one per artifact, up to CPU count)")
+    parser.add_argument("--output-dir", type=str, default=None,
+                       help="Output directory for --matrix (default: dashboards/)")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="Ignore the build cache and re-render every panel")
+    parser.add_argument("--recording-rules", action="store_true",
+                       help="Rewrite panel queries to use recorded nestory:* series")
+    parser.add_argument("--synthesize-rules", action="store_true",
+                       help="Generate config/prometheus-generated-rules.yml from panel queries")
+    parser.add_argument("--min-occurrences", type=int, default=2,
+                       help="Repeats before a plain aggregation gets a recording rule (default: 2)")
+    parser.add_argument("--no-shared-queries", action="store_true",
+                       help="Do not bind duplicate panel queries to a single source panel")
+    parser.add_argument("--library-panels", action="store_true",
+                       help="Reference components as Grafana library panels written to <output dir>/library/")
+    parser.add_argument("--cost-budget", type=float, default=DEFAULT_COST_BUDGET,
+                       help="Fail when a dashboard's estimated PromQL cost per refresh exceeds this budget "
+                            f"(default: {DEFAULT_COST_BUDGET:g})")
+    parser.add_argument("--no-cost-budget", action="store_true",
+                       help="Build without checking the PromQL cost budget")
+    parser.add_argument("--strict", action="store_true",
+                       help="Fail the build when a component cannot be generated instead of leaving it out")
+    parser.add_argument("--profile", action="store_true",
+                       help="Report per-component render time, JSON size and target count")
+    parser.add_argument("--profile-sort", choices=sorted(SORT_KEYS), default="time",
+                       help="Order of the --profile report, worst first (default: time)")
+    parser.add_argument("--profile-top", type=int, default=None,
+                       help="Only print the worst N components of the --profile report")
+    parser.add_argument("--profile-output", type=str, default=None,
+                       help="Also write the --profile report to this .csv or .json file")
+    parser.add_argument("--push-profile", action="store_true",
+                       help="Push --profile numbers to each environment's Pushgateway")
+    parser.add_argument("--watch", action="store_true",
+                       help="Keep running and regenerate dashboards affected by environment or catalog edits")
+    parser.add_argument("--push", action="store_true",
+                       help="With --watch, upload regenerated dashboards to Grafana")
+    parser.add_argument("--debounce", type=float, default=1.0,
+                       help="With --watch, seconds without edits before rebuilding (default: 1.0)")
     
     args = parser.parse_args()
-    
-    # Generate dashboard
-    if args.template == "comprehensive":
-        template = create_comprehensive_template()
-    elif args.template == "production":
-        template = create_production_template()
-    elif args.template == "unified":
-        template = create_unified_template()
-    else:
-        print(f"Unknown template: {args.template}")
-        sys.exit(1)
-    
-    dashboard_json = template.generate_dashboard(args.environment)
+    options = BuildOptions(use_cache=not args.no_cache, recording_rules=args.recording_rules,
+                           cost_budget=None if args.no_cost_budget else args.cost_budget, share_queries=not args.no_shared_queries,
+                           library_panels=args.library_panels, profile=args.profile or args.push_profile,
+                           strict=args.strict)
+    
+    if args.synthesize_rules:
+        generated = synthesize_recording_rules(min_occurrences=args.min_occurrences)
+        print(f"✅ Synthesized {len(generated.rules)} recording rules: {GENERATED_RULES_PATH}")
+        for rule in generated.rules:
+            print(f"   • {rule['record']}")
+        if not args.matrix:
+            return
+    
+    if args.watch:
+        from dashboard_watcher import watch
+        watch(args.templates, args.environments, args.output_dir, options, push=args.push,
+              debounce_seconds=args.debounce)
+        return
+    
+    if args.matrix:
+        started = time.perf_counter()
+        results = build_matrix(args.templates, args.environments, args.output_dir, args.workers, options)
+        print_matrix_report(results, time.perf_counter() - started)
+        if options.profile:
+            report_profile(results, args.profile_sort, args.profile_output, args.push_profile, args.profile_top)
+        if any("error" in result for result in results):
+            sys.exit(1)
+        return
     
     # Determine output path
     if args.output:
         output_path = Path(args.output)
     else:
-        output_path = Path(__file__).parent.parent / "dashboards" / f"{args.template}-{args.environment}.json"
+        output_path = DASHBOARDS_DIR / f"{args.template}-{args.environment}.json"
     
-    # Write dashboard
-    output_path.parent.mkdir(exist_ok=True)
-    with open(output_path, 'w') as f:
-        json.dump(dashboard_json, f, indent=2)
+    # Generate and write dashboard
+    try:
+        result = build_dashboard(args.template, args.environment, output_path, options)
+    except (CostBudgetExceeded, RuntimeError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
     
-    print(f"✅ Generated dashboard: {output_path}")
+    if result["status"] == "written":
+        print(f"✅ Generated dashboard: {output_path}")
+    else:
+        print(f"✅ Dashboard up to date ({result['status']}): {output_path}")
     print(f"📊 Template: {args.template}")
     print(f"🌍 Environment: {args.environment}")
-    print(f"🏷️ UID: {dashboard_json['uid']}")
\ No newline at end of file
+    print(f"🏷️ UID: {result['uid']}")
+    if result["queries_on_open"] is not None:
+        print(f"🚪 Queries on open: {result['queries_on_open']} (collapsed rows query on expand)")
+    if result["shared_queries"]:
+        print(f"🔗 Shared queries: {result['shared_queries']} panels read from another panel's results")
+    print_component_errors([result])
+    if options.profile:
+        report_profile([result], args.profile_sort, args.profile_output, args.push_profile, args.profile_top)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Grafana Dashboard Inventory
+Pages through /api/search lazily, filtered by folder and tag on the server, and exports
+full dashboard bodies concurrently as the pages arrive
+"""
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional
+
+from json_serializer import write_json
+from grafana_transport import RequestException
+
+# Grafana caps search pages at 5000 hits
+DEFAULT_PAGE_SIZE = 500
+DEFAULT_EXPORT_CONCURRENCY = 8
+# Export subdirectory of dashboards in the General folder
+GENERAL_FOLDER = "general"
+
+def iter_dashboards(client: Any, folder_uids: Optional[List[str]] = None, tags: Optional[List[str]] = None,
+                    query: Optional[str] = None, page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+    """Yield dashboard search hits one page at a time; the next page is requested only
+    once the previous one is consumed.
+
+    Raises grafana_transport.RequestException if a page cannot be fetched.
+    """
+    params: Dict[str, Any] = {"type": "dash-db", "limit": page_size}
+    if folder_uids:
+        params["folderUIDs"] = folder_uids
+    if tags:
+        # Grafana returns dashboards carrying every given tag
+        params["tag"] = tags
+    if query:
+        params["query"] = query
+
+    page = 1
+    while True:
+        response = client.get("/api/search", params={**params, "page": page})
+        response.raise_for_status()
+        hits = response.json()
+        yield from hits
+        if len(hits) < page_size:
+            return
+        page += 1
+
+def export_path(output_dir: Path, hit: Dict[str, Any]) -> Path:
+    """Where export_dashboards writes a search hit: one subdirectory per folder UID"""
+    return Path(output_dir) / (hit.get("folderUid") or GENERAL_FOLDER) / f"{hit['uid']}.json"
+
+def fetch_dashboard(client: Any, hit: Dict[str, Any]) -> Dict[str, Any]:
+    """Body and meta of one search hit's dashboard, or the error that prevented fetching it"""
+    try:
+        response = client.get(f"/api/dashboards/uid/{hit['uid']}")
+        response.raise_for_status()
+        body = response.json()
+        return {"hit": hit, "dashboard": body["dashboard"], "meta": body.get("meta", {})}
+    except (RequestException, ValueError, KeyError) as e:
+        return {"hit": hit, "error": str(e)}
+
+def iter_dashboard_bodies(client: Any, folder_uids: Optional[List[str]] = None, tags: Optional[List[str]] = None,
+                          concurrency: int = DEFAULT_EXPORT_CONCURRENCY,
+                          page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+    """Yield fetch_dashboard results for every matching dashboard as each body arrives.
+
+    Bodies are fetched concurrently while later search pages are still being read; at most
+    twice concurrency fetches are queued, so memory stays flat however large the instance.
+    """
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        pending = set()
+        for hit in iter_dashboards(client, folder_uids, tags, page_size=page_size):
+            if len(pending) >= 2 * concurrency:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+            pending.add(pool.submit(fetch_dashboard, client, hit))
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+def export_dashboards(client: Any, output_dir: Path, folder_uids: Optional[List[str]] = None,
+                      tags: Optional[List[str]] = None, concurrency: int = DEFAULT_EXPORT_CONCURRENCY,
+                      page_size: int = DEFAULT_PAGE_SIZE) -> Iterator[Dict[str, Any]]:
+    """Export every matching dashboard, yielding one result per dashboard as it lands.
+
+    Unchanged files are left untouched (written is False).
+    """
+    for fetched in iter_dashboard_bodies(client, folder_uids, tags, concurrency, page_size):
+        hit = fetched["hit"]
+        result = {"uid": hit["uid"], "title": hit.get("title", "")}
+        if "error" in fetched:
+            yield {**result, "success": False, "error": fetched["error"]}
+            continue
+        path = export_path(output_dir, hit)
+        try:
+            yield {**result, "success": True, "path": path, "written": write_json(path, fetched["dashboard"])}
+        except OSError as e:
+            yield {**result, "success": False, "error": str(e)}
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Dashboard Watch Mode
+Long-running daemon that regenerates the dashboards affected by edits to
+config/environments.json or the component catalog and pushes them to Grafana
+over one persistent connection, batching bursts of edits
+"""
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
+
+from config_manager import get_config_manager
+from component_catalog import CATALOG_PATH, EXTRA_CATALOGS_DIR, CatalogError
+from build_cache import fingerprint
+from dashboard_generator import (
+    DASHBOARDS_DIR, TEMPLATE_FACTORIES, BuildOptions, build_dashboard, environment_slice,
+    get_component_library, load_environment_names
+)
+
+# Quiet period after the last change before a batch is rebuilt
+DEFAULT_DEBOUNCE_SECONDS = 1.0
+CATALOG_SUFFIXES = (".yaml", ".yml", ".json")
+
+Job = Tuple[str, str]
+
+class CatalogFileHandler(FileSystemEventHandler):
+    """Reports writes, creations, deletions and renames of component catalog files"""
+
+    def __init__(self, watcher: 'DashboardWatcher'):
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if event.is_directory or event.event_type in ("opened", "closed_no_write"):
+            return
+        # Editors often save by renaming a temp file over the catalog
+        paths = [event.src_path, getattr(event, "dest_path", None)]
+        if any(path and is_catalog_file(Path(path)) for path in paths):
+            self.watcher.mark_changed("catalog")
+
+def is_catalog_file(path: Path) -> bool:
+    """Whether path is the built-in catalog or a team catalog"""
+    path = path.resolve()
+    return path == CATALOG_PATH.resolve() or \
+        (path.parent == EXTRA_CATALOGS_DIR.resolve() and path.suffix in CATALOG_SUFFIXES)
+
+class DashboardWatcher:
+    """Rebuilds and pushes only the template × environment dashboards a change affects"""
+
+    def __init__(self, templates: Optional[List[str]] = None, environments: Optional[List[str]] = None,
+                 output_dir: Optional[Path] = None, options: Optional[BuildOptions] = None,
+                 uploader: Any = None, folder_id: int = 0,
+                 debounce_seconds: float = DEFAULT_DEBOUNCE_SECONDS):
+        self.templates = templates or list(TEMPLATE_FACTORIES)
+        # None follows environments.json as environments are added or removed
+        self.environment_filter = environments
+        self.output_dir = Path(output_dir) if output_dir else DASHBOARDS_DIR
+        self.options = options or BuildOptions()
+        self.uploader = uploader
+        self.folder_id = folder_id
+        self.debounce_seconds = debounce_seconds
+
+        # Templates are code, so which components each one uses is fixed for the process
+        self.template_components = {
+            name: {config["name"] for section in TEMPLATE_FACTORIES[name]().sections
+                   for config in section["components"]}
+            for name in self.templates
+        }
+        self.environment_digests: Dict[str, str] = {}
+
+        # Change sources reported by watcher threads, resolved to jobs on the main thread
+        self.pending: Set[str] = set()
+        self.last_change = 0.0
+        self.lock = threading.Lock()
+        self.changed = threading.Event()
+        self.stopped = threading.Event()
+        self.observer = None
+
+    def environments(self) -> List[str]:
+        """Environments to build"""
+        return self.environment_filter or load_environment_names()
+
+    def jobs(self, templates: Optional[Set[str]] = None, environments: Optional[Set[str]] = None) -> Set[Job]:
+        """Template × environment pairs, restricted to the given templates and environments"""
+        return {
+            (template_name, environment)
+            for template_name in self.templates if templates is None or template_name in templates
+            for environment in self.environments() if environments is None or environment in environments
+        }
+
+    def mark_changed(self, source: str):
+        """Record a change from a watcher thread; the main loop rebuilds once edits go quiet"""
+        with self.lock:
+            self.pending.add(source)
+            self.last_change = time.monotonic()
+        self.changed.set()
+
+    def affected_by_catalog(self) -> Set[Job]:
+        """Reload the catalog and return the dashboards using a component whose spec changed"""
+        try:
+            changed_components = get_component_library().reload_catalog()
+        except (CatalogError, OSError, ValueError) as e:
+            print(f"❌ Component catalog rejected, keeping the previous one: {e}")
+            return set()
+
+        if changed_components:
+            print(f"🧩 Changed components: {', '.join(sorted(changed_components))}")
+        return self.jobs(templates=self.templates_using(changed_components))
+
+    def templates_using(self, component_names: Set[str]) -> Set[str]:
+        """Templates with at least one of the given components"""
+        return {name for name, components in self.template_components.items() if components & component_names}
+
+    def affected_by_environments(self) -> Set[Job]:
+        """Dashboards of environments whose dashboard-relevant settings changed"""
+        changed = set()
+        for environment in self.environments():
+            try:
+                digest = fingerprint(environment_slice(environment))
+            except Exception as e:
+                print(f"⚠️ Environment '{environment}' unavailable: {e}")
+                continue
+            if self.environment_digests.get(environment) != digest:
+                self.environment_digests[environment] = digest
+                changed.add(environment)
+        return self.jobs(environments=changed)
+
+    def take_batch(self) -> Optional[Set[str]]:
+        """Pending change sources once no change arrived for debounce_seconds, else None"""
+        with self.lock:
+            if not self.pending:
+                self.changed.clear()
+                return None
+            quiet = time.monotonic() - self.last_change
+            if quiet < self.debounce_seconds:
+                return None
+            batch, self.pending = self.pending, set()
+            self.changed.clear()
+            return batch
+
+    def rebuild(self, jobs: Set[Job]) -> List[Dict[str, Any]]:
+        """Build jobs in this process, reusing its warm caches, and push rewritten dashboards"""
+        results = []
+        for template_name, environment in sorted(jobs):
+            output_path = self.output_dir / f"{template_name}-{environment}.json"
+            try:
+                result = build_dashboard(template_name, environment, output_path, self.options)
+            except Exception as e:
+                print(f"❌ {template_name}-{environment}: {e}")
+                results.append({"template": template_name, "environment": environment, "error": str(e)})
+                continue
+
+            results.append(result)
+            if result["status"] != "written":
+                print(f"✅ {output_path.name} unchanged")
+                continue
+
+            print(f"✅ Regenerated {output_path.name} in {result['total_seconds'] * 1000:.1f}ms")
+            if self.uploader is not None:
+                upload = self.uploader.upload_dashboard(str(output_path), folder_id=self.folder_id)
+                if upload["success"] and upload["status"] == "unchanged":
+                    print(f"   ✅ {upload['dashboard_uid']} already up to date in Grafana")
+                elif upload["success"]:
+                    print(f"   📤 Pushed {upload['dashboard_uid']} (version {upload['version']})")
+                else:
+                    print(f"   ❌ Push failed: {upload['error']}")
+        return results
+
+    def process(self, sources: Set[str]) -> List[Dict[str, Any]]:
+        """Rebuild the dashboards affected by a batch of change sources"""
+        jobs = set()
+        if "environments" in sources:
+            jobs |= self.affected_by_environments()
+        if "catalog" in sources:
+            jobs |= self.affected_by_catalog()
+        if not jobs:
+            print("✅ No dashboards affected")
+            return []
+        return self.rebuild(jobs)
+
+    def start(self):
+        """Subscribe to configuration and catalog changes"""
+        get_config_manager().register_change_callback(
+            "environments", lambda config_name, config_data: self.mark_changed("environments"))
+
+        self.observer = Observer()
+        handler = CatalogFileHandler(self)
+        self.observer.schedule(handler, str(CATALOG_PATH.parent), recursive=False)
+        if EXTRA_CATALOGS_DIR.is_dir():
+            self.observer.schedule(handler, str(EXTRA_CATALOGS_DIR), recursive=False)
+        self.observer.start()
+
+    def stop(self):
+        """Stop watching and end run()"""
+        self.stopped.set()
+        self.changed.set()
+        if self.observer is not None:
+            self.observer.stop()
+            self.observer.join()
+
+    def run(self):
+        """Bring every dashboard up to date, then rebuild batches of changes until stopped"""
+        self.start()
+        # The initial pass also records the environment digests later changes are compared to
+        self.affected_by_environments()
+        self.rebuild(self.jobs())
+        print(f"👀 Watching environments and component catalog (debounce {self.debounce_seconds:g}s)")
+
+        while not self.stopped.is_set():
+            if not self.changed.wait(timeout=1.0):
+                continue
+            batch = self.take_batch()
+            if batch:
+                self.process(batch)
+            else:
+                # Still inside a burst of edits
+                time.sleep(self.debounce_seconds / 4)
+
+def watch(templates: Optional[List[str]] = None, environments: Optional[List[str]] = None,
+          output_dir: Optional[Path] = None, options: Optional[BuildOptions] = None,
+          push: bool = False, debounce_seconds: float = DEFAULT_DEBOUNCE_SECONDS):
+    """Run the watch daemon until interrupted"""
+    uploader = None
+    if push:
+        from upload_to_grafana import GrafanaUploader, get_grafana_config
+        grafana_url, api_token = get_grafana_config()
+        if not api_token:
+            raise SystemExit("❌ --push needs a Grafana API token")
+        uploader = GrafanaUploader(grafana_url, api_token)
+        print(f"🔗 Pushing to {grafana_url}")
+
+    watcher = DashboardWatcher(templates, environments, output_dir, options, uploader,
+                               debounce_seconds=debounce_seconds)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping watch mode")
+    finally:
+        watcher.stop()
+        get_config_manager().stop_watching()
@@ -3,40 +3,58 @@
 Professional Dashboard Deployment Script
 Deploys environment-specific dashboards with proper templating
 """
-import json
 import sys
 import argparse
-import requests
-from requests.auth import HTTPBasicAuth
 from pathlib import Path
+from typing import Dict, List, Optional
+
+from json_serializer import load_json
+from grafana_client import GrafanaClient
+from grafana_transport import RequestException
+from upload_manifest import dashboard_digest
+from upload_journal import UploadJournal, journal_key
+from dashboard_diff import diff_dashboards, fetch_remote_dashboard, print_plan, print_plan_summary
+
+ENVIRONMENTS = ["prod", "staging", "dev"]
+DEFAULT_GRAFANA_URL = "http://localhost:3000"
 
 def load_config():
     """Load environment configurations"""
     config_path = Path(__file__).parent.parent / "config" / "environments.json"
-    with open(config_path, 'r') as f:
-        return json.load(f)
+    return load_json(config_path)
 
 def load_dashboard_template():
     """Load the dashboard template"""
     template_path = Path(__file__).parent.parent / "dashboards" / "nry-full-template-complete.json"
-    with open(template_path, 'r') as f:
-        return json.load(f)
+    return load_json(template_path)
 
 def substitute_variables(dashboard, environment, config):
     """Replace template variables with environment-specific values"""
-    dashboard_str = json.dumps(dashboard)
+    variables = {
+        "${environment}": environment,
+        "${prometheus_url}": config["prometheus_url"],
+        "${pushgateway_url}": config["pushgateway_url"],
+        "${alertmanager_url}": config["alertmanager_url"],
+        "${runbook_url}": config["runbook_url"]
+    }
     
-    # Replace environment variables
-    dashboard_str = dashboard_str.replace("${environment}", environment)
-    dashboard_str = dashboard_str.replace("${prometheus_url}", config["prometheus_url"])
-    dashboard_str = dashboard_str.replace("${pushgateway_url}", config["pushgateway_url"])
-    dashboard_str = dashboard_str.replace("${alertmanager_url}", config["alertmanager_url"])
-    dashboard_str = dashboard_str.replace("${runbook_url}", config["runbook_url"])
+    # Walk the document instead of re-serializing it; only strings holding "${" are touched
+    def substitute(value):
+        if isinstance(value, str):
+            if "${" in value:
+                for variable, replacement in variables.items():
+                    value = value.replace(variable, replacement)
+            return value
+        if isinstance(value, dict):
+            return {substitute(key): substitute(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [substitute(item) for item in value]
+        return value
     
-    return json.loads(dashboard_str)
+    return substitute(dashboard)
 
-def deploy_to_grafana(dashboard, grafana_url, username, password):
-    """Deploy dashboard to Grafana instance"""
+def deploy_to_grafana(dashboard, grafana_url, username, password, client: Optional[GrafanaClient] = None):
+    """Deploy dashboard to Grafana instance, over client's pooled connections if given"""
     # Remove id to allow overwrite by UID
     dashboard_copy = dashboard.copy()
     if 'id' in dashboard_copy:
@@ -47,48 +65,139 @@ def deploy_to_grafana(dashboard, grafana_url, username, password):
         "overwrite": True
     }
     
-    response = requests.post(
-        f"{grafana_url}/api/dashboards/db",
-        json=payload,
-        auth=HTTPBasicAuth(username, password),
-        headers={'Content-Type': 'application/json'}
-    )
-    
-    return response
+    client = client or GrafanaClient(grafana_url, auth=(username, password))
+    # Overwriting saves are safe to retry
+    return client.post("/api/dashboards/db", payload, idempotent=True)
+
+def grafana_urls(environments, config, grafana_url: Optional[str] = None) -> Dict[str, str]:
+    """Grafana each environment deploys to: grafana_url if given, else the environment's
+    grafana_url in environments.json, else the local default"""
+    return {environment: (grafana_url or config[environment].get("grafana_url") or DEFAULT_GRAFANA_URL).rstrip('/')
+            for environment in environments}
+
+def shared_grafana_urls(urls: Dict[str, str]) -> Dict[str, List[str]]:
+    """Grafana URLs more than one environment deploys to, with those environments; every
+    environment's dashboard has the template's UID, so they would overwrite each other"""
+    by_url = {}
+    for environment, url in urls.items():
+        by_url.setdefault(url, []).append(environment)
+    return {url: environments for url, environments in by_url.items() if len(environments) > 1}
+
+def plan_deployment(clients: Dict[str, GrafanaClient], dashboards):
+    """Print what deploying each environment's dashboard would change in its Grafana"""
+    plans = []
+    for environment, dashboard in dashboards.items():
+        client = clients[environment]
+        print(f"📋 {environment} ({client.base_url}):")
+        try:
+            remote = fetch_remote_dashboard(client, dashboard["uid"])
+        except RequestException as e:
+            print(f"  ❌ Could not fetch the deployed dashboard: {e}")
+            continue
+        changes = None if remote is None else diff_dashboards(dashboard, remote)
+        print_plan(dashboard["uid"], dashboard.get("title", ""), changes)
+        plans.append(changes)
+    print_plan_summary(plans)
 
 def main():
     parser = argparse.ArgumentParser(description="Deploy Nestory monitoring dashboard")
-    parser.add_argument("environment", choices=["prod", "staging", "dev"], 
-                       help="Target environment")
-    parser.add_argument("--grafana-url", default="http://localhost:3000",
-                       help="Grafana URL (default: localhost)")
+    parser.add_argument("environments", nargs="*", metavar="environment",
+                       help=f"Target environments ({', '.join(ENVIRONMENTS)})")
+    parser.add_argument("--grafana-url", default=None,
+                       help="Grafana URL for every environment (default: each environment's grafana_url in "
+                            f"config/environments.json, else {DEFAULT_GRAFANA_URL})")
     parser.add_argument("--username", default="admin", help="Grafana username")
     parser.add_argument("--password", default="nestory123", help="Grafana password")
+    parser.add_argument("--compress", action="store_true",
+                       help="Gzip the request body (Grafana or its proxy must accept Content-Encoding: gzip)")
+    parser.add_argument("--plan", action="store_true",
+                       help="Show what deploying would change in Grafana, per panel, target and variable, and exit")
+    parser.add_argument("--resume", action="store_true",
+                       help="Deploy only the environments the last interrupted run did not finish")
     
     args = parser.parse_args()
     
+    # Every deployment is journaled so a run that dies halfway can be resumed
+    journal = UploadJournal.named("deploy-env")
+    environments = args.environments
+    resumed_urls = {}
+    if args.resume:
+        incomplete = journal.resume()
+        # Resumed environments go back to the Grafana the interrupted run planned for them
+        resumed_urls = {item["environment"]: item["grafana_url"] for item in incomplete.values()
+                        if not args.grafana_url or item.get("grafana_url") == args.grafana_url.rstrip('/')}
+        environments = list(resumed_urls)
+        if not environments:
+            print("✅ Nothing to resume: the last deployment finished every environment")
+            return
+        print(f"🔁 Resuming run {journal.run_id}: {', '.join(environments)} left")
+    elif not environments:
+        parser.error("at least one environment is required unless --resume is given")
+    unknown = [environment for environment in environments if environment not in ENVIRONMENTS]
+    if unknown:
+        parser.error(f"invalid environment {unknown[0]!r} (choose from {', '.join(ENVIRONMENTS)})")
+    
     # Load configurations
     config = load_config()
-    env_config = config[args.environment]
+    template = load_dashboard_template()
+    urls = {**grafana_urls(environments, config, args.grafana_url), **resumed_urls}
+    shared = shared_grafana_urls(urls)
+    if shared:
+        url, colliding = next(iter(shared.items()))
+        parser.error(f"{', '.join(colliding)} would overwrite each other's dashboard {template['uid']} on {url}; "
+                     "set a grafana_url per environment in config/environments.json or deploy one at a time")
+    
+    # Customize the dashboard for every environment up front so the journal knows what will land
+    dashboards = {environment: substitute_variables(template, environment, config[environment])
+                  for environment in environments}
+    digests = {environment: dashboard_digest(dashboard) for environment, dashboard in dashboards.items()}
+    clients = {environment: GrafanaClient(urls[environment], auth=(args.username, args.password),
+                                          compress=args.compress)
+               for environment in environments}
+    
+    if args.plan:
+        plan_deployment(clients, dashboards)
+        for client in clients.values():
+            client.print_stats()
+        return
     
-    # Load and customize dashboard
-    dashboard = load_dashboard_template()
-    dashboard = substitute_variables(dashboard, args.environment, env_config)
+    if not args.resume:
+        journal.start({journal_key(urls[environment], environment): {
+            "environment": environment, "grafana_url": urls[environment], "hash": digests[environment]
+        } for environment in environments})
     
     # Deploy to Grafana
-    response = deploy_to_grafana(dashboard, args.grafana_url, args.username, args.password)
+    failures = 0
+    for environment, dashboard in dashboards.items():
+        grafana_url = urls[environment]
+        key = journal_key(grafana_url, environment)
+        try:
+            response = deploy_to_grafana(dashboard, grafana_url, args.username, args.password, clients[environment])
+        except RequestException as e:
+            journal.record(key, False, digests[environment], error=str(e))
+            print(f"❌ Deployment to {environment} failed: {e}")
+            failures += 1
+            continue
+        
+        if response.status_code == 200:
+            result = response.json()
+            journal.record(key, True, digests[environment], version=result.get("version"))
+            print(f"✅ Dashboard deployed successfully to {environment}!")
+            print(f"📊 URL: {grafana_url}{result['url']}")
+            print(f"📝 Version: {result['version']}")
+            print(f"🆔 UID: {result['uid']}")
+        else:
+            journal.record(key, False, digests[environment], error=f"HTTP {response.status_code}: {response.text}")
+            print(f"❌ Deployment to {environment} failed!")
+            print(f"Status: {response.status_code}")
+            print(f"Error: {response.text}")
+            failures += 1
     
-    if response.status_code == 200:
-        result = response.json()
-        print(f"✅ Dashboard deployed successfully to {args.environment}!")
-        print(f"📊 URL: {args.grafana_url}{result['url']}")
-        print(f"📝 Version: {result['version']}")
-        print(f"🆔 UID: {result['uid']}")
-    else:
-        print(f"❌ Deployment failed!")
-        print(f"Status: {response.status_code}")
-        print(f"Error: {response.text}")
+    for client in clients.values():
+        client.print_stats()
+    if failures:
+        print("💡 Deploy the rest with: python3 scripts/deploy-dashboard-env.py --resume")
         sys.exit(1)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -65,15 +65,10 @@ generate_dashboards() {
     
     cd "$PROJECT_DIR"
     
-    # Generate comprehensive dashboard for development
-    print_step "  📊 Generating comprehensive dashboard (dev environment)..."
-    python3 scripts/dashboard_generator.py --template comprehensive --environment dev
-    print_success "  Generated: dashboards/comprehensive-dev.json"
-    
-    # Generate production dashboard for production environment
-    print_step "  📊 Generating production dashboard (prod environment)..."
-    python3 scripts/dashboard_generator.py --template production --environment prod
-    print_success "  Generated: dashboards/production-prod.json"
+    # Build every template for every environment in one pass
+    print_step "  📊 Generating template × environment matrix..."
+    python3 scripts/dashboard_generator.py --matrix
+    print_success "  Generated: dashboards/{template}-{env}.json"
     
     # Show dashboard statistics
     echo ""
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Fake Grafana
+In-process stand-in for the Grafana HTTP API the monitoring scripts use, with injectable
+latency, server errors and 429s and scripted replies, so uploads can be tested and
+benchmarked offline
+"""
+import gzip
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Any, Optional, Tuple, Union
+from urllib.parse import parse_qs, urlparse
+
+FAKE_VERSION = "10.4.0-fake"
+
+@dataclass
+class FaultInjection:
+    """What the fake does to each API request before answering it"""
+    # Fixed delay plus up to jitter more, in seconds
+    latency: float = 0.0
+    jitter: float = 0.0
+    # Share of requests answered 500 or 429
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+    retry_after: float = 1.0
+    seed: Optional[int] = None
+
+@dataclass
+class ScriptedReply:
+    """The answer to the next request of one route, ahead of the fake's own.
+
+    status None answers as the fake would; close drops the connection after answering.
+    """
+    status: Optional[int] = None
+    body: Any = None
+    headers: Dict[str, str] = field(default_factory=dict)
+    close: bool = False
+
+@dataclass
+class ReceivedRequest:
+    """One request as the fake received it, body decoded"""
+    method: str
+    route: str
+    path: str
+    query: Dict[str, List[str]]
+    headers: Dict[str, str]
+    body: Any
+
+@dataclass
+class FakeStats:
+    requests: int = 0
+    injected_errors: int = 0
+    injected_429s: int = 0
+    by_route: Dict[str, int] = field(default_factory=dict)
+    # Most requests of one route answered at the same time
+    max_in_flight: Dict[str, int] = field(default_factory=dict)
+
+class FakeGrafanaState:
+    """Dashboards, folders and library panels held by the fake, guarded by one lock"""
+
+    def __init__(self):
+        self.dashboards: Dict[str, Dict[str, Any]] = {}
+        self.folders: Dict[str, Dict[str, Any]] = {}
+        self.library_elements: Dict[str, Dict[str, Any]] = {}
+        self.next_id = 1
+        self.lock = threading.Lock()
+
+    def create_folder(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """POST /api/folders"""
+        with self.lock:
+            uid = body.get("uid") or f"folder{len(self.folders) + 1}"
+            if uid in self.folders:
+                return 409, {"message": "a folder with the same uid already exists"}
+            self.folders[uid] = {"id": len(self.folders) + 1, "uid": uid, "title": body.get("title", uid),
+                                 "parentUid": body.get("parentUid"), "version": 1}
+            return 200, self.folders[uid]
+
+    def save_library_element(self, uid: Optional[str], body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """POST /api/library-elements without uid, PATCH /api/library-elements/<uid> with it"""
+        with self.lock:
+            if uid is None:
+                uid = body.get("uid") or f"lib{len(self.library_elements) + 1:06d}"
+                if uid in self.library_elements:
+                    return 400, {"message": "library element with that name or uid already exists"}
+                version = 1
+            else:
+                existing = self.library_elements.get(uid)
+                if existing is None:
+                    return 404, {"message": "library element could not be found"}
+                if body.get("version") != existing["version"]:
+                    return 412, {"message": "the library element has been changed by someone else"}
+                body = {**existing, **body}
+                version = existing["version"] + 1
+            self.library_elements[uid] = {"uid": uid, "name": body.get("name", uid), "kind": body.get("kind", 1),
+                                          "model": body.get("model", {}), "folderUid": body.get("folderUid") or "",
+                                          "version": version}
+            return 200, {"result": self.library_elements[uid]}
+
+    def save_dashboard(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """POST /api/dashboards/db, including Grafana's version check without overwrite"""
+        dashboard = dict(body.get("dashboard") or {})
+        with self.lock:
+            uid = dashboard.get("uid") or f"fake{self.next_id:06d}"
+            existing = self.dashboards.get(uid)
+            if existing and not body.get("overwrite") and dashboard.get("version") != existing["dashboard"]["version"]:
+                return 412, {"status": "version-mismatch",
+                             "message": "The dashboard has been changed by someone else"}
+            folder_uid = body.get("folderUid")
+            if folder_uid and folder_uid not in self.folders:
+                return 400, {"message": "folder not found"}
+
+            dashboard_id = existing["dashboard"]["id"] if existing else self.next_id
+            self.next_id += 1
+            version = existing["dashboard"]["version"] + 1 if existing else 1
+            slug = re.sub(r"[^a-z0-9]+", "-", dashboard.get("title", uid).lower()).strip("-")
+            url = f"/d/{uid}/{slug}"
+            self.dashboards[uid] = {
+                "dashboard": {**dashboard, "uid": uid, "id": dashboard_id, "version": version},
+                "meta": {"folderUid": folder_uid or "", "folderId": body.get("folderId") or 0, "url": url,
+                         "slug": slug, "version": version}
+            }
+        return 200, {"id": dashboard_id, "uid": uid, "url": url, "status": "success", "version": version,
+                     "slug": slug}
+
+    def search(self, query: Dict[str, List[str]]) -> List[Dict[str, Any]]:
+        """GET /api/search with the filters the scripts send"""
+        text = query.get("query", [""])[0].lower()
+        tags = query.get("tag", [])
+        folder_uids = query.get("folderUIDs", [])
+        dashboard_uids = query.get("dashboardUIDs", [])
+        limit = int(query.get("limit", ["1000"])[0])
+        page = int(query.get("page", ["1"])[0])
+
+        with self.lock:
+            hits = []
+            for uid, entry in sorted(self.dashboards.items()):
+                dashboard, meta = entry["dashboard"], entry["meta"]
+                if text and text not in dashboard.get("title", "").lower():
+                    continue
+                if any(tag not in dashboard.get("tags", []) for tag in tags):
+                    continue
+                if folder_uids and meta["folderUid"] not in folder_uids:
+                    continue
+                if dashboard_uids and uid not in dashboard_uids:
+                    continue
+                folder = self.folders.get(meta["folderUid"], {})
+                hits.append({"id": dashboard["id"], "uid": uid, "title": dashboard.get("title", ""),
+                             "url": meta["url"], "type": "dash-db", "tags": dashboard.get("tags", []),
+                             "folderUid": meta["folderUid"] or None, "folderTitle": folder.get("title")})
+        return hits[(page - 1) * limit:page * limit]
+
+def route_name(method: str, path: str) -> str:
+    """Method and path with the UID left out, e.g. GET /api/dashboards/uid/:uid"""
+    return f"{method} " + re.sub(r"/api/(dashboards/uid|folders|library-elements)/[^/]+$", r"/api/\1/:uid", path)
+
+class FakeGrafanaHandler(BaseHTTPRequestHandler):
+    """Routes requests to the server's state after applying its fault injection"""
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; without this the body waits on delayed ACKs
+    disable_nagle_algorithm = True
+
+    def _reply(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _body(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length", 0))
+        data = self.rfile.read(length) if length else b""
+        if data and self.headers.get("Content-Encoding") == "gzip":
+            data = gzip.decompress(data)
+        return json.loads(data) if data else {}
+
+    def _handle(self):
+        fake: 'FakeGrafana' = self.server.fake
+        url = urlparse(self.path)
+        # Read the body first so the connection stays usable whatever the answer
+        try:
+            body = self._body()
+        except (ValueError, OSError):
+            return self._reply(400, {"message": "bad request data"})
+
+        route = route_name(self.command, url.path)
+        query = parse_qs(url.query)
+        fake.received.append(ReceivedRequest(self.command, route, self.path, query, dict(self.headers), body))
+        fake.started(route)
+        try:
+            self._answer(fake, route, url.path, query, body)
+        finally:
+            fake.finished(route)
+
+    def _answer(self, fake: 'FakeGrafana', route: str, path: str, query: Dict[str, List[str]], body: Any):
+        fault = fake.before_request(route)
+        scripted = fake.scripted_reply(route)
+        if scripted and scripted.close:
+            self.close_connection = True
+        if scripted and scripted.status is not None:
+            return self._reply(scripted.status, scripted.body or {"message": f"scripted {scripted.status}"},
+                               scripted.headers)
+        if fault == 429 and not scripted:
+            return self._reply(429, {"message": "Too many requests"},
+                               {"Retry-After": f"{fake.faults.retry_after:g}"})
+        if fault == 500 and not scripted:
+            return self._reply(500, {"message": "Internal Server Error (injected)"})
+
+        if fake.api_token and self.headers.get("Authorization") != f"Bearer {fake.api_token}":
+            return self._reply(401, {"message": "Unauthorized"})
+        status, reply = fake.route(self.command, path, query, body)
+        self._reply(status, reply)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+    def log_message(self, *args):
+        pass
+
+class FakeGrafana:
+    """A fake Grafana on a free localhost port, serving /api/health, /api/search,
+    /api/dashboards/db, /api/dashboards/uid/<uid>, /api/folders (nested through parentUid)
+    and /api/library-elements.
+
+    Use as a context manager; url is the base URL to hand to GrafanaClient or GrafanaUploader.
+    With api_token set, requests without that bearer token get 401. received holds every
+    request; script() queues replies for a route ahead of the fake's own and its faults.
+    """
+
+    def __init__(self, faults: Optional[FaultInjection] = None, api_token: Optional[str] = None,
+                 port: int = 0):
+        self.faults = faults or FaultInjection()
+        self.api_token = api_token
+        self.state = FakeGrafanaState()
+        self.stats = FakeStats()
+        self.random = random.Random(self.faults.seed)
+        self.received: List[ReceivedRequest] = []
+        self.scripts: Dict[str, List[ScriptedReply]] = {}
+        self.in_flight: Dict[str, int] = {}
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), FakeGrafanaHandler)
+        self.server.daemon_threads = True
+        self.server.fake = self
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}"
+
+    def start(self) -> 'FakeGrafana':
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> 'FakeGrafana':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+    def script(self, route: str, *replies: Union[int, ScriptedReply]):
+        """Answer the next requests of route, e.g. "GET /api/health", with replies in order;
+        an int is a status"""
+        with self.lock:
+            self.scripts.setdefault(route, []).extend(
+                reply if isinstance(reply, ScriptedReply) else ScriptedReply(reply) for reply in replies)
+
+    def scripted_reply(self, route: str) -> Optional[ScriptedReply]:
+        with self.lock:
+            queue = self.scripts.get(route)
+            return queue.pop(0) if queue else None
+
+    def started(self, route: str):
+        with self.lock:
+            self.in_flight[route] = self.in_flight.get(route, 0) + 1
+            self.stats.max_in_flight[route] = max(self.stats.max_in_flight.get(route, 0), self.in_flight[route])
+
+    def finished(self, route: str):
+        with self.lock:
+            self.in_flight[route] -= 1
+
+    def before_request(self, route: str) -> Optional[int]:
+        """Count the request, sleep the injected latency and pick an injected status, if any"""
+        with self.lock:
+            self.stats.requests += 1
+            self.stats.by_route[route] = self.stats.by_route.get(route, 0) + 1
+            delay = self.faults.latency + self.random.uniform(0, self.faults.jitter)
+            roll = self.random.random()
+            fault = None
+            if roll < self.faults.rate_limit_rate:
+                fault = 429
+                self.stats.injected_429s += 1
+            elif roll < self.faults.rate_limit_rate + self.faults.error_rate:
+                fault = 500
+                self.stats.injected_errors += 1
+        if delay:
+            time.sleep(delay)
+        return fault
+
+    def route(self, method: str, path: str, query: Dict[str, List[str]], body: Dict[str, Any]) -> Tuple[int, Any]:
+        """Status and JSON reply of one API request"""
+        state = self.state
+        if path == "/api/health" and method == "GET":
+            return 200, {"database": "ok", "version": FAKE_VERSION, "commit": "fake"}
+        if path == "/api/search" and method == "GET":
+            return 200, state.search(query)
+        if path == "/api/dashboards/db" and method == "POST":
+            return state.save_dashboard(body)
+
+        match = re.fullmatch(r"/api/dashboards/uid/([^/]+)", path)
+        if match:
+            uid = match.group(1)
+            with state.lock:
+                if uid not in state.dashboards:
+                    return 404, {"message": "Dashboard not found"}
+                if method == "DELETE":
+                    del state.dashboards[uid]
+                    return 200, {"title": uid, "message": "Dashboard deleted"}
+                return 200, state.dashboards[uid]
+
+        if path == "/api/folders":
+            if method == "POST":
+                return state.create_folder(body)
+            # One level at a time, like Grafana with nested folders
+            parent_uid = query.get("parentUid", [None])[0]
+            limit = int(query.get("limit", ["1000"])[0])
+            page = int(query.get("page", ["1"])[0])
+            with state.lock:
+                children = [{"id": folder["id"], "uid": folder["uid"], "title": folder["title"]}
+                            for folder in state.folders.values() if folder.get("parentUid") == parent_uid]
+            return 200, children[(page - 1) * limit:page * limit]
+
+        match = re.fullmatch(r"/api/folders/([^/]+)", path)
+        if match:
+            with state.lock:
+                folder = state.folders.get(match.group(1))
+                if folder is None:
+                    return 404, {"message": "folder not found"}
+                if method == "PUT":
+                    folder.update(title=body.get("title", folder["title"]), version=folder["version"] + 1)
+                return 200, folder
+
+        if path == "/api/library-elements":
+            if method == "POST":
+                return state.save_library_element(None, body)
+            per_page = int(query.get("perPage", ["100"])[0])
+            page = int(query.get("page", ["1"])[0])
+            with state.lock:
+                elements = [state.library_elements[uid] for uid in sorted(state.library_elements)]
+            return 200, {"result": {"elements": elements[(page - 1) * per_page:page * per_page],
+                                    "totalCount": len(elements), "page": page, "perPage": per_page}}
+
+        match = re.fullmatch(r"/api/library-elements/([^/]+)", path)
+        if match:
+            uid = match.group(1)
+            if method == "PATCH":
+                return state.save_library_element(uid, body)
+            with state.lock:
+                if uid not in state.library_elements:
+                    return 404, {"message": "library element could not be found"}
+                if method == "DELETE":
+                    del state.library_elements[uid]
+                    return 200, {"message": "Library element deleted"}
+                return 200, {"result": state.library_elements[uid]}
+
+        return 404, {"message": "Not found"}
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve a fake Grafana API for offline runs of the monitoring scripts")
+    parser.add_argument("--port", type=int, default=3000, help="Port on 127.0.0.1 (default: 3000)")
+    parser.add_argument("--api-token", type=str, help="Require this bearer token")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Delay before every answer")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Up to this much extra random delay")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered 500")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Share of requests answered 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After of injected 429s (seconds)")
+
+    args = parser.parse_args()
+    faults = FaultInjection(args.latency_ms / 1000, args.jitter_ms / 1000, args.error_rate, args.rate_limit,
+                            args.retry_after)
+    fake = FakeGrafana(faults, args.api_token, args.port)
+    print(f"🧪 Fake Grafana listening on {fake.url} (Ctrl-C to stop)")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n📈 {fake.stats.requests} requests, {fake.stats.injected_errors} injected errors, "
+              f"{fake.stats.injected_429s} injected 429s")
+
+if __name__ == "__main__":
+    main()
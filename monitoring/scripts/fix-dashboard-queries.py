@@ -4,15 +4,15 @@ Fix dashboard queries to use actual available metrics
 Maps dashboard panel queries to real Nestory metrics in Prometheus
 """
 
-import json
 import sys
 from pathlib import Path
 
+from json_serializer import load_json, write_json
+
 def fix_dashboard_queries(dashboard_path):
     """Fix all dashboard queries to use real available metrics"""
     
-    with open(dashboard_path, 'r') as f:
-        dashboard = json.load(f)
+    dashboard = load_json(dashboard_path)
     
     # Mapping of broken queries to working ones
     query_fixes = {
@@ -74,8 +74,7 @@ def fix_dashboard_queries(dashboard_path):
     
     # Write fixed dashboard
     fixed_path = dashboard_path.replace('.json', '-fixed.json')
-    with open(fixed_path, 'w') as f:
-        json.dump(dashboard, f, indent=2)
+    write_json(fixed_path, dashboard)
     
     print(f"Fixed dashboard saved to: {fixed_path}")
     return fixed_path
@@ -0,0 +1,352 @@
+#!/usr/bin/env python3
+"""
+Grafana Backup Store
+Snapshots every dashboard, folder and library panel of a Grafana instance into a local
+content-addressed store, writing only objects not stored before, and restores any snapshot
+"""
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional, Set, Tuple
+
+from json_serializer import canonical_bytes, content_hash, load_json, write_json
+from dashboard_inventory import DEFAULT_EXPORT_CONCURRENCY, iter_dashboard_bodies
+from grafana_transport import RequestException
+from library_panels import referenced_library_uids
+
+BACKUP_DIR = Path(__file__).parent.parent / "backups"
+# Page sizes for the folder and library element listings
+FOLDER_PAGE_SIZE = 1000
+LIBRARY_PAGE_SIZE = 100
+# Keys Grafana bumps on every save; leaving them out lets unchanged dashboards deduplicate
+VOLATILE_DASHBOARD_KEYS = ("id", "version")
+
+@dataclass
+class SnapshotStats:
+    """What one snapshot run stored"""
+    objects: int = 0
+    new_objects: int = 0
+    new_bytes: int = 0
+    errors: List[str] = field(default_factory=list)
+
+class BackupStore:
+    """Content-addressed object store plus point-in-time snapshot manifests.
+
+    objects/<aa>/<sha256>.json holds each distinct folder, dashboard or library panel once, in
+    canonical JSON. snapshots/<id>.json maps every object of one run to its hash, so a
+    snapshot costs only the objects that changed since the last one.
+    """
+
+    def __init__(self, root: Path = BACKUP_DIR):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.snapshots_dir = self.root / "snapshots"
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}.json"
+
+    def put(self, obj: Dict[str, Any]) -> Tuple[str, int]:
+        """Store obj unless an identical one is stored; returns its hash and the bytes written"""
+        digest = content_hash(obj)
+        path = self.object_path(digest)
+        if path.exists():
+            return digest, 0
+        write_json(path, obj, "canonical")
+        return digest, len(canonical_bytes(obj))
+
+    def get(self, digest: str) -> Dict[str, Any]:
+        return load_json(self.object_path(digest))
+
+    def snapshot_ids(self) -> List[str]:
+        """Snapshot ids, oldest first"""
+        return sorted(path.stem for path in self.snapshots_dir.glob("*.json"))
+
+    def load_snapshot(self, snapshot_id: str) -> Dict[str, Any]:
+        path = self.snapshots_dir / f"{snapshot_id}.json"
+        if not path.exists():
+            raise FileNotFoundError(f"Snapshot {snapshot_id} not found in {self.snapshots_dir}")
+        return load_json(path)
+
+    def write_snapshot(self, manifest: Dict[str, Any]) -> str:
+        """Save a snapshot manifest under a new UTC timestamp id"""
+        snapshot_id = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+        suffix = 1
+        while (self.snapshots_dir / f"{snapshot_id}.json").exists():
+            suffix += 1
+            snapshot_id = f"{time.strftime('%Y%m%dT%H%M%SZ', time.gmtime())}-{suffix}"
+        write_json(self.snapshots_dir / f"{snapshot_id}.json", {**manifest, "id": snapshot_id})
+        return snapshot_id
+
+    def referenced(self, snapshot_ids: List[str]) -> Set[str]:
+        """Hashes used by the given snapshots"""
+        digests = set()
+        for snapshot_id in snapshot_ids:
+            snapshot = self.load_snapshot(snapshot_id)
+            for kind in ("folders", "dashboards", "library_panels"):
+                digests.update(entry["hash"] for entry in snapshot[kind].values())
+        return digests
+
+    def prune(self, keep: int) -> Tuple[int, int]:
+        """Delete all but the newest keep snapshots and the objects only they used;
+        returns the snapshots and objects removed"""
+        snapshot_ids = self.snapshot_ids()
+        removed = snapshot_ids[:-keep] if keep > 0 else snapshot_ids
+        live = self.referenced(snapshot_ids[len(removed):])
+        for snapshot_id in removed:
+            (self.snapshots_dir / f"{snapshot_id}.json").unlink()
+        orphans = [path for path in self.objects_dir.glob("*/*.json") if path.stem not in live]
+        for path in orphans:
+            path.unlink()
+        return len(removed), len(orphans)
+
+def _folder_pages(client: Any, parent_uid: Optional[str]) -> Iterator[Dict[str, Any]]:
+    """The folders directly under parent_uid, or the top-level ones, page by page"""
+    page = 1
+    while True:
+        response = client.get("/api/folders", params={"limit": FOLDER_PAGE_SIZE, "page": page,
+                                                      "parentUid": parent_uid})
+        response.raise_for_status()
+        folders = response.json()
+        yield from folders
+        if len(folders) < FOLDER_PAGE_SIZE:
+            return
+        page += 1
+
+def iter_folders(client: Any) -> Iterator[Dict[str, Any]]:
+    """Every folder including nested ones, each with its parentUid, parents first.
+
+    /api/folders lists one level, so this costs a listing per folder. Grafana without nested
+    folders ignores parentUid and lists the top-level folders again; those are skipped.
+    """
+    seen = set()
+    pending = [None]
+    while pending:
+        parent_uid = pending.pop(0)
+        for folder in _folder_pages(client, parent_uid):
+            if folder["uid"] in seen:
+                continue
+            seen.add(folder["uid"])
+            pending.append(folder["uid"])
+            yield {**folder, "parentUid": folder.get("parentUid") or parent_uid}
+
+def iter_library_panels(client: Any) -> Iterator[Dict[str, Any]]:
+    """Every library panel, page by page"""
+    page = 1
+    while True:
+        response = client.get("/api/library-elements",
+                              params={"kind": 1, "perPage": LIBRARY_PAGE_SIZE, "page": page})
+        response.raise_for_status()
+        elements = response.json()["result"]["elements"]
+        yield from elements
+        if len(elements) < LIBRARY_PAGE_SIZE:
+            return
+        page += 1
+
+def snapshot(uploader: Any, store: BackupStore,
+             concurrency: int = DEFAULT_EXPORT_CONCURRENCY) -> Tuple[Optional[str], SnapshotStats]:
+    """Back up every folder, library panel and dashboard; returns the snapshot id, or None if
+    the instance could not be listed, and what was stored"""
+    client = uploader.client
+    stats = SnapshotStats()
+    manifest = {"grafana_url": uploader.grafana_url, "created": time.time(),
+                "folders": {}, "library_panels": {}, "dashboards": {}}
+
+    def store_object(kind: str, uid: str, obj: Dict[str, Any], **entry):
+        digest, written = store.put(obj)
+        stats.objects += 1
+        stats.new_objects += 1 if written else 0
+        stats.new_bytes += written
+        manifest[kind][uid] = {"hash": digest, **entry}
+
+    try:
+        for folder in iter_folders(client):
+            store_object("folders", folder["uid"], {"uid": folder["uid"], "title": folder["title"],
+                                                    "parentUid": folder.get("parentUid")})
+        for element in iter_library_panels(client):
+            model = {key: element[key] for key in ("uid", "name", "kind", "model")}
+            store_object("library_panels", element["uid"], model, folder_uid=element.get("folderUid"))
+        for fetched in iter_dashboard_bodies(client, concurrency=concurrency):
+            hit = fetched["hit"]
+            if "error" in fetched:
+                stats.errors.append(f"{hit['uid']}: {fetched['error']}")
+                continue
+            dashboard = {key: value for key, value in fetched["dashboard"].items()
+                         if key not in VOLATILE_DASHBOARD_KEYS}
+            store_object("dashboards", hit["uid"], dashboard, title=hit.get("title", ""),
+                         folder_uid=fetched["meta"].get("folderUid") or hit.get("folderUid"),
+                         version=fetched["dashboard"].get("version"))
+    except RequestException as e:
+        stats.errors.append(str(e))
+        return None, stats
+
+    manifest["incomplete"] = bool(stats.errors)
+    return store.write_snapshot(manifest), stats
+
+def restore(uploader: Any, store: BackupStore, snapshot_id: str, dashboard_uids: Optional[List[str]] = None,
+            dry_run: bool = False) -> List[Dict[str, Any]]:
+    """Recreate a snapshot's folders, library panels and dashboards, overwriting what is there.
+
+    With dashboard_uids only those dashboards are restored, after the folders they are in and
+    the library panels they reference, with those panels' folders and every parent folder.
+    Returns one result per object.
+    """
+    snapshot = store.load_snapshot(snapshot_id)
+    client = uploader.client
+    results = []
+
+    dashboards = {uid: entry for uid, entry in snapshot["dashboards"].items()
+                  if not dashboard_uids or uid in dashboard_uids}
+    bodies = {uid: store.get(entry["hash"]) for uid, entry in dashboards.items()}
+    library_panels = snapshot["library_panels"]
+    if dashboard_uids:
+        referenced = set().union(*(referenced_library_uids(body.get("panels", [])) for body in bodies.values()))
+        library_panels = {uid: entry for uid, entry in library_panels.items() if uid in referenced}
+
+    def attempt(kind: str, uid: str, send):
+        if dry_run:
+            results.append({"kind": kind, "uid": uid, "success": True, "status": "would restore"})
+            return
+        try:
+            results.append({"kind": kind, "uid": uid, **send()})
+        except RequestException as e:
+            results.append({"kind": kind, "uid": uid, "success": False, "error": str(e)})
+
+    folders = {uid: store.get(entry["hash"]) for uid, entry in snapshot["folders"].items()}
+    if dashboard_uids:
+        needed = set()
+        pending = [entry.get("folder_uid") for entry in [*dashboards.values(), *library_panels.values()]]
+        while pending:
+            uid = pending.pop()
+            if uid in folders and uid not in needed:
+                needed.add(uid)
+                pending.append(folders[uid].get("parentUid"))
+        folders = {uid: folder for uid, folder in folders.items() if uid in needed}
+
+    def depth(uid: str) -> int:
+        parent = folders.get(uid, {}).get("parentUid")
+        return 1 + depth(parent) if parent in folders else 0
+
+    # Parents first, so nested folders have somewhere to go
+    for uid in sorted(folders, key=lambda uid: (depth(uid), uid)):
+        folder = folders[uid]
+
+        def send_folder(folder=folder, uid=uid):
+            if client.get(f"/api/folders/{uid}").status_code == 404:
+                response = client.post("/api/folders", {key: value for key, value in folder.items() if value})
+            else:
+                response = client.put(f"/api/folders/{uid}", {"title": folder["title"], "overwrite": True})
+            response.raise_for_status()
+            return {"success": True, "status": "restored"}
+        attempt("folder", uid, send_folder)
+
+    for uid, entry in sorted(library_panels.items()):
+        element = store.get(entry["hash"])
+        attempt("library panel", uid,
+                lambda element=element, entry=entry: uploader.upload_library_panel(element,
+                                                                                  folder_uid=entry.get("folder_uid")))
+
+    for uid, entry in sorted(dashboards.items()):
+        dashboard = bodies[uid]
+
+        def send_dashboard(dashboard=dashboard, entry=entry):
+            payload = {"dashboard": {**dashboard, "id": None}, "overwrite": True,
+                       "message": f"Restored from backup snapshot {snapshot_id}"}
+            if entry.get("folder_uid"):
+                payload["folderUid"] = entry["folder_uid"]
+            response = client.post("/api/dashboards/db", payload, idempotent=True)
+            response.raise_for_status()
+            return {"success": True, "status": "restored", "version": response.json().get("version")}
+        attempt("dashboard", uid, send_dashboard)
+
+    return results
+
+def print_snapshots(store: BackupStore):
+    """One line per snapshot with its object counts"""
+    snapshot_ids = store.snapshot_ids()
+    if not snapshot_ids:
+        print(f"⚠️ No snapshots in {store.root}")
+        return
+    for snapshot_id in snapshot_ids:
+        snapshot = store.load_snapshot(snapshot_id)
+        flag = " ⚠️ incomplete" if snapshot.get("incomplete") else ""
+        print(f"   • {snapshot_id}  {snapshot['grafana_url']}  {len(snapshot['dashboards'])} dashboards, "
+              f"{len(snapshot['folders'])} folders, {len(snapshot['library_panels'])} library panels{flag}")
+
+def main():
+    import argparse
+
+    from upload_to_grafana import GrafanaUploader, get_grafana_config
+
+    parser = argparse.ArgumentParser(description="Back up and restore Grafana dashboards, folders and library panels")
+    parser.add_argument("--snapshot", action="store_true", help="Take a snapshot of the Grafana instance")
+    parser.add_argument("--list", action="store_true", help="List snapshots in the store")
+    parser.add_argument("--restore", type=str, metavar="SNAPSHOT", help="Restore a snapshot ('latest' for the newest)")
+    parser.add_argument("--dashboard", action="append", metavar="UID",
+                       help="With --restore, restore only this dashboard (repeatable)")
+    parser.add_argument("--dry-run", action="store_true", help="With --restore, show what would be restored")
+    parser.add_argument("--prune", type=int, metavar="KEEP",
+                       help="Delete all but the newest KEEP snapshots and objects no longer referenced")
+    parser.add_argument("--store", type=str, default=str(BACKUP_DIR), help=f"Backup store (default: {BACKUP_DIR})")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_EXPORT_CONCURRENCY,
+                       help=f"Dashboard downloads in flight (default: {DEFAULT_EXPORT_CONCURRENCY})")
+    parser.add_argument("--grafana-url", type=str, help="Grafana URL (overrides config)")
+    parser.add_argument("--api-token", type=str, help="Grafana API token (overrides config)")
+
+    args = parser.parse_args()
+    store = BackupStore(Path(args.store))
+
+    if args.list:
+        print_snapshots(store)
+        return
+
+    if args.prune is not None:
+        snapshots, objects = store.prune(args.prune)
+        print(f"🧹 Removed {snapshots} snapshots and {objects} unreferenced objects")
+        return
+
+    if not (args.snapshot or args.restore):
+        parser.print_help()
+        return
+
+    if args.grafana_url and args.api_token:
+        grafana_url, api_token = args.grafana_url, args.api_token
+    else:
+        grafana_url, api_token = get_grafana_config()
+    if not api_token:
+        print("❌ No Grafana API token available")
+        sys.exit(1)
+    uploader = GrafanaUploader(grafana_url, api_token, pool_size=args.concurrency)
+
+    if args.snapshot:
+        print(f"📦 Snapshotting {grafana_url} into {store.root}...")
+        started = time.perf_counter()
+        snapshot_id, stats = snapshot(uploader, store, args.concurrency)
+        for error in stats.errors:
+            print(f"   ❌ {error}")
+        if snapshot_id is None:
+            print("❌ Snapshot failed")
+            sys.exit(1)
+        print(f"✅ Snapshot {snapshot_id}: {stats.objects} objects, {stats.new_objects} new "
+              f"({stats.new_bytes / 1024:.0f} KB written) in {time.perf_counter() - started:.1f}s")
+        uploader.client.print_stats()
+        if stats.errors:
+            sys.exit(1)
+        return
+
+    snapshot_id = store.snapshot_ids()[-1] if args.restore == "latest" and store.snapshot_ids() else args.restore
+    print(f"♻️ Restoring snapshot {snapshot_id} to {grafana_url}{' (dry run)' if args.dry_run else ''}...")
+    results = restore(uploader, store, snapshot_id, args.dashboard, args.dry_run)
+    failed = [result for result in results if not result["success"]]
+    for result in results:
+        if result["success"]:
+            print(f"   ✅ {result['kind']} {result['uid']}: {result['status']}")
+        else:
+            print(f"   ❌ {result['kind']} {result['uid']}: {result['error']}")
+    print(f"{'❌' if failed else '✅'} {len(results) - len(failed)}/{len(results)} objects restored")
+    uploader.client.print_stats()
+    if failed:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
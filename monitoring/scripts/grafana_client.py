@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Grafana HTTP Client
+Pooled keep-alive client shared by the monitoring scripts, with optional gzip request
+bodies, retries with backoff, a circuit breaker and per-request timing over a pluggable
+transport
+"""
+import base64
+import gzip
+import statistics
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Tuple, Union
+from urllib.parse import urlencode
+
+from json_serializer import upload_body
+from grafana_transport import RequestException, Response, create_transport
+from retry_policy import (
+    DEFAULT_RETRY, IDEMPOTENT_METHODS, CircuitBreaker, CircuitOpenError, RetryPolicy, request_not_sent
+)
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = 30
+# Smaller bodies are sent as-is; gzip costs more than it saves on them
+COMPRESS_MIN_BYTES = 1024
+
+@dataclass
+class RequestTiming:
+    """One request made by a GrafanaClient"""
+    method: str
+    path: str
+    status: Optional[int]
+    seconds: float
+    body_bytes: int
+    sent_bytes: int
+    attempt: int = 1
+
+class ClientStats:
+    """Thread-safe log of request timings"""
+
+    def __init__(self):
+        self.timings: List[RequestTiming] = []
+        self.lock = threading.Lock()
+
+    def record(self, timing: RequestTiming):
+        with self.lock:
+            self.timings.append(timing)
+
+    def summary(self) -> Dict[str, Any]:
+        """Request count, failures, latency percentiles in ms and bytes sent"""
+        with self.lock:
+            timings = list(self.timings)
+        latencies = sorted(timing.seconds * 1000 for timing in timings)
+        return {
+            "requests": len(timings),
+            "errors": sum(1 for timing in timings if timing.status is None or timing.status >= 400),
+            "retries": sum(1 for timing in timings if timing.attempt > 1),
+            "total_seconds": sum(timing.seconds for timing in timings),
+            "p50_ms": statistics.median(latencies) if latencies else 0.0,
+            "p95_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0,
+            "max_ms": latencies[-1] if latencies else 0.0,
+            "body_bytes": sum(timing.body_bytes for timing in timings),
+            "sent_bytes": sum(timing.sent_bytes for timing in timings)
+        }
+
+def retry_after_seconds(response: Optional[Response]) -> Optional[float]:
+    """Delay a 429 or 503 response asks for, when given in seconds"""
+    if response is None:
+        return None
+    try:
+        return max(0.0, float(response.headers.get("Retry-After", "")))
+    except ValueError:
+        return None
+
+class GrafanaClient:
+    """HTTP client for one Grafana instance over a pool of keep-alive connections.
+
+    Transport failures and 5xx responses are retried according to the retry policy, as long
+    as the request is idempotent or never reached Grafana. Requests raise
+    grafana_transport.RequestException (requests' own class when it is installed) on transport
+    failures, including CircuitOpenError while the breaker is open; HTTP error statuses are
+    returned for the caller to handle.
+
+    transport is "requests", "http.client" or "auto", which uses requests when installed, or
+    a transport object from grafana_transport. Retries, the breaker and timing work the same
+    over each.
+    """
+
+    def __init__(self, base_url: str, api_token: Optional[str] = None, auth: Optional[Tuple[str, str]] = None,
+                 pool_size: int = DEFAULT_POOL_SIZE, timeout: float = DEFAULT_TIMEOUT, compress: bool = False,
+                 retry: RetryPolicy = DEFAULT_RETRY, breaker: Optional[CircuitBreaker] = None,
+                 transport: Any = "auto"):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        # Only enable when Grafana, or the proxy in front of it, accepts gzip request bodies
+        self.compress = compress
+        self.stats = ClientStats()
+        self.retry = retry
+        # Shared through .cache with every other client of this instance
+        self.breaker = breaker or CircuitBreaker(self.base_url)
+
+        self.transport = create_transport(transport, pool_size) if isinstance(transport, str) else transport
+        self.headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        if api_token:
+            self.headers["Authorization"] = f"Bearer {api_token}"
+        if auth:
+            credentials = base64.b64encode(f"{auth[0]}:{auth[1]}".encode()).decode()
+            self.headers["Authorization"] = f"Basic {credentials}"
+
+    def url(self, path: str) -> str:
+        """Absolute URL of an API path such as /api/health"""
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method: str, path: str, payload: Union[Dict[str, Any], bytes, None] = None,
+                params: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None,
+                idempotent: Optional[bool] = None) -> Response:
+        """Send a request, retrying transient failures; a dict payload is encoded as compact JSON.
+
+        idempotent defaults to the method's semantics; pass True for requests such as an
+        overwriting dashboard save that are safe to repeat.
+        """
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        url = self.url(path)
+        if params:
+            # Lists become repeated keys, e.g. tag=a&tag=b; None values are left out
+            url += "?" + urlencode({key: value for key, value in params.items() if value is not None}, doseq=True)
+        headers = dict(self.headers)
+        data = None
+        if payload is not None:
+            data = payload if isinstance(payload, bytes) else upload_body(payload)
+        body_bytes = len(data) if data else 0
+        if self.compress and body_bytes >= COMPRESS_MIN_BYTES:
+            data = gzip.compress(data, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+
+        self.breaker.before_request()
+        attempt = 0
+        while True:
+            attempt += 1
+            started = time.perf_counter()
+            response = error = None
+            try:
+                response = self.transport.send(method, url, data, headers, timeout or self.timeout)
+            except RequestException as e:
+                error = e
+            self.stats.record(RequestTiming(method, path, response.status_code if response is not None else None,
+                                            time.perf_counter() - started, body_bytes, len(data) if data else 0,
+                                            attempt))
+
+            if response is not None and not self.retry.retries_status(response.status_code):
+                self.breaker.record_success()
+                return response
+
+            retryable = idempotent or (error is not None and request_not_sent(error))
+            if attempt < self.retry.max_attempts and retryable:
+                time.sleep(self.retry.delay(attempt, retry_after_seconds(response)))
+                try:
+                    self.breaker.before_request()
+                    continue
+                except CircuitOpenError:
+                    # Another call opened the circuit, or this is the single trial; report the last failure
+                    pass
+            # The breaker counts calls, not attempts
+            self.breaker.record_failure()
+            if error is not None:
+                raise error
+            return response
+
+    def get(self, path: str, **kwargs) -> Response:
+        return self.request("GET", path, **kwargs)
+
+    def post(self, path: str, payload: Union[Dict[str, Any], bytes, None] = None, **kwargs) -> Response:
+        return self.request("POST", path, payload, **kwargs)
+
+    def put(self, path: str, payload: Union[Dict[str, Any], bytes, None] = None, **kwargs) -> Response:
+        return self.request("PUT", path, payload, **kwargs)
+
+    def patch(self, path: str, payload: Union[Dict[str, Any], bytes, None] = None, **kwargs) -> Response:
+        return self.request("PATCH", path, payload, **kwargs)
+
+    def delete(self, path: str, **kwargs) -> Response:
+        return self.request("DELETE", path, **kwargs)
+
+    def connections_opened(self) -> int:
+        """TCP connections opened so far; with keep-alive this stays near the concurrency"""
+        return self.transport.connections_opened()
+
+    def print_stats(self):
+        """One line summarizing every request made so far"""
+        summary = self.stats.summary()
+        if not summary["requests"]:
+            return
+        compression = ""
+        if summary["sent_bytes"] != summary["body_bytes"]:
+            compression = f" ({summary['sent_bytes'] / 1024:.0f} KB gzipped)"
+        retries = f", {summary['retries']} retries" if summary["retries"] else ""
+        print(f"⏱️ {summary['requests']} requests over {self.connections_opened()} connections in "
+              f"{summary['total_seconds']:.2f}s: p50 {summary['p50_ms']:.0f}ms, p95 {summary['p95_ms']:.0f}ms, "
+              f"{summary['body_bytes'] / 1024:.0f} KB sent{compression}{retries} via {self.transport.name}")
+        if self.breaker.state != CircuitBreaker.CLOSED:
+            print(f"🚫 Circuit breaker for {self.base_url} is {self.breaker.state}")
+
+    def close(self):
+        self.transport.close()
+
+    def __enter__(self) -> 'GrafanaClient':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
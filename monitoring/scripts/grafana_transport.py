@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Grafana HTTP Transports
+Sends GrafanaClient requests over requests when it is installed, or over pooled keep-alive
+connections from the standard library's http.client when it is not
+"""
+import http.client
+import json
+import select
+import socket
+import ssl
+import threading
+from typing import Dict, List, Any, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+
+TRANSPORTS = ("auto", "requests", "http.client")
+
+# Both transports raise the same exceptions, so callers catch RequestException either way.
+# With requests installed these are its own classes.
+if requests is not None:
+    RequestException = requests.exceptions.RequestException
+    HTTPError = requests.exceptions.HTTPError
+    ConnectionFailure = requests.exceptions.ConnectionError
+    ConnectTimeout = requests.exceptions.ConnectTimeout
+    ReadTimeout = requests.exceptions.ReadTimeout
+else:
+    class RequestException(IOError):
+        """A request to Grafana failed"""
+
+        def __init__(self, *args, response: Any = None):
+            super().__init__(*args)
+            self.response = response
+
+    class HTTPError(RequestException):
+        """raise_for_status() on an error status"""
+
+    class ConnectionFailure(RequestException):
+        """The connection to Grafana failed or broke mid-request"""
+
+    class Timeout(RequestException):
+        """Grafana did not answer in time"""
+
+    class ConnectTimeout(ConnectionFailure, Timeout):
+        """The connection could not be opened in time; nothing was sent"""
+
+    class ReadTimeout(Timeout):
+        """The request was sent but the response did not arrive in time"""
+
+class ConnectFailed(ConnectionFailure):
+    """The connection to Grafana could not be opened, so no part of the request was sent"""
+
+class TransportResponse:
+    """The parts of requests.Response the monitoring scripts use"""
+
+    def __init__(self, url: str, status_code: int, reason: str, headers: http.client.HTTPMessage, content: bytes):
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        # Case-insensitive, like requests' headers
+        self.headers = headers
+        self.content = content
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", "replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            kind = "Client" if self.status_code < 500 else "Server"
+            raise HTTPError(f"{self.status_code} {kind} Error: {self.reason} for url: {self.url}", response=self)
+
+# What GrafanaClient requests return, whichever transport sent them
+Response = Union["requests.Response", TransportResponse]
+
+class RequestsTransport:
+    """requests.Session over a pool of keep-alive connections per host"""
+
+    name = "requests"
+
+    def __init__(self, pool_size: int):
+        self.session = requests.Session()
+        self.adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", self.adapter)
+        self.session.mount("https://", self.adapter)
+
+    def send(self, method: str, url: str, data: Optional[bytes], headers: Dict[str, str],
+             timeout: float) -> 'requests.Response':
+        return self.session.request(method, url, data=data, headers=headers, timeout=timeout)
+
+    def connections_opened(self) -> int:
+        pools = self.adapter.poolmanager.pools
+        return sum(pools[key].num_connections for key in pools.keys())
+
+    def close(self):
+        self.session.close()
+
+class HTTPClientTransport:
+    """Keep-alive http.client connections, pooled per host, for when requests is missing.
+
+    Like requests' pool, it opens an extra connection rather than block when every pooled one
+    is busy, and keeps at most pool_size idle. An idle connection the server has closed is
+    noticed before reuse, so a request is never sent on a dead socket.
+    """
+
+    name = "http.client"
+
+    def __init__(self, pool_size: int):
+        self.pool_size = pool_size
+        self.idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self.opened = 0
+        self.lock = threading.Lock()
+        self.ssl_context = ssl.create_default_context()
+
+    def _checkout(self, key: Tuple[str, str, int]) -> Optional[http.client.HTTPConnection]:
+        with self.lock:
+            idle = self.idle.get(key, [])
+            while idle:
+                connection = idle.pop()
+                # Readable while idle means the server sent EOF, or garbage; either way it is done
+                if connection.sock is not None and not select.select([connection.sock], [], [], 0)[0]:
+                    return connection
+                connection.close()
+        return None
+
+    def _checkin(self, key: Tuple[str, str, int], connection: http.client.HTTPConnection):
+        with self.lock:
+            idle = self.idle.setdefault(key, [])
+            if len(idle) < self.pool_size:
+                idle.append(connection)
+                return
+        connection.close()
+
+    def _connect(self, key: Tuple[str, str, int], timeout: float) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        if scheme == "https":
+            connection = http.client.HTTPSConnection(host, port, timeout=timeout, context=self.ssl_context)
+        else:
+            connection = http.client.HTTPConnection(host, port, timeout=timeout)
+        try:
+            connection.connect()
+        except socket.timeout as e:
+            raise ConnectTimeout(f"Connection to {host}:{port} timed out after {timeout}s") from e
+        except OSError as e:
+            raise ConnectFailed(f"Failed to connect to {host}:{port}: {e}") from e
+        with self.lock:
+            self.opened += 1
+        return connection
+
+    def send(self, method: str, url: str, data: Optional[bytes], headers: Dict[str, str],
+             timeout: float) -> TransportResponse:
+        parts = urlsplit(url)
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+        connection = self._checkout(key) or self._connect(key, timeout)
+        try:
+            connection.sock.settimeout(timeout)
+            connection.request(method, target, body=data, headers=headers)
+            response = connection.getresponse()
+            content = response.read()
+        except socket.timeout as e:
+            connection.close()
+            raise ReadTimeout(f"{method} {url} timed out after {timeout}s") from e
+        except (http.client.HTTPException, OSError) as e:
+            connection.close()
+            raise ConnectionFailure(f"{method} {url} failed: {e!r}") from e
+
+        if response.will_close:
+            connection.close()
+        else:
+            self._checkin(key, connection)
+        return TransportResponse(url, response.status, response.reason, response.headers, content)
+
+    def connections_opened(self) -> int:
+        return self.opened
+
+    def close(self):
+        with self.lock:
+            connections = [connection for idle in self.idle.values() for connection in idle]
+            self.idle.clear()
+        for connection in connections:
+            connection.close()
+
+def create_transport(name: str = "auto", pool_size: int = 10) -> Any:
+    """The named transport; auto prefers requests and falls back to http.client without it"""
+    if name not in TRANSPORTS:
+        raise ValueError(f"Unknown transport {name!r}, expected one of {', '.join(TRANSPORTS)}")
+    if name == "requests" and requests is None:
+        raise ImportError("The requests transport needs the requests package; use --transport http.client")
+    if name == "http.client" or requests is None:
+        return HTTPClientTransport(pool_size)
+    return RequestsTransport(pool_size)
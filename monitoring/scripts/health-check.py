@@ -9,10 +9,18 @@ import sys
 import time
 from datetime import datetime
 
-def check_service(name, url, expected_status=200, timeout=5):
-    """Check if a service is responding correctly"""
+from grafana_client import GrafanaClient
+from retry_policy import NO_RETRY, CircuitBreaker, load_breaker_states
+
+# Grafana checks share one pooled keep-alive client. A health check reports what it sees: no retries,
+# and a breaker of its own, so it neither waits on nor trips the one shared by uploads and deploys
+grafana = GrafanaClient("http://localhost:3000", auth=('admin', 'nestory123'), timeout=5, retry=NO_RETRY,
+                        breaker=CircuitBreaker("http://localhost:3000", state_path=None))
+
+def check_service(name, url, expected_status=200, timeout=5, client=None):
+    """Check if a service is responding correctly; with client, url is a path on its instance"""
     try:
-        response = requests.get(url, timeout=timeout)
+        response = client.get(url, timeout=timeout) if client else requests.get(url, timeout=timeout)
         if response.status_code == expected_status:
             print(f"✅ {name}: Running")
             return True
@@ -50,11 +58,7 @@ def check_grafana_dashboard():
     """Check if the professional dashboard exists and is accessible"""
     try:
         # Check dashboard exists
-        response = requests.get(
-            "http://localhost:3000/api/dashboards/uid/nry-full",
-            auth=('admin', 'nestory123'),
-            timeout=5
-        )
+        response = grafana.get("/api/dashboards/uid/nry-full")
         
         if response.status_code == 200:
             dashboard = response.json()
@@ -69,6 +73,21 @@ def check_grafana_dashboard():
         print(f"❌ Dashboard check failed: {e}")
         return False
 
+def check_circuit_breakers():
+    """Report the Grafana circuit breakers tripped by the upload and deploy scripts"""
+    states = load_breaker_states()
+    tripped = {name: saved for name, saved in states.items() if saved.get("state") != CircuitBreaker.CLOSED}
+    if not tripped:
+        print(f"✅ Circuit Breakers: all closed ({len(states)} Grafana instances seen)")
+        return True
+    
+    for name, saved in sorted(tripped.items()):
+        retry_in = saved.get("opened_at", 0) + saved.get("reset_seconds", 0) - time.time()
+        opened = datetime.fromtimestamp(saved.get("opened_at", 0)).strftime('%H:%M:%S')
+        trial = f"trial request allowed in {retry_in:.0f}s" if retry_in > 0 else "next request is a trial"
+        print(f"❌ Circuit Breaker {name}: open since {opened} after {saved.get('failures', '?')} failures, {trial}")
+    return False
+
 def check_recording_rules():
     """Check if Prometheus recording rules are loaded"""
     try:
@@ -103,15 +122,15 @@ def main():
     
     # Core services
     services = [
-        ("Prometheus", "http://localhost:9090/-/healthy"),
-        ("Pushgateway", "http://localhost:9091/"),
-        ("Grafana", "http://localhost:3000/api/health"),
+        ("Prometheus", "http://localhost:9090/-/healthy", None),
+        ("Pushgateway", "http://localhost:9091/", None),
+        ("Grafana", "/api/health", grafana),
     ]
     
     print("📊 Core Services:")
-    for name, url in services:
+    for name, url, client in services:
         total_checks += 1
-        if check_service(name, url):
+        if check_service(name, url, client=client):
             checks_passed += 1
     
     # Optional services
@@ -125,6 +144,7 @@ def main():
     advanced_checks = [
         ("Prometheus Targets", check_prometheus_targets),
         ("Grafana Dashboard", check_grafana_dashboard), 
+        ("Grafana Circuit Breakers", check_circuit_breakers),
         ("Recording Rules", check_recording_rules),
     ]
     
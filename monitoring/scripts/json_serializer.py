@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Dashboard JSON Serializer
+Shared encoding for dashboard documents: pretty for files kept in git, compact for
+upload bodies, canonical (sorted, compact) for hashing, with streaming file writes
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Any, Iterator, NamedTuple, Optional, Tuple
+
+from build_cache import write_if_changed
+
+class JsonStyle(NamedTuple):
+    """json.dumps options for one output mode"""
+    indent: Optional[int]
+    separators: Tuple[str, str]
+    sort_keys: bool
+
+MODES = {
+    # Same bytes as json.dumps(obj, indent=2), so existing dashboard files do not churn
+    "pretty": JsonStyle(2, (",", ": "), False),
+    "compact": JsonStyle(None, (",", ":"), False),
+    "canonical": JsonStyle(None, (",", ":"), True),
+}
+
+# Containers nested deeper than this are encoded in one json.dumps call; shallower ones
+# are emitted item by item, so a dashboard streams out one panel at a time
+STREAM_DEPTH = 2
+
+def _style(mode: str) -> JsonStyle:
+    try:
+        return MODES[mode]
+    except KeyError:
+        raise ValueError(f"Unknown JSON mode '{mode}', expected one of {sorted(MODES)}") from None
+
+def dumps(obj: Any, mode: str = "pretty") -> str:
+    """Serialize obj in one of the MODES"""
+    style = _style(mode)
+    return json.dumps(obj, indent=style.indent, separators=style.separators, sort_keys=style.sort_keys)
+
+def _key_text(key: Any) -> str:
+    """A dict key as json.dumps writes it: str as is, numbers, booleans and None in their JSON form"""
+    if isinstance(key, str):
+        return key
+    if key is None or isinstance(key, (bool, int, float)):
+        return json.dumps(key)
+    raise TypeError(f"keys must be str, int, float, bool or None, not {type(key).__name__}")
+
+def _iter_encode(value: Any, style: JsonStyle, depth: int, level: int) -> Iterator[str]:
+    """Yield value's encoding in chunks, matching dumps() byte for byte"""
+    if depth == 0 or not isinstance(value, (dict, list)) or not value:
+        text = json.dumps(value, indent=style.indent, separators=style.separators, sort_keys=style.sort_keys)
+        if style.indent is not None and level:
+            text = text.replace("\n", "\n" + " " * (style.indent * level))
+        yield text
+        return
+
+    item_separator, key_separator = style.separators
+    if style.indent is None:
+        newline = closing = ""
+    else:
+        newline = "\n" + " " * (style.indent * (level + 1))
+        closing = "\n" + " " * (style.indent * level)
+
+    if isinstance(value, dict):
+        items = sorted(value.items()) if style.sort_keys else value.items()
+        yield "{"
+        for index, (key, item) in enumerate(items):
+            yield (item_separator if index else "") + newline + json.dumps(_key_text(key)) + key_separator
+            yield from _iter_encode(item, style, depth - 1, level + 1)
+        yield closing + "}"
+    else:
+        yield "["
+        for index, item in enumerate(value):
+            yield (item_separator if index else "") + newline
+            yield from _iter_encode(item, style, depth - 1, level + 1)
+        yield closing + "]"
+
+def iter_json(obj: Any, mode: str = "pretty", depth: int = STREAM_DEPTH) -> Iterator[str]:
+    """Serialize obj incrementally; the joined chunks equal dumps(obj, mode)"""
+    return _iter_encode(obj, _style(mode), depth, 0)
+
+def write_json(path: Path, obj: Any, mode: str = "pretty") -> bool:
+    """Stream obj to path atomically, leaving the file untouched if the bytes are unchanged"""
+    return write_if_changed(path, iter_json(obj, mode))
+
+def load_json(path: Path) -> Any:
+    """Load a JSON document from disk"""
+    with open(path, 'rb') as f:
+        return json.load(f)
+
+def canonical_bytes(obj: Any) -> bytes:
+    """Key-order independent encoding of obj"""
+    return dumps(obj, "canonical").encode()
+
+def content_hash(obj: Any) -> str:
+    """SHA-256 of the canonical encoding, equal for semantically equal documents"""
+    return hashlib.sha256(canonical_bytes(obj)).hexdigest()
+
+def upload_body(payload: Dict[str, Any]) -> bytes:
+    """Compact UTF-8 request body for the Grafana API"""
+    return dumps(payload, "compact").encode()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Grafana Library Panels
+Publishes each dashboard component once as a library panel and replaces inline panel
+JSON in dashboards with references by UID
+"""
+import hashlib
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Set, Tuple
+
+from json_serializer import load_json, write_json
+from shared_queries import is_bound
+
+# Library element files live next to the dashboards that reference them
+LIBRARY_DIR_NAME = "library"
+# Grafana UIDs are at most 40 characters
+MAX_UID_LENGTH = 40
+# Grafana library element kind for panels
+PANEL_KIND = 1
+
+def library_panel_uid(component_name: str) -> str:
+    """Stable library panel UID for a component, e.g. nry-lib-error-rate"""
+    uid = "nry-lib-" + component_name.replace("_", "-")
+    if len(uid) > MAX_UID_LENGTH:
+        digest = hashlib.blake2b(component_name.encode(), digest_size=4).hexdigest()
+        uid = uid[:MAX_UID_LENGTH - len(digest) - 1] + "-" + digest
+    return uid
+
+def library_dir_for(output_path: Path) -> Path:
+    """Directory holding the library elements of a dashboard file"""
+    return Path(output_path).parent / LIBRARY_DIR_NAME
+
+def link_library_panels(component_panels: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """Replace component panels in place with library panel references.
+
+    Panels bound to another panel's queries are dashboard-specific and stay inline.
+    Returns the library elements by UID, ready for POST /api/library-elements.
+    """
+    elements = {}
+    for component_name, panel in component_panels:
+        if is_bound(panel):
+            continue
+
+        uid = library_panel_uid(component_name)
+        # id and gridPos belong to the dashboard; the shared model leaves them out
+        model = {key: value for key, value in panel.items() if key not in ("id", "gridPos")}
+        elements[uid] = {"uid": uid, "name": model["title"], "kind": PANEL_KIND, "model": model}
+
+        reference = {
+            "gridPos": panel["gridPos"],
+            "id": panel["id"],
+            "libraryPanel": {"uid": uid, "name": model["title"]},
+            "title": model["title"]
+        }
+        panel.clear()
+        panel.update(reference)
+
+    return elements
+
+def write_library_elements(library_dir: Path, elements: Dict[str, Dict[str, Any]]) -> int:
+    """Write one file per library element; returns how many changed on disk"""
+    return sum(write_json(Path(library_dir) / f"{uid}.json", element) for uid, element in sorted(elements.items()))
+
+def referenced_library_uids(panels: Iterable[Dict[str, Any]]) -> Set[str]:
+    """UIDs of library panels referenced by a dashboard, including panels nested in rows"""
+    uids = set()
+    for panel in panels:
+        if "libraryPanel" in panel:
+            uids.add(panel["libraryPanel"]["uid"])
+        uids |= referenced_library_uids(panel.get("panels", []))
+    return uids
+
+def load_library_elements(library_dir: Path, uids: Iterable[str]) -> List[Dict[str, Any]]:
+    """Load the library element files for uids, failing loudly on a missing one"""
+    elements = []
+    for uid in sorted(uids):
+        path = Path(library_dir) / f"{uid}.json"
+        if not path.exists():
+            raise FileNotFoundError(f"Library panel {uid} not found: {path}")
+        elements.append(load_json(path))
+    return elements
+
+def resolve_library_panels(panels: List[Dict[str, Any]], elements: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Copy of panels with library references replaced by their models, as Grafana renders them"""
+    resolved = []
+    for panel in panels:
+        uid = panel.get("libraryPanel", {}).get("uid")
+        if uid in elements:
+            panel = {**elements[uid]["model"], "gridPos": panel["gridPos"], "id": panel["id"]}
+        elif panel.get("panels"):
+            panel = {**panel, "panels": resolve_library_panels(panel["panels"], elements)}
+        resolved.append(panel)
+    return resolved
+
+def load_referenced_elements(panels: List[Dict[str, Any]], library_dir: Path) -> Dict[str, Dict[str, Any]]:
+    """Library elements referenced by panels that exist in library_dir, by UID"""
+    return {
+        uid: load_json(Path(library_dir) / f"{uid}.json")
+        for uid in referenced_library_uids(panels)
+        if (Path(library_dir) / f"{uid}.json").exists()
+    }
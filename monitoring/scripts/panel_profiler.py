@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Panel Generation Profiler
+Records per-component create and render time, emitted JSON size and target count while
+dashboards are generated, prints a sortable report and pushes the numbers to a Pushgateway
+"""
+import csv
+import urllib.error
+import urllib.parse
+import urllib.request
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List, Any, Callable, Iterable, Optional
+
+from json_serializer import dumps, write_json
+
+PUSHGATEWAY_JOB = "nestory_dashboard_generator"
+
+@dataclass
+class ComponentProfile:
+    """Measurements for one component of one generated dashboard"""
+    template: str
+    environment: str
+    section: str
+    component: str
+    create_seconds: float = 0.0
+    render_seconds: float = 0.0
+    json_bytes: int = 0
+    targets: int = 0
+    cached: bool = False
+    error: Optional[str] = None
+
+    @property
+    def total_seconds(self) -> float:
+        return self.create_seconds + self.render_seconds
+
+# Report orderings; the numeric ones put the worst components first
+SORT_KEYS: Dict[str, Callable[[ComponentProfile], Any]] = {
+    "time": lambda profile: -profile.total_seconds,
+    "bytes": lambda profile: -profile.json_bytes,
+    "targets": lambda profile: -profile.targets,
+    "name": lambda profile: (profile.component, profile.template, profile.environment),
+}
+
+# Profilers entered with `with`, innermost last
+_active: List['PanelProfiler'] = []
+
+def active_profiler() -> Optional['PanelProfiler']:
+    """The innermost profiler entered in this process, if any"""
+    return _active[-1] if _active else None
+
+class PanelProfiler:
+    """Context manager that collects a ComponentProfile for every component generated inside it"""
+
+    def __init__(self):
+        self.profiles: List[ComponentProfile] = []
+
+    def __enter__(self) -> 'PanelProfiler':
+        _active.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _active.remove(self)
+        return False
+
+    def start(self, template: str, environment: str, section: str, component: str) -> ComponentProfile:
+        """Begin the profile of one component"""
+        profile = ComponentProfile(template, environment, section, component)
+        self.profiles.append(profile)
+        return profile
+
+    def measure_output(self, profile: ComponentProfile, panel: Dict[str, Any]):
+        """Record the size and query count of a component's final panel JSON"""
+        profile.json_bytes = len(dumps(panel, "compact").encode())
+        profile.targets = len(panel.get("targets", []))
+
+def profiles_from_dicts(rows: Iterable[Dict[str, Any]]) -> List[ComponentProfile]:
+    """Rebuild profiles sent back from worker processes"""
+    return [ComponentProfile(**row) for row in rows]
+
+def sort_profiles(profiles: List[ComponentProfile], sort_by: str = "time") -> List[ComponentProfile]:
+    """Profiles in report order"""
+    if sort_by not in SORT_KEYS:
+        raise ValueError(f"Unknown sort '{sort_by}', expected one of {sorted(SORT_KEYS)}")
+    return sorted(profiles, key=SORT_KEYS[sort_by])
+
+def print_profile_report(profiles: List[ComponentProfile], sort_by: str = "time", limit: Optional[int] = None):
+    """Print one line per component, worst first by sort_by"""
+    rows = sort_profiles(profiles, sort_by)
+    print(f"{'Component':<28} {'Template':<15} {'Env':<8} {'Create':>9} {'Render':>9} "
+          f"{'Bytes':>8} {'Targets':>7}  Status")
+    print("─" * 100)
+    for profile in rows[:limit]:
+        status = f"❌ {profile.error}" if profile.error else ("cached" if profile.cached else "rendered")
+        print(f"{profile.component[:27]:<28} {profile.template:<15} {profile.environment:<8} "
+              f"{profile.create_seconds * 1e6:>7.0f}µs {profile.render_seconds * 1e6:>7.0f}µs "
+              f"{profile.json_bytes:>8,} {profile.targets:>7}  {status}")
+    print("─" * 100)
+
+    failed = sum(1 for profile in profiles if profile.error)
+    total_bytes = sum(profile.json_bytes for profile in profiles)
+    total_ms = sum(profile.total_seconds for profile in profiles) * 1000
+    print(f"📊 {len(profiles)} components: {total_ms:.1f}ms, {total_bytes:,} bytes of panel JSON"
+          + (f", ❌ {failed} failed" if failed else ""))
+
+def write_profile_report(path: Path, profiles: List[ComponentProfile], sort_by: str = "time"):
+    """Write the report as CSV or, for a .json path, as a JSON list"""
+    path = Path(path)
+    rows = [{**asdict(profile), "total_seconds": profile.total_seconds}
+            for profile in sort_profiles(profiles, sort_by)]
+    if path.suffix == ".json":
+        write_json(path, rows)
+        return
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ["component"])
+        writer.writeheader()
+        writer.writerows(rows)
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def exposition(profiles: List[ComponentProfile]) -> str:
+    """Profiles in the Prometheus text exposition format"""
+    metrics = [
+        ("nestory_dashboard_panel_render_seconds", "Component create and render time",
+         lambda profile: profile.total_seconds),
+        ("nestory_dashboard_panel_json_bytes", "Compact JSON size of the emitted panel",
+         lambda profile: profile.json_bytes),
+        ("nestory_dashboard_panel_targets", "Query targets on the emitted panel",
+         lambda profile: profile.targets),
+        ("nestory_dashboard_panel_errors", "Whether the component failed to generate",
+         lambda profile: 1 if profile.error else 0),
+    ]
+    lines = []
+    for name, help_text, value in metrics:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for profile in profiles:
+            labels = ",".join(f'{key}="{_escape_label(getattr(profile, key))}"'
+                              for key in ("template", "environment", "section", "component"))
+            lines.append(f"{name}{{{labels}}} {value(profile)}")
+    return "\n".join(lines) + "\n"
+
+def push_profiles(profiles: List[ComponentProfile], pushgateway_url: str, job: str = PUSHGATEWAY_JOB,
+                  grouping: Optional[Dict[str, str]] = None, timeout: float = 10) -> bool:
+    """Replace the metrics of this job and grouping on the Pushgateway with profiles;
+    returns whether it succeeded"""
+    url = f"{pushgateway_url.rstrip('/')}/metrics/job/{urllib.parse.quote(job, safe='')}"
+    for label, value in (grouping or {}).items():
+        url += f"/{urllib.parse.quote(label, safe='')}/{urllib.parse.quote(value, safe='')}"
+    request = urllib.request.Request(url, data=exposition(profiles).encode(), method="PUT",
+                                     headers={"Content-Type": "text/plain; version=0.0.4"})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return 200 <= response.status < 300
+    except (urllib.error.URLError, OSError) as e:
+        print(f"⚠️ Failed to push profile to {pushgateway_url}: {e}")
+        return False
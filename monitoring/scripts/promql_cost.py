@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Static PromQL Cost Analyzer
+Estimates the Prometheus load of dashboard queries and enforces a per-refresh cost budget
+"""
+import json
+import re
+import sys
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+
+from recording_rules import find_calls
+from json_serializer import load_json
+from library_panels import library_dir_for, load_referenced_elements, resolve_library_panels
+
+DASHBOARDS_DIR = Path(__file__).parent.parent / "dashboards"
+
+# Cost units per refresh a single generated dashboard may spend before generation fails; the
+# generated dashboards cost up to about 305, hand-maintained ones in dashboards/ run far higher
+DEFAULT_COST_BUDGET = 400.0
+
+# Heuristic weights
+RECORDED_SERIES_COST = 0.2      # nestory:* series are precomputed by recording rules
+REGEX_MATCHER_FACTOR = 2.0      # =~ and !~ scan the whole label index
+BUCKET_SERIES_FACTOR = 10.0     # one series per histogram bucket
+AGGREGATION_DEPTH_FACTOR = 0.25
+UNAGGREGATED_QUANTILE_FACTOR = 4.0
+
+_DURATION_UNITS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800, "y": 31536000}
+_GROUPING_PATTERN = re.compile(r'\b(by|without|on|ignoring|group_left|group_right)\s*\([^)]*\)')
+_STRING_PATTERN = re.compile(r'"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\'')
+_SELECTOR_PATTERN = re.compile(
+    r'(?<![\w:.$])([a-zA-Z_:][\w:]*)(?![\w:])\s*(\{[^}]*\})?\s*(\[[^\]]+\])?(?!\s*\()'
+)
+# Grafana interval variables with a known span; others fall back to one minute
+_VARIABLE_WINDOWS = {"$__range": 6 * 3600, "$__range_s": 6 * 3600}
+_KEYWORDS = {"and", "or", "unless", "bool", "offset", "by", "without", "on", "ignoring",
+             "group_left", "group_right", "inf", "nan"}
+
+class CostBudgetExceeded(Exception):
+    """A dashboard's estimated query cost exceeds its budget"""
+    pass
+
+def parse_duration(text: str) -> Optional[float]:
+    """Seconds in a PromQL/Grafana duration such as 5m or 1h30m; None for variables"""
+    parts = re.findall(r'(\d+(?:\.\d+)?)(ms|s|m|h|d|w|y)', text)
+    if not parts or "".join(number + unit for number, unit in parts) != text.strip():
+        return None
+    return sum(float(number) * _DURATION_UNITS[unit] for number, unit in parts)
+
+def _window_seconds(range_text: str) -> float:
+    """Span covered by a range selector or subquery, in seconds"""
+    window, subquery, step = range_text.strip("[]").partition(":")
+    seconds = parse_duration(window) or _VARIABLE_WINDOWS.get(window.strip(), 60.0)
+    if subquery:
+        # Subqueries evaluate the inner expression once per step; [5m:] steps at the one minute default
+        seconds *= seconds / (parse_duration(step) or 60.0)
+    return seconds
+
+def _aggregation_depth(expr: str) -> int:
+    """Deepest nesting of aggregation operators"""
+    spans = []
+    start = -1
+    for function, call in find_calls(expr):
+        # Calls are reported in order of their start offset
+        start = expr.find(call, start + 1)
+        if function != "histogram_quantile":
+            spans.append((start, start + len(call)))
+    return max((sum(1 for s, e in spans if s <= start and end <= e) for start, end in spans), default=0)
+
+def _has_unaggregated_quantile(expr: str) -> bool:
+    """histogram_quantile over raw bucket rates without a sum by (le) first"""
+    for function, call in find_calls(expr):
+        if function != "histogram_quantile":
+            continue
+        inner = call[call.index("(") + 1:]
+        # Recorded nestory:*_bucket:* series are summed by le already
+        raw_buckets = re.search(r'(?<![\w:])[a-zA-Z_]\w*_bucket(?![\w:])', inner)
+        if raw_buckets and not re.search(r'\b(sum|avg|max|min)\s*(by\s*\([^)]*\ble\b|\()', inner):
+            return True
+    return False
+
+def estimate_query_cost(expr: str) -> Tuple[float, Dict[str, float]]:
+    """Estimate the relative cost of evaluating expr once, with the contributing factors"""
+    cleaned = _GROUPING_PATTERN.sub(" ", expr)
+    selectors = 0
+    regex_matchers = 0
+    window_units = 0.0
+    selector_cost = 0.0
+
+    for match in _SELECTOR_PATTERN.finditer(_STRING_PATTERN.sub('""', cleaned)):
+        name, matchers, range_text = match.groups()
+        if name.lower() in _KEYWORDS:
+            continue
+
+        regexes = len(re.findall(r'=~|!~', matchers or ""))
+
+        cost = RECORDED_SERIES_COST if ":" in name else 1.0
+        cost *= REGEX_MATCHER_FACTOR ** regexes
+        if name.endswith("_bucket") and ":" not in name:
+            cost *= BUCKET_SERIES_FACTOR
+        if range_text:
+            window = _window_seconds(range_text) / 60
+            window_units += window
+            cost *= window
+
+        selectors += 1
+        regex_matchers += regexes
+        selector_cost += cost
+
+    depth = _aggregation_depth(expr)
+    cost = selector_cost * (1 + AGGREGATION_DEPTH_FACTOR * depth)
+    unaggregated_quantile = _has_unaggregated_quantile(expr)
+    if unaggregated_quantile:
+        cost *= UNAGGREGATED_QUANTILE_FACTOR
+
+    return cost, {
+        "selectors": selectors,
+        "window_minutes": window_units,
+        "regex_matchers": regex_matchers,
+        "aggregation_depth": depth,
+        "unaggregated_quantile": unaggregated_quantile,
+    }
+
+@dataclass
+class QueryCost:
+    """Estimated cost of one panel target"""
+    panel_title: str
+    ref_id: str
+    expr: str
+    cost: float
+    factors: Dict[str, float]
+    on_open: bool = True
+
+@dataclass
+class DashboardCost:
+    """Estimated query cost of a whole dashboard"""
+    name: str
+    refresh_seconds: Optional[float]
+    panel_count: int
+    queries: List[QueryCost] = field(default_factory=list)
+
+    @property
+    def cost_per_refresh(self) -> float:
+        return sum(query.cost for query in self.queries)
+
+    @property
+    def cost_per_minute(self) -> float:
+        if not self.refresh_seconds:
+            return 0.0
+        return self.cost_per_refresh * 60 / self.refresh_seconds
+
+    @property
+    def queries_on_open(self) -> int:
+        """Queries fired when the dashboard opens, i.e. outside collapsed rows"""
+        return sum(1 for query in self.queries if query.on_open)
+    
+    @property
+    def cost_on_open(self) -> float:
+        return sum(query.cost for query in self.queries if query.on_open)
+    
+    def top_queries(self, count: int = 5) -> List[QueryCost]:
+        return sorted(self.queries, key=lambda query: query.cost, reverse=True)[:count]
+
+def unwrap_dashboard(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Return the dashboard model from a bare or API-wrapped ({"dashboard": ...}) document"""
+    if isinstance(document.get("dashboard"), dict):
+        return document["dashboard"]
+    return document
+
+def _walk_panels(panels: Iterable[Dict[str, Any]], on_open: bool = True) -> Iterable[Tuple[Dict[str, Any], bool]]:
+    """Yield (panel, queried on open) including panels nested under rows;
+    Grafana only queries panels in a collapsed row once it is expanded"""
+    for panel in panels:
+        yield panel, on_open
+        yield from _walk_panels(panel.get("panels", []), on_open and not panel.get("collapsed", False))
+
+def analyze_dashboard(dashboard: Dict[str, Any], name: Optional[str] = None) -> DashboardCost:
+    """Estimate the cost of every visible query target in a dashboard"""
+    dashboard = unwrap_dashboard(dashboard)
+    refresh = dashboard.get("refresh")
+    refresh_seconds = parse_duration(refresh) if isinstance(refresh, str) and refresh else None
+
+    panels = [(panel, on_open) for panel, on_open in _walk_panels(dashboard.get("panels", []))
+              if panel.get("type") != "row"]
+    result = DashboardCost(name or dashboard.get("uid") or dashboard.get("title", "dashboard"),
+                           refresh_seconds, len(panels))
+
+    for panel, on_open in panels:
+        for target in panel.get("targets", []):
+            expr = target.get("expr")
+            if not isinstance(expr, str) or not expr.strip() or target.get("hide"):
+                continue
+            cost, factors = estimate_query_cost(expr)
+            result.queries.append(QueryCost(panel.get("title", ""), target.get("refId", ""), expr, cost,
+                                            factors, on_open))
+
+    return result
+
+def analyze_file(path: Path) -> DashboardCost:
+    """Estimate the query cost of a dashboard JSON file, resolving library panels next to it"""
+    dashboard = unwrap_dashboard(load_json(path))
+    elements = load_referenced_elements(dashboard.get("panels", []), library_dir_for(path))
+    if elements:
+        dashboard = {**dashboard, "panels": resolve_library_panels(dashboard["panels"], elements)}
+    return analyze_dashboard(dashboard, name=Path(path).name)
+
+def generate_dashboards(directory: Path) -> List[Path]:
+    """Build every template for every environment into directory, without the build cache or
+    a budget, and return the dashboard files written"""
+    # Imported here: the generator imports this module to enforce its budget
+    from dashboard_generator import BuildOptions, build_matrix
+    results = build_matrix(output_dir=directory, options=BuildOptions(use_cache=False, cost_budget=None))
+    failed = [result for result in results if "error" in result]
+    if failed:
+        raise RuntimeError(f"{failed[0]['template']}-{failed[0]['environment']} failed to generate: "
+                           f"{failed[0]['error']}")
+    return [Path(result["output"]) for result in results]
+
+def check_budget(result: DashboardCost, budget: float = DEFAULT_COST_BUDGET):
+    """Raise CostBudgetExceeded if a dashboard costs more than budget per refresh"""
+    if result.cost_per_refresh > budget:
+        worst = result.top_queries(1)
+        detail = f"; most expensive: '{worst[0].panel_title}' ({worst[0].cost:.1f})" if worst else ""
+        raise CostBudgetExceeded(
+            f"{result.name} costs {result.cost_per_refresh:.1f} per refresh, budget is {budget:.1f}{detail}"
+        )
+
+def print_report(results: List[DashboardCost], budget: float, top: int = 3):
+    """Print a cost summary table with the most expensive queries per dashboard"""
+    print(f"{'Dashboard':<40} {'Panels':>6} {'Queries':>7} {'On open':>7} {'Refresh':>8} "
+          f"{'Cost/refresh':>13} {'Cost/min':>9}")
+    print("─" * 98)
+    for result in sorted(results, key=lambda r: r.cost_per_refresh, reverse=True):
+        status = "❌" if result.cost_per_refresh > budget else "✅"
+        refresh = f"{result.refresh_seconds:g}s" if result.refresh_seconds else "off"
+        print(f"{status} {result.name[:37]:<37} {result.panel_count:>6} {len(result.queries):>7} "
+              f"{result.queries_on_open:>7} {refresh:>8} "
+              f"{result.cost_per_refresh:>13.1f} {result.cost_per_minute:>9.1f}")
+        for query in result.top_queries(top):
+            print(f"      {query.cost:>8.1f}  {query.panel_title[:30]:<30} {query.expr[:60]}")
+    print("─" * 98)
+    print(f"Budget: {budget:.1f} cost units per refresh")
+
+def main():
+    """Analyze dashboard JSON files and fail if any exceeds the cost budget"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Estimate Prometheus query cost of Grafana dashboards")
+    parser.add_argument("paths", nargs="*", help="Dashboard JSON files (default: dashboards/*.json)")
+    parser.add_argument("--budget", type=float, default=DEFAULT_COST_BUDGET,
+                        help=f"Per-refresh cost budget (default: {DEFAULT_COST_BUDGET:g})")
+    parser.add_argument("--generated", action="store_true",
+                        help="Generate every template for every environment into a temporary directory "
+                             "and analyze those instead of files")
+    parser.add_argument("--top", type=int, default=3, help="Most expensive queries to show per dashboard")
+    parser.add_argument("--json", action="store_true", help="Emit machine-readable JSON")
+
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as generated_dir:
+        if args.generated:
+            try:
+                paths = generate_dashboards(Path(generated_dir))
+            except RuntimeError as e:
+                print(f"❌ {e}", file=sys.stderr)
+                sys.exit(1)
+        else:
+            paths = [Path(p) for p in args.paths] or sorted(DASHBOARDS_DIR.glob("*.json"))
+
+        results = []
+        for path in paths:
+            try:
+                results.append(analyze_file(path))
+            except (OSError, json.JSONDecodeError, AttributeError) as e:
+                print(f"⚠️ Skipping {path}: {e}", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps([{
+            "dashboard": r.name,
+            "panels": r.panel_count,
+            "queries": len(r.queries),
+            "queries_on_open": r.queries_on_open,
+            "cost_on_open": round(r.cost_on_open, 2),
+            "refresh_seconds": r.refresh_seconds,
+            "cost_per_refresh": round(r.cost_per_refresh, 2),
+            "cost_per_minute": round(r.cost_per_minute, 2),
+            "over_budget": r.cost_per_refresh > args.budget,
+            "top_queries": [{"panel": q.panel_title, "refId": q.ref_id, "expr": q.expr,
+                             "cost": round(q.cost, 2), "factors": q.factors} for q in r.top_queries(args.top)]
+        } for r in results], indent=2))
+    else:
+        print_report(results, args.budget, args.top)
+
+    if any(result.cost_per_refresh > args.budget for result in results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
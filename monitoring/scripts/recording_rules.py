@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Recording Rule Synthesis
+Finds expensive or repeated PromQL subexpressions in dashboard panels, emits
+Prometheus recording rules for them and rewrites panels to the nestory:* series
+"""
+import hashlib
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+
+import yaml
+
+CONFIG_DIR = Path(__file__).parent.parent / "config"
+HAND_WRITTEN_RULES_PATH = CONFIG_DIR / "prometheus-recording-rules.yml"
+GENERATED_RULES_PATH = CONFIG_DIR / "prometheus-generated-rules.yml"
+GENERATED_GROUP_NAME = "nestory_generated_rules"
+
+# Function calls worth precomputing; aggregations may carry a by/without clause
+_CALL_PATTERN = re.compile(
+    r'\b(histogram_quantile|sum|avg|min|max|count)\s*((?:by|without)\s*\([^)]*\)\s*)?\('
+)
+_RANGE_SELECTOR_PATTERN = re.compile(r'([a-zA-Z_:][a-zA-Z0-9_:]*)\s*(?:\{[^}]*\})?\s*\[(\w+)\]')
+_RATE_PATTERN = re.compile(r'\b(rate|irate|increase)\s*\(')
+
+def normalize_expr(expr: str) -> str:
+    """Whitespace-insensitive form of a PromQL expression used for matching"""
+    return re.sub(r'\s+', '', expr)
+
+def _matching_paren(expr: str, open_index: int) -> Optional[int]:
+    """Index of the parenthesis closing the one at open_index"""
+    depth = 0
+    quote = None
+    for index in range(open_index, len(expr)):
+        char = expr[index]
+        if quote:
+            if char == quote and expr[index - 1] != '\\':
+                quote = None
+        elif char in ('"', "'"):
+            quote = char
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                return index
+    return None
+
+def find_calls(expr: str) -> List[Tuple[str, str]]:
+    """All histogram_quantile and aggregation calls in expr, outermost first"""
+    calls = []
+    for match in _CALL_PATTERN.finditer(expr):
+        end = _matching_paren(expr, match.end() - 1)
+        if end is not None:
+            calls.append((match.group(1), expr[match.start():end + 1]))
+    return calls
+
+def _metric_base(metric: str) -> str:
+    """Strip the nestory_ namespace and counter/bucket suffixes from a metric name"""
+    base = metric[len("nestory_"):] if metric.startswith("nestory_") else metric
+    for suffix in ("_bucket", "_total"):
+        if base.endswith(suffix):
+            base = base[:-len(suffix)]
+    return base.replace(":", "_")
+
+def _quantile_label(quantile: str) -> str:
+    """0.95 -> p95, 0.999 -> p999"""
+    percent = float(quantile) * 100
+    return f"p{int(percent)}" if percent == int(percent) else "p" + f"{percent:g}".replace(".", "")
+
+def walk_targets(panels: Iterable[Dict[str, Any]]) -> Iterable[Dict[str, Any]]:
+    """Yield every query target in a panel list, including panels nested in rows"""
+    for panel in panels:
+        for target in panel.get("targets", []):
+            if isinstance(target.get("expr"), str):
+                yield target
+        yield from walk_targets(panel.get("panels", []))
+
+class RecordingRuleSet:
+    """Ordered recording rules with an expression index for rewriting queries"""
+
+    def __init__(self):
+        self.rules: List[Dict[str, str]] = []
+        self.records_by_expr: Dict[str, str] = {}
+
+    @classmethod
+    def load(cls, *paths: Path) -> 'RecordingRuleSet':
+        """Load recording rules from Prometheus rule files that exist"""
+        rule_set = cls()
+        for path in paths:
+            path = Path(path)
+            if not path.exists():
+                continue
+            with open(path, 'r') as f:
+                rule_file = yaml.safe_load(f) or {}
+            for group in rule_file.get("groups", []):
+                for rule in group.get("rules", []):
+                    if "record" in rule:
+                        rule_set.add(rule["record"], rule["expr"].strip())
+        return rule_set
+
+    @property
+    def record_names(self) -> set:
+        return {rule["record"] for rule in self.rules}
+
+    def add(self, record: str, expr: str):
+        """Add a rule; the first record for an expression wins"""
+        self.rules.append({"record": record, "expr": expr})
+        self.records_by_expr.setdefault(normalize_expr(expr), record)
+
+    def merged(self, other: 'RecordingRuleSet') -> 'RecordingRuleSet':
+        """A new set with this set's rules followed by other's"""
+        rule_set = RecordingRuleSet()
+        for rule in self.rules + other.rules:
+            rule_set.add(rule["record"], rule["expr"])
+        return rule_set
+
+    def fingerprint(self) -> str:
+        """Digest of the expression index, for build cache keys"""
+        index = "\n".join(f"{expr}={record}" for expr, record in sorted(self.records_by_expr.items()))
+        return hashlib.sha256(index.encode()).hexdigest()
+
+    def rewrite(self, expr: str) -> str:
+        """Replace every recorded subexpression in expr with its nestory:* series"""
+        record = self.records_by_expr.get(normalize_expr(expr))
+        if record:
+            return record
+
+        parts = []
+        position = 0
+        while True:
+            match = _CALL_PATTERN.search(expr, position)
+            end = _matching_paren(expr, match.end() - 1) if match else None
+            if end is None:
+                parts.append(expr[position:])
+                break
+
+            call = expr[match.start():end + 1]
+            record = self.records_by_expr.get(normalize_expr(call))
+            if not record:
+                # Rewrite the arguments, then retry: outer rules may be written against inner records
+                rewritten = expr[match.start():match.end()] + self.rewrite(expr[match.end():end]) + ")"
+                record = self.records_by_expr.get(normalize_expr(rewritten), rewritten)
+
+            parts.append(expr[position:match.start()])
+            parts.append(record)
+            position = end + 1
+
+        return "".join(parts)
+
+    def rewrite_panels(self, panels: List[Dict[str, Any]]) -> int:
+        """Rewrite target expressions in place; returns the number of targets changed"""
+        changed = 0
+        for target in walk_targets(panels):
+            rewritten = self.rewrite(target["expr"])
+            if rewritten != target["expr"]:
+                target["expr"] = rewritten
+                changed += 1
+        return changed
+
+    def to_yaml(self, group_name: str = GENERATED_GROUP_NAME, interval: str = "30s") -> str:
+        """Render the rules as a Prometheus rule file"""
+        header = (
+            "# Nestory Generated Recording Rules\n"
+            "# Synthesized from dashboard panel queries by dashboard_generator.py --synthesize-rules\n"
+            "# Do not edit by hand; hand-written rules live in prometheus-recording-rules.yml\n\n"
+        )
+        document = {"groups": [{"name": group_name, "interval": interval, "rules": self.rules}]}
+        return header + yaml.safe_dump(document, sort_keys=False, width=1000)
+
+class RecordingRuleSynthesizer:
+    """Collects panel queries and synthesizes recording rules for the costly parts"""
+
+    def __init__(self, existing: Optional[RecordingRuleSet] = None, min_occurrences: int = 2):
+        self.existing = existing or RecordingRuleSet()
+        self.min_occurrences = min_occurrences
+        self.occurrences: Counter = Counter()
+        self.calls: Dict[str, Tuple[str, str]] = {}
+
+    def add_expr(self, expr: str):
+        """Record every candidate subexpression of a panel query"""
+        for function, call in find_calls(expr):
+            key = normalize_expr(call)
+            self.occurrences[key] += 1
+            self.calls.setdefault(key, (function, call))
+
+    def add_dashboard(self, dashboard: Dict[str, Any]):
+        """Record every panel query in a generated dashboard"""
+        for target in walk_targets(dashboard.get("panels", [])):
+            self.add_expr(target["expr"])
+
+    def _kind(self, key: str) -> Optional[str]:
+        """Classify a candidate: quantile, bucket_rate, aggregation or None"""
+        function, call = self.calls[key]
+        if function == "histogram_quantile":
+            return "quantile"
+        if not _RATE_PATTERN.search(call):
+            return None
+        if "_bucket" in call:
+            return "bucket_rate"
+        if self.occurrences[key] >= self.min_occurrences:
+            return "aggregation"
+        return None
+
+    def _record_name(self, kind: str, call: str, taken: set) -> str:
+        """Name a synthesized rule following the nestory:* convention"""
+        selector = _RANGE_SELECTOR_PATTERN.search(call)
+        metric, window = selector.groups() if selector else ("expr", "")
+        base = _metric_base(metric)
+
+        if kind == "quantile":
+            quantile = call[call.index("(") + 1:].split(",", 1)[0].strip()
+            name = f"nestory:{base}_{_quantile_label(quantile)}"
+        else:
+            function = _CALL_PATTERN.match(call)
+            operation = "" if function.group(1) == "sum" else f"{function.group(1)}_"
+            grouping = re.findall(r'\w+', function.group(2) or "")[1:]
+            suffix = f"_by_{'_'.join(grouping)}" if grouping and kind != "bucket_rate" else ""
+            series = f"{base}_bucket" if kind == "bucket_rate" else base
+            name = f"nestory:{series}:{operation}rate{window}{suffix}"
+
+        candidate, counter = name, 2
+        while candidate in taken:
+            candidate = f"{name}_{counter}"
+            counter += 1
+        return candidate
+
+    def synthesize(self) -> RecordingRuleSet:
+        """Build the generated rule set; bucket rates first so quantiles can build on them"""
+        generated = RecordingRuleSet()
+        taken = set(self.existing.record_names)
+        order = {"bucket_rate": 0, "aggregation": 1, "quantile": 2}
+
+        candidates = [(key, self._kind(key)) for key in self.calls]
+        candidates = sorted(((key, kind) for key, kind in candidates if kind), key=lambda c: order[c[1]])
+
+        for key, kind in candidates:
+            if key in self.existing.records_by_expr or key in generated.records_by_expr:
+                continue
+
+            _, call = self.calls[key]
+            expr = self.existing.merged(generated).rewrite(call) if kind == "quantile" else call
+            record = self._record_name(kind, call, taken)
+            taken.add(record)
+            generated.add(record, expr)
+            # Index the original spelling too so panels rewrite straight to the record
+            generated.records_by_expr.setdefault(key, record)
+
+        return generated
+
+def load_rule_set() -> RecordingRuleSet:
+    """Hand-written and generated rules, as used to rewrite dashboard queries"""
+    return RecordingRuleSet.load(HAND_WRITTEN_RULES_PATH, GENERATED_RULES_PATH)
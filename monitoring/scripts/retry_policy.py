@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Grafana Retry Policy and Circuit Breaker
+Retries transient Grafana failures with jittered exponential backoff and stops sending
+requests to an instance that keeps failing, sharing breaker state between processes
+"""
+import json
+import random
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from build_cache import write_if_changed
+from grafana_transport import ConnectFailed, ConnectTimeout, ConnectionFailure, RequestException, requests
+
+if requests is not None:
+    from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+try:
+    import fcntl
+except ImportError:
+    # Without file locks, processes saving at the same moment may drop each other's update
+    fcntl = None
+
+BREAKER_STATE_PATH = Path(__file__).parent.parent / ".cache" / "circuit-breakers.json"
+# Safe to send twice; other methods are retried only when the request never left
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often and how long to wait before retrying a failed request"""
+    max_attempts: int = 4
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+
+    def retries_status(self, status: int) -> bool:
+        """Whether a response status is worth retrying; 429 is left to the caller's rate limiter"""
+        return status >= 500 and status != 501
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait after the given failed attempt, with full jitter"""
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+        if retry_after is not None:
+            backoff = max(backoff, min(retry_after, self.max_delay))
+        return backoff
+
+DEFAULT_RETRY = RetryPolicy()
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+def request_not_sent(error: RequestException) -> bool:
+    """Whether a transport error happened before any of the request reached the server"""
+    if isinstance(error, (ConnectTimeout, ConnectFailed)):
+        return True
+    if requests is None:
+        return False
+    reason = error.args[0] if error.args else None
+    return isinstance(reason, MaxRetryError) and isinstance(reason.reason, NewConnectionError)
+
+class CircuitOpenError(ConnectionFailure):
+    """Raised instead of sending a request to an instance whose circuit breaker is open"""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"Circuit breaker for {name} is open after repeated failures; "
+                         f"next attempt allowed in {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker for one Grafana instance.
+
+    After failure_threshold failed calls in a row the circuit opens and requests fail
+    fast for reset_seconds. A call counts once, however often it was retried. Then a single
+    trial request is let through: success closes the circuit, failure opens it again. Every
+    change is merged into this instance's entry in state_path, so other processes, and
+    health-check.py, share the failure count and see an instance that is down.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_seconds: float = 30.0,
+                 state_path: Optional[Path] = BREAKER_STATE_PATH):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state_path = Path(state_path) if state_path else None
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+        self.lock = threading.Lock()
+
+        saved = load_breaker_states(self.state_path).get(name, {}) if self.state_path else {}
+        self.failures = saved.get("failures", 0)
+        if saved.get("state") in (self.OPEN, self.HALF_OPEN):
+            self.opened_at = saved.get("opened_at", 0.0)
+            # Once the cooldown has passed the next request is a trial, however old the saved state is
+            self.state = self.OPEN if self.opened_at + reset_seconds > time.time() else self.HALF_OPEN
+
+    def before_request(self):
+        """Raise CircuitOpenError unless a request may be sent now"""
+        with self.lock:
+            if self.state == self.OPEN:
+                retry_in = self.opened_at + self.reset_seconds - time.time()
+                if retry_in > 0:
+                    raise CircuitOpenError(self.name, retry_in)
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN:
+                if self.trial_in_flight:
+                    raise CircuitOpenError(self.name, 0)
+                self.trial_in_flight = True
+
+    def record_success(self):
+        with self.lock:
+            changed = self.failures or self.state != self.CLOSED
+            self.failures = 0
+            self.trial_in_flight = False
+            self.state = self.CLOSED
+            if changed:
+                self._save()
+
+    def record_failure(self):
+        """Count one failed call; call it once the call's retries are exhausted, not per attempt"""
+        with self.lock:
+            self.failures += 1
+            self.trial_in_flight = False
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self.opened_at = time.time()
+            self._save()
+
+    def _save(self):
+        if self.state_path is None:
+            return
+        with _locked(self.state_path):
+            # Other processes may have saved other instances since this one loaded; only ours is replaced
+            states = load_breaker_states(self.state_path)
+            states[self.name] = {"state": self.state, "failures": self.failures, "opened_at": self.opened_at,
+                                 "reset_seconds": self.reset_seconds, "updated": time.time()}
+            # Written to a temporary file and renamed over the old one, so readers never see half a file
+            write_if_changed(self.state_path, json.dumps(states, indent=2, sort_keys=True))
+
+@contextmanager
+def _locked(state_path: Path):
+    """Hold an exclusive lock on state_path's lock file, serializing read-modify-write across processes"""
+    if fcntl is None:
+        yield
+        return
+    state_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(state_path.with_name(state_path.name + ".lock"), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def load_breaker_states(state_path: Path = BREAKER_STATE_PATH) -> Dict[str, Dict[str, Any]]:
+    """Last saved breaker state per instance"""
+    try:
+        with open(state_path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Cross-Panel Query Sharing
+Binds panels whose queries duplicate another panel's to that panel through
+Grafana's "-- Dashboard --" datasource, so each distinct query runs once per refresh
+"""
+from typing import Dict, List, Any, FrozenSet, Optional, Tuple
+
+from recording_rules import normalize_expr
+
+DASHBOARD_DATASOURCE = {"type": "datasource", "uid": "-- Dashboard --"}
+
+QueryKey = Tuple[str, bool, str, str]
+
+def _query_key(target: Dict[str, Any]) -> QueryKey:
+    """Identity of a query result: expression plus the options that change its shape"""
+    return (
+        normalize_expr(target["expr"]),
+        bool(target.get("instant", False)),
+        target.get("format", ""),
+        target.get("interval", "")
+    )
+
+def _panel_queries(panel: Dict[str, Any]) -> Dict[QueryKey, str]:
+    """Map each visible Prometheus query of a panel to its refId"""
+    queries = {}
+    for target in panel.get("targets", []):
+        if isinstance(target.get("expr"), str) and not target.get("hide"):
+            queries.setdefault(_query_key(target), target.get("refId", "A"))
+    return queries
+
+def is_bound(panel: Dict[str, Any]) -> bool:
+    """Whether a panel already reads its data from another panel"""
+    return panel.get("datasource", {}).get("uid") == DASHBOARD_DATASOURCE["uid"]
+
+def _bind(panel: Dict[str, Any], source: Dict[str, Any], ref_ids: List[str]):
+    """Point panel at source's results, filtered to ref_ids when it only needs a subset"""
+    panel["datasource"] = dict(DASHBOARD_DATASOURCE)
+    panel["targets"] = [{
+        "datasource": dict(DASHBOARD_DATASOURCE),
+        "panelId": source["id"],
+        "refId": "A",
+        "withTransforms": False
+    }]
+
+    if ref_ids:
+        include = ref_ids[0] if len(ref_ids) == 1 else f"/^({'|'.join(ref_ids)})$/"
+        panel["transformations"] = [{"id": "filterByRefId", "options": {"include": include}}] + \
+            panel.get("transformations", [])
+
+def _flatten(panels: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], Optional[int]]]:
+    """Panels in dashboard order with the id of the collapsed row holding them, if any"""
+    flat = []
+    for panel in panels:
+        flat.append((panel, None))
+        if panel.get("type") == "row" and panel.get("collapsed"):
+            flat.extend((nested, panel.get("id")) for nested in panel.get("panels", []))
+    return flat
+
+def share_duplicate_queries(panels: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Bind panels whose queries are identical to, or a subset of, another panel's queries.
+
+    Panels with the most queries become sources first so subsets can attach to them.
+    A panel inside a collapsed row only runs once the row is expanded, so it can serve
+    panels of its own row but never panels elsewhere.
+    Returns one report entry per bound panel.
+    """
+    candidates = []
+    for order, (panel, row) in enumerate(_flatten(panels)):
+        if panel.get("type") == "row" or is_bound(panel) or "id" not in panel:
+            continue
+        queries = _panel_queries(panel)
+        if queries:
+            candidates.append((order, row, panel, queries))
+
+    candidates.sort(key=lambda candidate: (-len(candidate[3]), candidate[0]))
+
+    sources: List[Tuple[int, Optional[int], Dict[str, Any], Dict[QueryKey, str], FrozenSet[QueryKey]]] = []
+    report = []
+
+    for order, row, panel, queries in candidates:
+        keys = frozenset(queries)
+        matches = [source for source in sources if keys <= source[4] and source[1] in (None, row)]
+        if not matches:
+            sources.append((order, row, panel, queries, keys))
+            continue
+
+        # Prefer an identical query set, then the smallest superset, then dashboard order
+        _, _, source, source_queries, source_keys = min(matches, key=lambda s: (len(s[4]), s[0]))
+        identical = keys == source_keys
+        ref_ids = [] if identical else sorted(source_queries[key] for key in keys)
+        _bind(panel, source, ref_ids)
+
+        report.append({
+            "panel": panel.get("title", ""),
+            "panel_id": panel["id"],
+            "source": source.get("title", ""),
+            "source_id": source["id"],
+            "mode": "identical" if identical else "subset",
+            "queries_saved": len(keys)
+        })
+
+    return report
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Tests for the dashboard build cache
+"""
+import sys
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+# Add the scripts directory to Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+import dashboard_generator
+from build_cache import DashboardBuildCache, write_if_changed
+from dashboard_generator import BuildOptions, build_dashboard
+
+def test_write_if_changed_keeps_mtime_of_unchanged_files():
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "out.json"
+        assert write_if_changed(path, '{"a": 1}')
+        os.utime(path, (1_000_000, 1_000_000))
+
+        assert not write_if_changed(path, '{"a": 1}')
+        assert not write_if_changed(path, iter(['{"a"', ': 1}']))
+        assert path.stat().st_mtime == 1_000_000
+
+        assert write_if_changed(path, iter(['{"a"', ': 2}']))
+        assert path.read_text() == '{"a": 2}'
+        assert [p.name for p in Path(directory).iterdir()] == ["out.json"]
+
+def test_fresh_dashboard_is_not_rebuilt():
+    with tempfile.TemporaryDirectory() as directory:
+        output = Path(directory) / "production-dev.json"
+        with mock.patch.object(DashboardBuildCache, "for_output",
+                               side_effect=lambda path: DashboardBuildCache(Path(directory) / "cache.json")):
+            assert build_dashboard("production", "dev", output)["status"] == "written"
+            assert build_dashboard("production", "dev", output)["status"] == "cached"
+
+            # A changed environment config slice invalidates the dashboard, not the unchanged panels
+            changed = {"environment": "dev", "prometheus_url": "http://prometheus.example:9090"}
+            with mock.patch.object(dashboard_generator, "environment_slice", return_value=changed):
+                assert build_dashboard("production", "dev", output)["status"] != "cached"
+            cache = DashboardBuildCache(Path(directory) / "cache.json")
+            assert cache.panels
+
+            # So does an edited output file
+            output.write_text("{}")
+            assert build_dashboard("production", "dev", output, BuildOptions())["status"] == "written"
+
+def test_panels_are_reused_and_pruned_on_save():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = DashboardBuildCache(Path(directory) / "cache.json")
+        renders = []
+        for key in ("a", "b"):
+            cache.panel(key, lambda: renders.append(key) or {"title": key})
+        cache.save()
+
+        cache = DashboardBuildCache(Path(directory) / "cache.json")
+        assert cache.panel("a", lambda: renders.append("a again") or {}) == {"title": "a"}
+        assert renders == ["a", "b"] and cache.hits == 1
+        cache.save()
+
+        # b was not used by the latest build
+        assert set(DashboardBuildCache(Path(directory) / "cache.json").panels) == {"a"}
+
+def test_generator_fingerprint_covers_the_modules_shaping_output():
+    assert {"shared_queries.py", "library_panels.py", "recording_rules.py", "json_serializer.py",
+            "component_catalog.py"} <= set(dashboard_generator.GENERATOR_MODULES)
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
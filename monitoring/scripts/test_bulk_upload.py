@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for concurrent bulk dashboard upload
+"""
+import sys
+import os
+import threading
+import time
+import tempfile
+from pathlib import Path
+
+# Add the scripts directory to Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bulk_upload import TokenBucket, UploadOutcome, upload_many, upload_summary
+
+class FakeUploader:
+    """Records concurrency and answers 429 to the first attempt of throttled dashboards"""
+
+    def __init__(self, throttled=(), delay=0.02):
+        self.throttled = set(throttled)
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def upload_dashboard(self, dashboard_path, folder_id=0):
+        name = Path(dashboard_path).name
+        with self.lock:
+            self.calls.append((name, time.monotonic()))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            throttle = name in self.throttled
+            self.throttled.discard(name)
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+        if throttle:
+            return {"success": False, "error": "429 Too Many Requests", "status_code": 429, "retry_after": 0.1}
+        return {"success": True, "dashboard_uid": name, "status": "success", "version": 1}
+
+def _dashboards(directory, count):
+    paths = []
+    for index in range(count):
+        path = Path(directory) / f"dash-{index}.json"
+        path.write_text("{}")
+        paths.append(path)
+    return paths
+
+def test_concurrency_is_bounded_and_order_kept():
+    with tempfile.TemporaryDirectory() as directory:
+        paths = _dashboards(directory, 12)
+        uploader = FakeUploader()
+        outcomes = upload_many(uploader, paths, concurrency=3, rate=None)
+
+        assert uploader.max_in_flight == 3
+        assert [outcome.path for outcome in outcomes] == paths
+        assert all(outcome.result["success"] and outcome.attempts == 1 for outcome in outcomes)
+
+def test_429_is_retried_after_retry_after():
+    with tempfile.TemporaryDirectory() as directory:
+        paths = _dashboards(directory, 4)
+        uploader = FakeUploader(throttled={"dash-1.json"})
+        outcomes = upload_many(uploader, paths, concurrency=2, rate=None)
+
+        assert all(outcome.result["success"] for outcome in outcomes)
+        assert outcomes[1].attempts == 2
+        attempts = [at for name, at in uploader.calls if name == "dash-1.json"]
+        assert attempts[1] - attempts[0] >= 0.1
+
+def test_429_gives_up_after_max_attempts():
+    class AlwaysThrottled(FakeUploader):
+        def upload_dashboard(self, dashboard_path, folder_id=0):
+            self.calls.append(dashboard_path)
+            return {"success": False, "error": "429", "status_code": 429, "retry_after": 0.01}
+
+    with tempfile.TemporaryDirectory() as directory:
+        uploader = AlwaysThrottled()
+        outcomes = upload_many(uploader, _dashboards(directory, 1), concurrency=1, rate=None, max_attempts=3)
+
+        assert outcomes[0].attempts == 3 and not outcomes[0].result["success"]
+        assert len(uploader.calls) == 3
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=20, burst=1)
+    started = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    # The first token is available at once, the other four arrive 50ms apart
+    assert time.monotonic() - started >= 0.18
+
+def test_token_bucket_pause_holds_every_caller():
+    bucket = TokenBucket(rate=None)
+    bucket.pause(0.1)
+    assert bucket.acquire() >= 0.09
+    assert bucket.acquire() == 0.0
+
+def test_skipped_dashboards_do_not_count_toward_throughput():
+    def outcome(status, success=True):
+        return UploadOutcome(Path(f"{status}.json"), {"success": success, "status": status}, 1, 0.1, 0.0, 2048)
+    outcomes = [outcome("success"), outcome("unchanged"), outcome("unchanged"), outcome("error", success=False)]
+
+    summary = upload_summary(outcomes, 2.0)
+    assert (summary["uploaded"], summary["unchanged"], summary["failed"]) == (1, 2, 1)
+    assert summary["dashboards_per_s"] == 0.5
+    assert summary["kb_per_s"] == 1.0
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
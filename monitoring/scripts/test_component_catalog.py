@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for the declarative component catalog
+"""
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+# Add the scripts directory to Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from component_catalog import CatalogError, compile_spec, load_catalog
+from dashboard_generator import ComponentLibrary, GaugePanel
+
+CATALOG = """
+components:
+  queue_depth:
+    type: gauge
+    title: Queue Depth
+    max_val: 500
+    targets:
+      - expr: sum(nestory_queue_depth)
+        legend_format: Depth
+"""
+
+def test_invalid_definitions_are_rejected():
+    """Unknown types, options and target fields fail at compile time"""
+    for definition in (
+        {"type": "piechart", "title": "X", "targets": [{"expr": "up"}]},
+        {"type": "stat", "title": "X", "y_max": 1, "targets": [{"expr": "up"}]},
+        {"type": "stat", "title": "X", "targets": [{"expr": "up", "legend": "x"}]},
+        {"type": "stat", "title": "X", "targets": []},
+        {"type": "gauge", "title": "X", "max_val": True, "targets": [{"expr": "up"}]},
+    ):
+        try:
+            compile_spec("broken", definition)
+        except CatalogError:
+            continue
+        raise AssertionError(f"accepted {definition}")
+
+def test_catalog_is_cached_and_instantiated_lazily():
+    """A compiled catalog round-trips through the disk cache and builds components on demand"""
+    with tempfile.TemporaryDirectory() as directory:
+        catalog_path = Path(directory) / "team.yaml"
+        catalog_path.write_text(CATALOG)
+        cache_path = Path(directory) / "catalog.marshal"
+
+        compiled = load_catalog([catalog_path], cache_path, memo=False)
+        assert cache_path.exists()
+        assert load_catalog([catalog_path], cache_path, memo=False) == compiled
+
+        library = ComponentLibrary(compiled)
+        assert library.names() == ["queue_depth"]
+        component = library.create_component("queue_depth")
+        assert isinstance(component, GaugePanel)
+        assert component.max_val == 500
+        assert component.targets[0].ref_id == "A"
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for the structural dashboard diff and upload plans
+"""
+import copy
+import sys
+import os
+
+# Add the scripts directory to Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from dashboard_diff import ADD, CHANGE, REMOVE, diff_dashboards, plan_counts, print_plan
+
+REMOTE = {
+    "uid": "nry-test",
+    "title": "Test",
+    "id": 12,
+    "version": 7,
+    "tags": ["nestory"],
+    "templating": {"list": [
+        {"name": "environment", "type": "custom", "query": "dev,prod", "current": {"value": "dev"}}
+    ]},
+    "panels": [
+        {"id": 1, "type": "row", "title": "Overview", "panels": [
+            {"id": 2, "type": "stat", "title": "Errors", "pluginVersion": "10.0.0",
+             "targets": [{"refId": "A", "expr": "sum(rate(errors_total[5m]))"}]}
+        ]},
+        {"id": 3, "type": "timeseries", "title": "Latency",
+         "targets": [{"refId": "A", "expr": "histogram_quantile(0.95, rate(latency_bucket[5m]))"}]}
+    ]
+}
+
+def _local():
+    local = copy.deepcopy(REMOTE)
+    for key in ("id", "version"):
+        del local[key]
+    del local["templating"]["list"][0]["current"]
+    del local["panels"][0]["panels"][0]["pluginVersion"]
+    return local
+
+def test_grafana_managed_fields_are_not_changes():
+    assert diff_dashboards(_local(), REMOTE) == []
+
+def test_target_change_inside_row_is_reported_under_its_panel():
+    local = _local()
+    local["panels"][0]["panels"][0]["targets"][0]["expr"] = "sum(rate(errors_total[1m]))"
+
+    changes = diff_dashboards(local, REMOTE)
+    assert [(change.action, change.kind, change.name) for change in changes] == \
+        [(CHANGE, "panel", '2 "Errors"'), (CHANGE, "target", "A")]
+    assert changes[1].parent == '2 "Errors"'
+    assert "[5m]" in changes[1].detail and "[1m]" in changes[1].detail
+    assert plan_counts(changes) == (0, 1, 0)
+
+def test_added_removed_panels_variables_and_settings():
+    local = _local()
+    local["title"] = "Renamed"
+    local["panels"].pop()
+    local["panels"].append({"id": 4, "type": "gauge", "title": "Saturation", "targets": []})
+    local["templating"]["list"][0]["query"] = "dev,staging,prod"
+    local["templating"]["list"].append({"name": "region", "type": "query"})
+
+    changes = {(change.action, change.kind, change.name) for change in diff_dashboards(local, REMOTE)}
+    assert changes == {
+        (CHANGE, "setting", "title"),
+        (CHANGE, "variable", "environment"),
+        (ADD, "variable", "region"),
+        (ADD, "panel", '4 "Saturation"'),
+        (REMOVE, "panel", '3 "Latency"'),
+    }
+
+def test_plan_output(capsys=None):
+    local = _local()
+    local["panels"][1]["targets"].append({"refId": "B", "expr": "up"})
+    changes = diff_dashboards(local, REMOTE)
+    print_plan("nry-test", "Test", changes)
+    print_plan("nry-new", "New", None)
+    if capsys is not None:
+        output = capsys.readouterr().out
+        assert '~ dashboard nry-test "Test" will be updated' in output
+        assert "        + target B: up" in output
+        assert '+ dashboard nry-new "New" will be created' in output
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Tests for the modular dashboard generator
+"""
+import json
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+# Add the scripts directory to Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from dashboard_generator import (
+    SLOTS, BuildOptions, DashboardTemplate, GridPosition, PanelIdAllocator, PanelTarget, SkylineLayout, StatPanel,
+    build_dashboard, build_matrix, stable_panel_id, create_unified_template
+)
+from promql_cost import DEFAULT_COST_BUDGET, CostBudgetExceeded, analyze_dashboard
+from panel_profiler import PanelProfiler, exposition
+
+def test_stable_panel_id_is_deterministic():
+    """Panel IDs depend only on their identifying parts"""
+    assert stable_panel_id("unified", "Overview", "error_rate") == stable_panel_id("unified", "Overview", "error_rate")
+    assert stable_panel_id("unified", "Overview", "error_rate") != stable_panel_id("unified", "Overview", "api_health")
+    assert 1 <= stable_panel_id("error_rate") <= 2**31 - 1
+
+def test_allocator_probes_on_collision():
+    """Allocating the same parts twice yields two distinct, reproducible IDs"""
+    first = PanelIdAllocator()
+    ids = [first.allocate("unified", "Overview", "error_rate") for _ in range(3)]
+    assert len(set(ids)) == 3
+    assert first.collisions == 3
+
+    second = PanelIdAllocator()
+    assert [second.allocate("unified", "Overview", "error_rate") for _ in range(3)] == ids
+
+def test_generated_dashboard_is_byte_identical():
+    """Two generations of the same template serialize identically with unique panel IDs"""
+    first = create_unified_template().generate_dashboard("dev")
+    second = create_unified_template().generate_dashboard("dev")
+    assert json.dumps(first, sort_keys=True) == json.dumps(second, sort_keys=True)
+
+    panel_ids = [panel["id"] for panel in first["panels"]]
+    assert len(panel_ids) == len(set(panel_ids))
+
+def test_skyline_fills_gaps_beside_tall_panels():
+    """Short panels stack beside a tall one instead of starting a new row below it"""
+    layout = SkylineLayout(24, origin_y=1)
+    tall = layout.next_position(12, 8)
+    first = layout.next_position(12, 4)
+    second = layout.next_position(12, 4)
+
+    assert (tall.x, tall.y) == (0, 1)
+    assert (first.x, first.y) == (12, 1)
+    assert (second.x, second.y) == (12, 5)
+    assert layout.bottom == 9
+
+def test_prioritized_section_places_critical_panels_first():
+    """Higher priority components are placed at the top of a skyline section"""
+    template = DashboardTemplate("test", "Test")
+    template.add_section("Overview", [
+        {"name": "system_load", "size": {"width": 24, "height": 6}},
+        {"name": "error_rate", "size": {"width": 12, "height": 4}, "priority": 10},
+        {"name": "api_health", "size": {"width": 12, "height": 4}, "priority": 10}
+    ], layout="skyline", prioritize=True)
+    template.add_section("Details", [{"name": "disk_usage", "size": {"width": 24, "height": 4}}])
+
+    panels = {panel["title"]: panel["gridPos"] for panel in template.generate_dashboard("dev")["panels"]}
+    assert panels["Error Rate"]["y"] == panels["API Health Score"]["y"] == 1
+    assert panels["System Load & Free Memory"]["y"] == 5
+    assert panels["Details"]["y"] == 11
+
+def test_collapsed_section_nests_panels_and_skips_queries_on_open():
+    """Collapsed rows carry their panels and take one grid unit until expanded"""
+    template = DashboardTemplate("test", "Test")
+    template.add_section("Critical", [{"name": "error_rate", "size": {"width": 24, "height": 4}}])
+    template.add_section("Details", [{"name": "disk_usage", "size": {"width": 24, "height": 4}}],
+                         collapsed=True)
+    template.add_section("More", [{"name": "system_load", "size": {"width": 24, "height": 4}}],
+                         collapsed=True)
+
+    dashboard = template.generate_dashboard("dev")
+    rows = [panel for panel in dashboard["panels"] if panel["type"] == "row"]
+    assert [row["gridPos"]["y"] for row in rows] == [0, 5, 6]
+    assert [panel["title"] for panel in rows[1]["panels"]] == ["Disk Usage"]
+    assert rows[1]["panels"][0]["gridPos"]["y"] == 6
+
+    cost = analyze_dashboard(dashboard)
+    assert cost.queries_on_open == 1
+    assert len(cost.queries) > cost.queries_on_open
+
+def test_panels_share_immutable_fragments_but_not_targets():
+    """Static blocks are shared between panels; targets, which rewrites edit, are not"""
+    component = StatPanel("test", "Test", [PanelTarget("up")])
+    first = component.generate_panel(GridPosition(4, 6, 0, 0))
+    second = component.generate_panel(GridPosition(4, 6, 6, 0))
+
+    assert first["fieldConfig"]["defaults"]["thresholds"] is second["fieldConfig"]["defaults"]["thresholds"]
+    assert first["datasource"] is second["datasource"]
+    assert first["targets"][0] is not second["targets"][0]
+    assert first["targets"] == [{"expr": "up", "legendFormat": "", "refId": "A", "instant": False}]
+    assert first["gridPos"] == {"h": 4, "w": 6, "x": 0, "y": 0}
+    assert hasattr(GridPosition(1, 1, 0, 0), "__dict__") == (not SLOTS)
+
+def test_profiler_measures_each_component():
+    """Every component generated inside a profiler gets timing, final size and target count"""
+    template = DashboardTemplate("test", "Test")
+    template.add_section("Overview", [{"name": "error_rate"}, {"name": "system_load"}])
+
+    with PanelProfiler() as profiler:
+        dashboard = template.generate_dashboard("dev")
+
+    panels = {panel["title"]: panel for panel in dashboard["panels"]}
+    profiles = {profile.component: profile for profile in profiler.profiles}
+    assert set(profiles) == {"error_rate", "system_load"}
+    assert profiles["system_load"].targets == len(panels["System Load & Free Memory"]["targets"])
+    assert profiles["error_rate"].json_bytes > 0 and profiles["error_rate"].render_seconds > 0
+    assert 'component="error_rate"' in exposition(profiler.profiles)
+
+def test_failed_components_are_reported():
+    """A failing component is left out and recorded, or raised in strict mode"""
+    template = DashboardTemplate("test", "Test")
+    template.add_section("Overview", [{"name": "error_rate"}, {"name": "no_such_component"}])
+
+    with PanelProfiler() as profiler:
+        dashboard = template.generate_dashboard("dev")
+    assert len(dashboard["panels"]) == 2
+    assert [failure["component"] for failure in template.component_errors] == ["no_such_component"]
+    assert profiler.profiles[1].error.startswith("ValueError")
+
+    try:
+        template.generate_dashboard("dev", strict=True)
+        assert False, "strict generation should fail"
+    except RuntimeError as e:
+        assert "no_such_component" in str(e)
+
+def test_matrix_build_matches_serial_build():
+    """Every template × environment lands, byte for byte what a serial build writes"""
+    options = BuildOptions(use_cache=False)
+    with tempfile.TemporaryDirectory() as parallel, tempfile.TemporaryDirectory() as serial:
+        results = build_matrix(["production", "unified"], ["dev", "prod"], Path(parallel), max_workers=2,
+                               options=options)
+        assert [(r["template"], r["environment"], r["status"]) for r in results] == [
+            ("production", "dev", "written"), ("production", "prod", "written"),
+            ("unified", "dev", "written"), ("unified", "prod", "written")]
+
+        for result in results:
+            output = Path(result["output"])
+            expected = Path(serial) / output.name
+            build_dashboard(result["template"], result["environment"], expected, options)
+            assert output.read_bytes() == expected.read_bytes()
+
+def test_matrix_worker_errors_are_reported():
+    """A job failing in a worker comes back as an error result; the other jobs still land"""
+    with tempfile.TemporaryDirectory() as directory:
+        results = build_matrix(["production", "no_such_template"], ["dev"], Path(directory), max_workers=2,
+                               options=BuildOptions(use_cache=False))
+        failed = [result for result in results if "error" in result]
+        assert [(r["template"], r["environment"]) for r in failed] == [("no_such_template", "dev")]
+        assert "no_such_template" in failed[0]["error"]
+        assert (Path(directory) / "production-dev.json").exists()
+
+def test_generation_enforces_the_cost_budget_by_default():
+    assert BuildOptions().cost_budget == DEFAULT_COST_BUDGET
+    with tempfile.TemporaryDirectory() as directory:
+        output = Path(directory) / "unified-dev.json"
+        try:
+            build_dashboard("unified", "dev", output, BuildOptions(use_cache=False, cost_budget=10.0))
+            assert False, "expected CostBudgetExceeded"
+        except CostBudgetExceeded:
+            assert not output.exists()
+        build_dashboard("unified", "dev", output, BuildOptions(use_cache=False, cost_budget=None))
+        assert output.exists()
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
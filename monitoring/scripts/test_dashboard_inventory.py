@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests for the paginated dashboard inventory and concurrent export
+"""
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+# Add the scripts directory to Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fake_grafana import FakeGrafana, FaultInjection
+from grafana_client import GrafanaClient
+from dashboard_inventory import export_dashboards, iter_dashboards
+from json_serializer import load_json
+
+def _serve():
+    """25 dashboards, every other one in team-a, every third tagged prod; bodies answer slowly"""
+    fake = FakeGrafana(FaultInjection(latency=0.01)).start()
+    fake.state.create_folder({"uid": "team-a", "title": "Team A"})
+    for index in range(25):
+        fake.state.save_dashboard({"dashboard": {"uid": f"dash-{index:03d}", "title": f"Dashboard {index}",
+                                                 "tags": ["prod"] if index % 3 == 0 else ["dev"], "panels": []},
+                                   "folderUid": "team-a" if index % 2 else None})
+    return fake, GrafanaClient(fake.url, pool_size=8)
+
+def _searches(fake):
+    return [request.query for request in fake.received if request.route == "GET /api/search"]
+
+def test_pages_are_fetched_lazily():
+    fake, client = _serve()
+    try:
+        dashboards = iter_dashboards(client, page_size=10)
+        assert next(dashboards)["uid"] == "dash-000"
+        assert len(_searches(fake)) == 1
+
+        assert len(list(dashboards)) == 24
+        assert [search["page"] for search in _searches(fake)] == [["1"], ["2"], ["3"]]
+    finally:
+        fake.stop()
+
+def test_folder_and_tag_filters_are_sent_to_grafana():
+    fake, client = _serve()
+    try:
+        hits = list(iter_dashboards(client, folder_uids=["team-a"], tags=["prod"], page_size=10))
+        assert [hit["uid"] for hit in hits] == ["dash-003", "dash-009", "dash-015", "dash-021"]
+        assert _searches(fake)[0]["folderUIDs"] == ["team-a"]
+        assert _searches(fake)[0]["tag"] == ["prod"]
+    finally:
+        fake.stop()
+
+def test_export_writes_every_dashboard_with_bounded_concurrency():
+    fake, client = _serve()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            results = list(export_dashboards(client, Path(directory), concurrency=4, page_size=10))
+            assert len(results) == 25 and all(result["success"] and result["written"] for result in results)
+            assert fake.stats.max_in_flight["GET /api/dashboards/uid/:uid"] <= 4
+            assert load_json(Path(directory) / "team-a" / "dash-001.json")["uid"] == "dash-001"
+            assert (Path(directory) / "general" / "dash-000.json").exists()
+
+            # A second export leaves identical files alone
+            again = list(export_dashboards(client, Path(directory), concurrency=4, page_size=10))
+            assert not any(result["written"] for result in again)
+    finally:
+        fake.stop()
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Tests for the dashboard watch mode
+"""
+import sys
+import os
+import time
+
+# Add the scripts directory to Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from dashboard_watcher import DashboardWatcher
+
+def test_component_change_only_affects_templates_using_it():
+    """A component used by one template rebuilds that template in every environment"""
+    watcher = DashboardWatcher(environments=["dev", "prod"])
+    templates = watcher.templates_using({"deployment_frequency"})
+
+    assert templates == {"unified"}
+    assert watcher.jobs(templates=templates) == {("unified", "dev"), ("unified", "prod")}
+    assert watcher.templates_using({"error_rate"}) == set(watcher.templates)
+
+def test_bursts_of_changes_are_batched():
+    """Changes are held back until none arrived for the debounce period"""
+    watcher = DashboardWatcher(environments=["dev"], debounce_seconds=0.05)
+    watcher.mark_changed("catalog")
+    watcher.mark_changed("environments")
+    assert watcher.take_batch() is None
+
+    time.sleep(0.06)
+    assert watcher.take_batch() == {"catalog", "environments"}
+    assert watcher.take_batch() is None
+    assert not watcher.changed.is_set()
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for multi-environment dashboard deployment
+"""
+import importlib.util
+import io
+import sys
+import os
+import tempfile
+from contextlib import redirect_stdout
+from pathlib import Path
+from unittest import mock
+
+# Add the scripts directory to Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fake_grafana import FakeGrafana
+from upload_journal import UploadJournal
+
+def _deploy_module():
+    """deploy-dashboard-env.py is not importable by name"""
+    spec = importlib.util.spec_from_file_location("deploy_dashboard_env",
+                                                  Path(__file__).parent / "deploy-dashboard-env.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def _config(urls):
+    return {environment: {"prometheus_url": f"http://prometheus.{environment}:9090",
+                          "pushgateway_url": f"http://pushgateway.{environment}:9091",
+                          "alertmanager_url": f"http://alertmanager.{environment}:9093",
+                          "runbook_url": f"https://docs.example/{environment}", **({"grafana_url": url} if url else {})}
+            for environment, url in urls.items()}
+
+def _run(module, config, journal_dir, *argv):
+    with mock.patch.object(module, "load_config", return_value=config), \
+            mock.patch.object(module.UploadJournal, "named",
+                              side_effect=lambda name: UploadJournal(Path(journal_dir) / f"{name}.jsonl")), \
+            mock.patch.object(sys, "argv", ["deploy-dashboard-env.py", *argv]):
+        module.main()
+
+def test_grafana_urls():
+    module = _deploy_module()
+    config = _config({"dev": None, "prod": "https://grafana.example/"})
+    assert module.grafana_urls(["dev", "prod"], config) == {"dev": module.DEFAULT_GRAFANA_URL,
+                                                            "prod": "https://grafana.example"}
+    urls = module.grafana_urls(["dev", "prod"], config, "http://grafana:3000")
+    assert module.shared_grafana_urls(urls) == {"http://grafana:3000": ["dev", "prod"]}
+
+def test_shipped_environments_deploy_to_separate_grafanas():
+    module = _deploy_module()
+    config = module.load_config()
+    assert module.shared_grafana_urls(module.grafana_urls(list(config), config)) == {}
+
+def test_each_environment_lands_in_its_own_grafana():
+    module = _deploy_module()
+    with FakeGrafana() as staging, FakeGrafana() as prod, tempfile.TemporaryDirectory() as journal_dir:
+        config = _config({"staging": staging.url, "prod": prod.url})
+        _run(module, config, journal_dir, "staging", "prod")
+
+        for environment, fake in (("staging", staging), ("prod", prod)):
+            [stored] = fake.state.dashboards.values()
+            assert environment in stored["dashboard"]["title"]
+            assert f"http://alertmanager.{environment}:9093" in str(stored["dashboard"])
+        # Both environments finished, each in its own Grafana
+        assert UploadJournal(Path(journal_dir) / "deploy-env.jsonl").resume() == {}
+
+        # Each plan diffs against the environment's own Grafana
+        output = io.StringIO()
+        with redirect_stdout(output):
+            _run(module, config, journal_dir, "staging", "prod", "--plan")
+        assert output.getvalue().count("is up to date") == 2
+
+def test_environments_sharing_a_grafana_are_refused():
+    module = _deploy_module()
+    with FakeGrafana() as shared, tempfile.TemporaryDirectory() as journal_dir:
+        try:
+            _run(module, _config({"staging": None, "prod": None}), journal_dir,
+                 "staging", "prod", "--grafana-url", shared.url)
+            assert False, "expected the deployment to be refused"
+        except SystemExit as e:
+            assert e.code == 2
+        assert not shared.state.dashboards
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Tests for the fake Grafana server, driven through the real uploader
+"""
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+# Add the scripts directory to Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fake_grafana import FakeGrafana, FaultInjection
+from grafana_client import GrafanaClient
+from retry_policy import CircuitBreaker, RetryPolicy
+from bulk_upload import upload_many
+from dashboard_inventory import iter_dashboards
+from json_serializer import write_json
+from upload_manifest import UploadManifest
+from upload_to_grafana import GrafanaUploader
+
+FAST_RETRY = RetryPolicy(max_attempts=4, base_delay=0.001, max_delay=0.01)
+
+def _uploader(fake: FakeGrafana, directory: str, transport: str = "auto") -> GrafanaUploader:
+    client = GrafanaClient(fake.url, "token", pool_size=4, retry=FAST_RETRY, transport=transport,
+                           breaker=CircuitBreaker(fake.url, state_path=None))
+    return GrafanaUploader(fake.url, "token", client=client, manifest=UploadManifest(Path(directory) / "manifest.json"))
+
+def _dashboards(directory: str, count: int):
+    paths = []
+    for index in range(count):
+        path = Path(directory) / f"dash-{index}.json"
+        write_json(path, {"uid": f"dash-{index}", "title": f"Dashboard {index}", "tags": ["bench"],
+                          "panels": [{"id": 1, "type": "stat", "targets": [{"refId": "A", "expr": "up"}]}]})
+        paths.append(path)
+    return paths
+
+def test_uploads_land_and_repeat_uploads_are_skipped():
+    with FakeGrafana(api_token="token") as fake, tempfile.TemporaryDirectory() as directory:
+        paths = _dashboards(directory, 6)
+        for transport in ("requests", "http.client"):
+            uploader = _uploader(fake, directory, transport)
+            outcomes = upload_many(uploader, paths, concurrency=3, rate=None)
+            assert all(outcome.result["success"] for outcome in outcomes)
+
+        assert len(fake.state.dashboards) == 6
+        # The second round found every content hash already in Grafana
+        assert fake.state.dashboards["dash-0"]["dashboard"]["version"] == 1
+        assert [hit["uid"] for hit in iter_dashboards(_uploader(fake, directory).client, page_size=4)] == \
+            [f"dash-{index}" for index in range(6)]
+        assert fake.stats.by_route["POST /api/dashboards/db"] == 6
+
+def test_injected_faults_are_retried():
+    faults = FaultInjection(error_rate=0.2, rate_limit_rate=0.2, retry_after=0.01, seed=7)
+    with FakeGrafana(faults) as fake, tempfile.TemporaryDirectory() as directory:
+        uploader = _uploader(fake, directory)
+        uploader.skip_unchanged = False
+        outcomes = upload_many(uploader, _dashboards(directory, 20), concurrency=4, rate=None)
+
+        assert all(outcome.result["success"] for outcome in outcomes)
+        assert fake.stats.injected_errors and fake.stats.injected_429s
+        assert sum(outcome.attempts - 1 for outcome in outcomes) == fake.stats.injected_429s
+
+def test_api_token_and_folders():
+    with FakeGrafana(api_token="secret") as fake:
+        denied = GrafanaClient(fake.url, "wrong", breaker=CircuitBreaker(fake.url, state_path=None))
+        assert denied.get("/api/health").status_code == 401
+
+        client = GrafanaClient(fake.url, "secret", breaker=CircuitBreaker(fake.url, state_path=None))
+        assert client.post("/api/folders", {"uid": "team-a", "title": "Team A"}).status_code == 200
+        assert client.post("/api/folders", {"uid": "team-a", "title": "Team A"}).status_code == 409
+        saved = client.post("/api/dashboards/db", {"dashboard": {"uid": "d", "title": "D"}, "folderUid": "team-a"})
+        assert saved.json()["version"] == 1
+        # Without overwrite a stale version is refused, like Grafana does
+        stale = client.post("/api/dashboards/db", {"dashboard": {"uid": "d", "title": "D", "version": 0}})
+        assert stale.status_code == 412
+        assert client.get("/api/dashboards/uid/d").json()["meta"]["folderUid"] == "team-a"
+        assert client.get("/api/search", params={"folderUIDs": ["team-a"]}).json()[0]["folderTitle"] == "Team A"
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests for the content-addressed Grafana backup store
+"""
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+# Add the scripts directory to Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fake_grafana import FakeGrafana
+from grafana_backup import BackupStore, restore, snapshot
+from upload_to_grafana import GrafanaUploader
+
+def _serve():
+    """A fake Grafana with nested folders, two library panels and three dashboards"""
+    fake = FakeGrafana().start()
+    state = fake.state
+    for folder in ({"uid": "team-a", "title": "Team A"}, {"uid": "team-b", "title": "Team B"},
+                   {"uid": "team-a-apis", "title": "APIs", "parentUid": "team-a"}):
+        state.create_folder(folder)
+    for uid, name, folder_uid in (("lib-1", "CPU", "team-a"), ("lib-2", "Memory", "team-b")):
+        state.save_library_element(None, {"uid": uid, "name": name, "kind": 1, "model": {"type": "timeseries"},
+                                           "folderUid": folder_uid})
+    # dash-1 uses lib-1 inside a row; only dash-0 uses lib-2
+    panels = {
+        "dash-0": [{"id": 1, "libraryPanel": {"uid": "lib-2", "name": "Memory"}}],
+        "dash-1": [{"id": 1, "type": "row", "panels": [{"id": 2, "libraryPanel": {"uid": "lib-1", "name": "CPU"}}]}],
+        "dash-2": [],
+    }
+    for index, (uid, dashboard_panels) in enumerate(panels.items()):
+        state.save_dashboard({"dashboard": {"uid": uid, "title": f"Dashboard {index}", "panels": dashboard_panels},
+                              "folderUid": "team-a-apis" if index else None})
+    return fake, GrafanaUploader(fake.url, "token")
+
+def test_snapshot_stores_each_object_once():
+    fake, uploader = _serve()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = BackupStore(Path(tmp))
+            snapshot_id, stats = snapshot(uploader, store, concurrency=2)
+            assert stats.errors == []
+            assert (stats.objects, stats.new_objects) == (8, 8)
+
+            saved = store.load_snapshot(snapshot_id)
+            assert set(saved["dashboards"]) == {"dash-0", "dash-1", "dash-2"}
+            assert saved["dashboards"]["dash-1"]["folder_uid"] == "team-a-apis"
+            assert store.get(saved["folders"]["team-a-apis"]["hash"])["parentUid"] == "team-a"
+            stored = store.get(saved["dashboards"]["dash-1"]["hash"])
+            assert "id" not in stored and "version" not in stored
+    finally:
+        fake.stop()
+
+def test_incremental_snapshot_writes_only_changes():
+    fake, uploader = _serve()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = BackupStore(Path(tmp))
+            first, _ = snapshot(uploader, store)
+
+            # A save without edits only bumps the version
+            fake.state.dashboards["dash-0"]["dashboard"]["version"] = 7
+            _, stats = snapshot(uploader, store)
+            assert stats.new_objects == 0
+
+            fake.state.dashboards["dash-2"]["dashboard"]["panels"] = [{"id": 1, "title": "New"}]
+            second, stats = snapshot(uploader, store)
+            assert (stats.objects, stats.new_objects) == (8, 1)
+            assert len(list(store.objects_dir.glob("*/*.json"))) == 9
+
+            removed, orphans = store.prune(keep=1)
+            assert (removed, orphans) == (2, 1)
+            assert store.snapshot_ids() == [second]
+    finally:
+        fake.stop()
+
+def test_restore_recreates_point_in_time_state():
+    fake, uploader = _serve()
+    state = fake.state
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = BackupStore(Path(tmp))
+            snapshot_id, _ = snapshot(uploader, store)
+
+            del state.folders["team-a"]
+            del state.folders["team-a-apis"]
+            del state.library_elements["lib-1"]
+            state.library_elements["lib-2"]["model"] = {"type": "stat"}
+            state.dashboards["dash-1"]["dashboard"]["panels"] = [{"id": 9, "title": "Broken"}]
+
+            sent = len(fake.received)
+            assert all(result["success"] for result in restore(uploader, store, snapshot_id, dry_run=True))
+            assert len(fake.received) == sent
+
+            results = restore(uploader, store, snapshot_id, dashboard_uids=["dash-1"])
+            assert all(result["success"] for result in results)
+            assert [(result["kind"], result["uid"]) for result in results] == [
+                ("folder", "team-a"), ("folder", "team-a-apis"), ("library panel", "lib-1"), ("dashboard", "dash-1")]
+            assert state.folders["team-a-apis"]["parentUid"] == "team-a"
+            assert state.library_elements["lib-1"]["folderUid"] == "team-a"
+            dashboard = state.dashboards["dash-1"]
+            assert dashboard["dashboard"]["panels"][0]["panels"][0]["libraryPanel"]["uid"] == "lib-1"
+            assert dashboard["meta"]["folderUid"] == "team-a-apis"
+
+            # Library panels and folders dash-1 does not use are left as they are
+            assert state.library_elements["lib-2"]["model"] == {"type": "stat"}
+            assert not [request.path for request in fake.received[sent:]
+                        if "lib-2" in request.path or "team-b" in request.path]
+    finally:
+        fake.stop()
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Tests for the pooled Grafana client
+"""
+import sys
+import os
+
+# Add the scripts directory to Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fake_grafana import FakeGrafana
+from grafana_client import COMPRESS_MIN_BYTES, GrafanaClient
+
+def test_requests_reuse_one_connection():
+    """Sequential requests share a keep-alive connection and are timed"""
+    with FakeGrafana(api_token="secret") as fake, GrafanaClient(fake.url, api_token="secret") as client:
+        for index in range(5):
+            saved = client.post("/api/dashboards/db", {"dashboard": {"uid": f"d{index}", "title": f"D{index}"}})
+            assert saved.status_code == 200 and saved.json()["uid"] == f"d{index}"
+        assert fake.received[-1].headers["Authorization"] == "Bearer secret"
+        assert client.connections_opened() == 1
+        summary = client.stats.summary()
+        assert summary["requests"] == 5 and summary["errors"] == 0
+
+def test_large_bodies_are_gzipped():
+    """With compress, bodies above the threshold go out gzipped and arrive intact"""
+    with FakeGrafana() as fake, GrafanaClient(fake.url, compress=True) as client:
+        dashboard = {"uid": "big", "title": "Big", "panels": ["x" * 100] * (COMPRESS_MIN_BYTES // 50)}
+        assert client.post("/api/dashboards/db", {"dashboard": dashboard}).status_code == 200
+        assert fake.received[-1].headers.get("Content-Encoding") == "gzip"
+        assert fake.state.dashboards["big"]["dashboard"]["panels"] == dashboard["panels"]
+        client.post("/api/dashboards/db", {"dashboard": {"uid": "small", "title": "Small"}})
+        assert "Content-Encoding" not in fake.received[-1].headers
+
+        timing = client.stats.timings[0]
+        assert timing.sent_bytes < timing.body_bytes
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the stdlib http.client transport
+"""
+import subprocess
+import sys
+import os
+import socket
+import time
+
+# Add the scripts directory to Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fake_grafana import FakeGrafana, ScriptedReply
+from grafana_client import GrafanaClient
+from grafana_transport import ConnectFailed, RequestException
+from retry_policy import CircuitBreaker, RetryPolicy, request_not_sent
+
+FAST_RETRY = RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.01)
+
+def _client(url: str, **kwargs) -> GrafanaClient:
+    return GrafanaClient(url, transport="http.client", retry=FAST_RETRY,
+                         breaker=CircuitBreaker("test", state_path=None), **kwargs)
+
+def test_requests_share_a_keep_alive_connection():
+    with FakeGrafana() as fake, _client(fake.url, auth=("admin", "secret")) as client:
+        for index in range(5):
+            dashboard = {"uid": f"d{index}", "title": f"D{index}"}
+            assert client.post("/api/dashboards/db", {"dashboard": dashboard}).json()["uid"] == f"d{index}"
+            assert fake.received[-1].body == {"dashboard": dashboard}
+            assert fake.received[-1].headers["Authorization"] == "Basic YWRtaW46c2VjcmV0"
+        client.get("/api/search", params={"tag": ["a", "b"], "query": None})
+        assert fake.received[-1].path == "/api/search?tag=a&tag=b"
+
+        assert client.connections_opened() == 1
+        assert client.stats.summary()["requests"] == 6
+
+def test_error_statuses_behave_like_requests():
+    with FakeGrafana() as fake, _client(fake.url) as client:
+        fake.script("GET /api/search", ScriptedReply(429, headers={"Retry-After": "3"}))
+        response = client.get("/api/search")
+        assert response.status_code == 429 and response.headers.get("retry-after") == "3"
+        try:
+            response.raise_for_status()
+            assert False, "expected an HTTPError"
+        except RequestException as e:
+            assert e.response is response
+
+        # A 5xx is retried and each attempt is timed
+        fake.script("GET /api/health", 503)
+        assert client.get("/api/health").status_code == 200
+        assert [timing.attempt for timing in client.stats.timings[-2:]] == [1, 2]
+
+def test_connection_closed_by_server_is_not_reused():
+    with FakeGrafana() as fake, _client(fake.url) as client:
+        fake.script("GET /api/health", ScriptedReply(close=True))
+        assert client.get("/api/health").status_code == 200
+        # Let the server's FIN arrive, as it would after Grafana's idle timeout
+        time.sleep(0.2)
+        # Not idempotent, so a dead pooled socket would surface as an error here
+        assert client.post("/api/dashboards/db", {"dashboard": {"uid": "again"}}).status_code == 200
+        assert client.connections_opened() == 2
+
+def test_refused_connection_is_retried_even_for_posts():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    client = _client(f"http://127.0.0.1:{port}")
+    try:
+        client.post("/api/dashboards/db", {"uid": "x"})
+        assert False, "expected a connection error"
+    except ConnectFailed as e:
+        assert request_not_sent(e)
+    assert len(client.stats.timings) == FAST_RETRY.max_attempts
+
+def test_scripts_run_without_requests():
+    """With requests unimportable, the uploader falls back to http.client"""
+    script = ("import sys; sys.modules['requests'] = None; sys.path.insert(0, sys.argv[1]);"
+              "from upload_to_grafana import GrafanaUploader;"
+              "print(GrafanaUploader('http://127.0.0.1:1', 'token').client.transport.name)")
+    result = subprocess.run([sys.executable, "-c", script, os.path.dirname(os.path.abspath(__file__))],
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "http.client"
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared dashboard JSON serializer
+"""
+import json
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+# Add the scripts directory to Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from json_serializer import MODES, content_hash, dumps, iter_json, write_json
+
+DASHBOARD = {
+    "title": "Nestory – Dev",
+    "panels": [
+        {"id": 2, "targets": [{"expr": "up", "refId": "A"}], "options": {}},
+        {"id": 1, "panels": [], "gridPos": {"h": 1, "w": 24, "x": 0, "y": 0}}
+    ],
+    "tags": []
+}
+
+def test_streamed_chunks_match_dumps_in_every_mode():
+    """Incremental encoding produces exactly the one-shot bytes"""
+    for mode in MODES:
+        for depth in range(4):
+            assert "".join(iter_json(DASHBOARD, mode, depth)) == dumps(DASHBOARD, mode)
+    assert dumps(DASHBOARD) == json.dumps(DASHBOARD, indent=2)
+
+def test_non_string_keys_are_written_like_json_dumps():
+    document = {"panels": {True: 1, False: 2, None: 3, 4: [], 2.5: {}, float("inf"): "x"}}
+    # Mixed key types cannot be sorted, so only the unsorted modes apply
+    for mode in ("pretty", "compact"):
+        for depth in range(1, 4):
+            assert "".join(iter_json(document, mode, depth)) == dumps(document, mode)
+    assert dumps(document) == json.dumps(document, indent=2)
+    try:
+        "".join(iter_json({"panels": {(1, 2): "tuple"}}, "pretty", 3))
+        assert False, "expected a TypeError"
+    except TypeError as e:
+        assert "tuple" in str(e)
+
+def test_content_hash_ignores_key_order_and_formatting():
+    """Canonical hashes compare documents, not their spelling"""
+    reordered = json.loads(json.dumps(DASHBOARD, sort_keys=True, indent=4))
+    assert content_hash(reordered) == content_hash(DASHBOARD)
+    assert content_hash({**DASHBOARD, "title": "Other"}) != content_hash(DASHBOARD)
+
+def test_write_json_skips_unchanged_files():
+    """Rewriting identical content leaves the file alone"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "dashboard.json"
+        assert write_json(path, DASHBOARD) is True
+        assert write_json(path, DASHBOARD) is False
+        assert json.loads(path.read_text()) == DASHBOARD
+        assert list(Path(directory).iterdir()) == [path]
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
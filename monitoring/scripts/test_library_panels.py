@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for Grafana library panel linking
+"""
+import sys
+import os
+
+# Add the scripts directory to Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from library_panels import (
+    MAX_UID_LENGTH, library_panel_uid, link_library_panels, referenced_library_uids,
+    resolve_library_panels
+)
+from shared_queries import DASHBOARD_DATASOURCE
+
+def _panel(panel_id, title):
+    return {
+        "id": panel_id,
+        "gridPos": {"h": 4, "w": 6, "x": 0, "y": 0},
+        "title": title,
+        "type": "stat",
+        "targets": [{"expr": "up", "refId": "A"}]
+    }
+
+def test_link_replaces_panels_with_references():
+    """Linked panels keep their place on the dashboard; the rest moves into the element"""
+    panel = _panel(1, "Error Rate")
+    original = dict(panel)
+    elements = link_library_panels([("error_rate", panel)])
+
+    uid = library_panel_uid("error_rate")
+    assert panel == {"gridPos": original["gridPos"], "id": 1,
+                     "libraryPanel": {"uid": uid, "name": "Error Rate"}, "title": "Error Rate"}
+    assert elements[uid]["model"] == {k: v for k, v in original.items() if k not in ("id", "gridPos")}
+    assert resolve_library_panels([panel], elements) == [original]
+
+def test_bound_panels_stay_inline():
+    """A panel reading another panel's queries cannot be shared between dashboards"""
+    panel = _panel(2, "Bound")
+    panel["datasource"] = DASHBOARD_DATASOURCE
+    assert link_library_panels([("bound", panel)]) == {}
+    assert "libraryPanel" not in panel
+
+def test_referenced_uids_include_collapsed_rows():
+    """References nested in collapsed rows are found"""
+    row = {"id": 10, "type": "row", "panels": [{"id": 3, "libraryPanel": {"uid": "nry-lib-a", "name": "A"}}]}
+    assert referenced_library_uids([row, {"id": 4, "libraryPanel": {"uid": "nry-lib-b", "name": "B"}}]) == \
+        {"nry-lib-a", "nry-lib-b"}
+
+def test_long_uids_are_truncated_stably():
+    """UIDs stay within Grafana's limit and distinct"""
+    first = library_panel_uid("x" * 60 + "_one")
+    second = library_panel_uid("x" * 60 + "_two")
+    assert len(first) <= MAX_UID_LENGTH and first != second
+    assert first == library_panel_uid("x" * 60 + "_one")
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
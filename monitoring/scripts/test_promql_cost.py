@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests for the static PromQL cost analyzer
+"""
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+# Add the scripts directory to Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from json_serializer import write_json
+from promql_cost import (DEFAULT_COST_BUDGET, CostBudgetExceeded, DashboardCost, QueryCost, _has_unaggregated_quantile,
+                         _window_seconds, analyze_dashboard, analyze_file, check_budget, estimate_query_cost,
+                         generate_dashboards)
+
+UNAGGREGATED_P95 = "histogram_quantile(0.95, rate(req_duration_seconds_bucket[5m]))"
+AGGREGATED_P95 = "histogram_quantile(0.95, sum by (le) (rate(req_duration_seconds_bucket[5m])))"
+
+def _dashboard(*exprs):
+    return {"uid": "cost", "title": "Cost", "refresh": "30s",
+            "panels": [{"id": index, "type": "timeseries", "title": f"Panel {index}",
+                        "targets": [{"refId": "A", "expr": expr}]} for index, expr in enumerate(exprs)]}
+
+def test_window_seconds():
+    assert _window_seconds("[5m]") == 300
+    assert _window_seconds("[1h30m]") == 5400
+    # Unknown variables count as one minute, $__range as the default six hour range
+    assert _window_seconds("[$__rate_interval]") == 60
+    assert _window_seconds("[$__range]") == 6 * 3600
+
+def test_subqueries_cost_one_evaluation_per_step():
+    assert _window_seconds("[1h:5m]") == 3600 * 12
+    # The default step is one minute
+    assert _window_seconds("[5m:]") == 300 * 5
+
+def test_estimate_query_cost():
+    assert estimate_query_cost("up")[0] == 1.0
+    assert estimate_query_cost("nestory:request_rate:5m")[0] == 0.2
+    assert estimate_query_cost("rate(http_requests_total[5m])")[0] == 5.0
+    assert estimate_query_cost("rate(http_requests_total[$__range])")[0] == 360.0
+
+    cost, factors = estimate_query_cost('sum(rate(http_requests_total{job=~"api.*"}[5m]))')
+    assert cost == 5.0 * 2.0 * 1.25
+    assert factors == {"selectors": 1, "window_minutes": 5.0, "regex_matchers": 1, "aggregation_depth": 1,
+                       "unaggregated_quantile": False}
+
+    # Grouping labels and keywords are not selectors
+    assert estimate_query_cost("sum by (job) (up) or on (job) down")[1]["selectors"] == 2
+
+def test_unaggregated_quantile():
+    assert _has_unaggregated_quantile(UNAGGREGATED_P95)
+    assert not _has_unaggregated_quantile(AGGREGATED_P95)
+    assert not _has_unaggregated_quantile("histogram_quantile(0.95, nestory:req_duration_seconds_bucket:rate5m)")
+    assert estimate_query_cost(UNAGGREGATED_P95)[0] == 5.0 * 10.0 * 4.0
+    assert estimate_query_cost(AGGREGATED_P95)[0] == 5.0 * 10.0 * 1.25
+
+def test_check_budget():
+    cost = analyze_dashboard(_dashboard("up", UNAGGREGATED_P95))
+    assert cost.cost_per_refresh == 201.0
+    assert cost.cost_per_minute == 402.0
+    check_budget(cost, 201.0)
+    try:
+        check_budget(cost, 200.0)
+        assert False, "expected CostBudgetExceeded"
+    except CostBudgetExceeded as e:
+        assert "Panel 1" in str(e)
+
+    # Queries in a collapsed row only run once it is expanded
+    collapsed = DashboardCost("rows", None, 2, [QueryCost("a", "A", "up", 1.0, {}),
+                                                QueryCost("b", "A", "up", 3.0, {}, on_open=False)])
+    assert (collapsed.cost_on_open, collapsed.cost_per_refresh) == (1.0, 4.0)
+
+def test_wrapped_and_bare_files_cost_the_same():
+    dashboard = _dashboard("rate(http_requests_total[5m])", AGGREGATED_P95)
+    with tempfile.TemporaryDirectory() as directory:
+        bare, wrapped = Path(directory) / "bare.json", Path(directory) / "wrapped.json"
+        write_json(bare, dashboard)
+        write_json(wrapped, {"dashboard": dashboard, "overwrite": True})
+        costs = analyze_file(bare), analyze_file(wrapped)
+
+    assert [cost.name for cost in costs] == ["bare.json", "wrapped.json"]
+    assert costs[0].cost_per_refresh == costs[1].cost_per_refresh == 67.5
+    assert costs[0].refresh_seconds == 30.0
+
+def test_generated_dashboards_fit_the_default_budget():
+    """make cost gates on freshly generated dashboards, so it must start green"""
+    with tempfile.TemporaryDirectory() as directory:
+        paths = generate_dashboards(Path(directory))
+        assert {path.name for path in paths} >= {"unified-dev.json", "production-prod.json"}
+        for path in paths:
+            check_budget(analyze_file(path), DEFAULT_COST_BUDGET)
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_"):
+            test()
+            print(f"✅ {name}")
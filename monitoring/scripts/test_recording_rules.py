@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for recording rule synthesis
+"""
+import sys
+import os
+
+# Add the scripts directory to Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from recording_rules import RecordingRuleSet, RecordingRuleSynthesizer, find_calls
+
+P95 = "histogram_quantile(0.95, sum by (le) (rate(nestory_http_request_duration_seconds_bucket[5m]))) * 1000"
+P99 = "histogram_quantile(0.99, sum by (le) (rate(nestory_http_request_duration_seconds_bucket[5m]))) * 1000"
+ERRORS = "sum(rate(nestory_error_total[5m]))"
+
+def test_find_calls_ignores_clamp_min():
+    """clamp_min is not mistaken for a min aggregation"""
+    calls = find_calls("100 * sum(rate(a_total[5m])) / clamp_min(sum(rate(b_total[5m])), 1)")
+    assert [function for function, _ in calls] == ["sum", "sum"]
+
+def test_quantiles_share_one_bucket_rule():
+    """Quantile rules are written against a single recorded bucket rate"""
+    synthesizer = RecordingRuleSynthesizer()
+    for expr in (P95, P99, ERRORS, ERRORS):
+        synthesizer.add_expr(expr)
+    generated = synthesizer.synthesize()
+
+    records = [rule["record"] for rule in generated.rules]
+    assert records == [
+        "nestory:http_request_duration_seconds_bucket:rate5m",
+        "nestory:error:rate5m",
+        "nestory:http_request_duration_seconds_p95",
+        "nestory:http_request_duration_seconds_p99",
+    ]
+    assert generated.rules[2]["expr"] == "histogram_quantile(0.95, nestory:http_request_duration_seconds_bucket:rate5m)"
+
+def test_rewrite_reuses_existing_rules():
+    """Expressions already recorded by hand are rewritten, not re-synthesized"""
+    existing = RecordingRuleSet()
+    existing.add("nestory:error_rate", "sum(rate(nestory_error_total[5m]))")
+
+    synthesizer = RecordingRuleSynthesizer(existing)
+    synthesizer.add_expr(ERRORS)
+    synthesizer.add_expr(ERRORS)
+    assert synthesizer.synthesize().rules == []
+    assert existing.rewrite("100 * sum( rate(nestory_error_total[5m]) )") == "100 * nestory:error_rate"
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
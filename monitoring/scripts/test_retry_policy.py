@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Tests for Grafana client retries and the circuit breaker
+"""
+import json
+import sys
+import os
+import socket
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+# Add the scripts directory to Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fake_grafana import FakeGrafana
+from grafana_client import GrafanaClient
+from retry_policy import CircuitBreaker, CircuitOpenError, RetryPolicy, load_breaker_states
+
+FAST_RETRY = RetryPolicy(max_attempts=3, base_delay=0.001, max_delay=0.01)
+
+def _client(fake, directory, threshold=5, reset_seconds=30.0):
+    breaker = CircuitBreaker(fake.url, failure_threshold=threshold, reset_seconds=reset_seconds,
+                             state_path=Path(directory) / "breakers.json")
+    return GrafanaClient(fake.url, retry=FAST_RETRY, breaker=breaker)
+
+def test_idempotent_request_retries_5xx():
+    with FakeGrafana() as fake, tempfile.TemporaryDirectory() as directory:
+        fake.script("GET /api/health", 503, 502)
+        client = _client(fake, directory)
+        assert client.get("/api/health").status_code == 200
+        assert fake.stats.requests == 3
+        assert client.stats.summary()["retries"] == 2
+
+def test_post_is_retried_only_when_marked_idempotent():
+    with FakeGrafana() as fake, tempfile.TemporaryDirectory() as directory:
+        fake.script("POST /api/library-elements", 500)
+        fake.script("POST /api/dashboards/db", 500)
+        client = _client(fake, directory)
+        assert client.post("/api/library-elements", {"uid": "lib"}).status_code == 500
+        assert fake.stats.requests == 1
+
+        assert client.post("/api/dashboards/db", {"dashboard": {"uid": "d"}}, idempotent=True).status_code == 200
+        assert fake.stats.requests == 3
+
+def test_client_errors_are_not_retried():
+    with FakeGrafana() as fake, tempfile.TemporaryDirectory() as directory:
+        fake.script("GET /api/search", 429)
+        client = _client(fake, directory)
+        assert client.get("/api/dashboards/uid/missing").status_code == 404
+        assert client.get("/api/search").status_code == 429
+        assert fake.stats.requests == 2
+
+def test_refused_connection_is_retried_for_any_method():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    with tempfile.TemporaryDirectory() as directory:
+        breaker = CircuitBreaker("down", state_path=Path(directory) / "breakers.json")
+        client = GrafanaClient(f"http://127.0.0.1:{port}", retry=FAST_RETRY, breaker=breaker)
+        try:
+            client.post("/api/dashboards/db", {"a": 1})
+            assert False, "expected a connection error"
+        except requests.exceptions.ConnectionError:
+            pass
+        assert client.stats.summary()["requests"] == 3
+
+def test_breaker_opens_fails_fast_and_recovers():
+    with FakeGrafana() as fake, tempfile.TemporaryDirectory() as directory:
+        fake.script("GET /api/health", *[503] * 7)
+        client = _client(fake, directory, threshold=2, reset_seconds=0.2)
+        # Three attempts, one failed call
+        assert client.get("/api/health").status_code == 503
+        assert (client.breaker.state, client.breaker.failures) == (CircuitBreaker.CLOSED, 1)
+        assert client.get("/api/health").status_code == 503
+        assert client.breaker.state == CircuitBreaker.OPEN
+
+        try:
+            client.get("/api/health")
+            assert False, "expected the open circuit to fail fast"
+        except CircuitOpenError:
+            pass
+        assert fake.stats.requests == 6
+
+        # Other processes and health-check.py see the open circuit
+        saved = load_breaker_states(Path(directory) / "breakers.json")[client.base_url]
+        assert saved["state"] == CircuitBreaker.OPEN
+        assert CircuitBreaker(client.base_url, state_path=Path(directory) / "breakers.json").state == "open"
+
+        # After the reset timeout one trial goes through; it fails, so the circuit reopens
+        time.sleep(0.25)
+        assert client.get("/api/health").status_code == 503
+        assert client.breaker.state == CircuitBreaker.OPEN
+        assert fake.stats.requests == 7
+
+        time.sleep(0.25)
+        fake.scripts.clear()
+        assert client.get("/api/health").status_code == 200
+        assert client.breaker.state == CircuitBreaker.CLOSED
+        assert load_breaker_states(Path(directory) / "breakers.json")[client.base_url]["state"] == "closed"
+
+def test_breaker_state_is_shared_per_instance():
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "breakers.json"
+        # Processes saving different instances at the same time keep each other's entries
+        breakers = [CircuitBreaker(f"http://grafana-{index}", state_path=path) for index in range(8)]
+        threads = [threading.Thread(target=breaker.record_failure) for breaker in breakers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        states = load_breaker_states(path)
+        assert sorted(states) == sorted(breaker.name for breaker in breakers)
+        assert {saved["failures"] for saved in states.values()} == {1}
+
+        # A new process continues the failure count instead of starting from zero
+        again = CircuitBreaker("http://grafana-0", failure_threshold=2, state_path=path)
+        again.record_failure()
+        assert load_breaker_states(path)["http://grafana-0"]["state"] == CircuitBreaker.OPEN
+        assert CircuitBreaker("http://grafana-0", state_path=path).state == CircuitBreaker.OPEN
+        assert [p.name for p in Path(directory).iterdir() if p.suffix == ".tmp"] == []
+
+def test_breaker_opened_longer_ago_than_its_cooldown_loads_as_trial():
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / "breakers.json"
+        path.write_text(json.dumps({"http://grafana": {"state": "open", "failures": 5,
+                                                       "opened_at": time.time() - 3600, "reset_seconds": 30.0}}))
+        breaker = CircuitBreaker("http://grafana", reset_seconds=30.0, state_path=path)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        breaker.before_request()
+        try:
+            breaker.before_request()
+            assert False, "expected only one trial request"
+        except CircuitOpenError:
+            pass
+        breaker.record_success()
+        saved = load_breaker_states(path)["http://grafana"]
+        assert (saved["state"], saved["failures"]) == ("closed", 0)
+
+def test_backoff_is_jittered_and_capped():
+    policy = RetryPolicy(base_delay=1.0, max_delay=4.0)
+    delays = [policy.delay(5) for _ in range(50)]
+    assert all(0 <= delay <= 4.0 for delay in delays)
+    assert len(set(delays)) > 1
+    assert policy.delay(1, retry_after=3.0) >= 3.0
+    assert policy.delay(1, retry_after=60.0) <= 4.0
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
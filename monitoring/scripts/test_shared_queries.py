@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests for cross-panel query sharing
+"""
+import sys
+import os
+
+# Add the scripts directory to Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from shared_queries import DASHBOARD_DATASOURCE, share_duplicate_queries
+from dashboard_generator import ComponentLibrary, DashboardTemplate, PanelTarget, TimeSeriesPanel
+
+def _panel(panel_id, *exprs):
+    return {
+        "id": panel_id,
+        "title": f"Panel {panel_id}",
+        "type": "timeseries",
+        "targets": [{"expr": expr, "refId": chr(ord("A") + i)} for i, expr in enumerate(exprs)]
+    }
+
+def test_identical_queries_share_one_source():
+    """The first panel keeps its query; duplicates read its results"""
+    panels = [_panel(1, "sum(rate(x[5m]))"), _panel(2, "sum( rate(x[5m]) )")]
+    report = share_duplicate_queries(panels)
+
+    assert panels[0]["targets"][0]["expr"] == "sum(rate(x[5m]))"
+    assert panels[1]["datasource"] == DASHBOARD_DATASOURCE
+    assert panels[1]["targets"] == [{"datasource": DASHBOARD_DATASOURCE, "panelId": 1,
+                                     "refId": "A", "withTransforms": False}]
+    assert "transformations" not in panels[1]
+    assert report[0]["mode"] == "identical"
+
+def test_subset_binds_to_superset_with_filter():
+    """A panel whose queries are a subset of another's filters that panel's frames"""
+    panels = [_panel(1, "up"), _panel(2, "down", "up")]
+    report = share_duplicate_queries(panels)
+
+    assert "expr" in panels[1]["targets"][0]
+    assert panels[0]["targets"][0]["panelId"] == 2
+    assert panels[0]["transformations"] == [{"id": "filterByRefId", "options": {"include": "B"}}]
+    assert report[0]["mode"] == "subset"
+
+def test_different_query_options_are_not_shared():
+    """Instant and range results of the same expression are different data"""
+    instant = _panel(2, "up")
+    instant["targets"][0]["instant"] = True
+    assert share_duplicate_queries([_panel(1, "up"), instant]) == []
+
+def test_collapsed_row_panels_only_serve_their_own_row():
+    """A panel in a collapsed row is not queried on open, so outside panels keep their query"""
+    row = {"id": 10, "type": "row", "collapsed": True, "panels": [_panel(1, "up"), _panel(2, "up")]}
+    outside = _panel(3, "up", "down")
+    share_duplicate_queries([outside, row])
+
+    # The row's panels may bind to the always-loaded panel outside
+    assert row["panels"][0]["targets"][0]["panelId"] == 3
+    assert row["panels"][1]["targets"][0]["panelId"] == 3
+
+    lone = _panel(4, "up")
+    row = {"id": 11, "type": "row", "collapsed": True, "panels": [_panel(5, "up", "down")]}
+    assert share_duplicate_queries([row, lone]) == []
+
+def test_generated_subset_panel_filters_its_own_ref_id():
+    """Generated targets carry Grafana's refId, so a subset filter picks the right query"""
+    library = ComponentLibrary()
+    library.register_component("up_and_down", lambda: TimeSeriesPanel(
+        "up_and_down", "Up and Down", [PanelTarget("up"), PanelTarget("down", ref_id="B")]))
+    library.register_component("down_only", lambda: TimeSeriesPanel("down_only", "Down", [PanelTarget("down")]))
+    template = DashboardTemplate("test", "Test", component_library=library)
+    template.add_section("Overview", [{"name": "up_and_down"}, {"name": "down_only"}])
+
+    panels = {panel["title"]: panel for panel in template.generate_dashboard("dev")["panels"]}
+    source, bound = panels["Up and Down"], panels["Down"]
+    assert [target["refId"] for target in source["targets"]] == ["A", "B"]
+    assert bound["targets"][0]["panelId"] == source["id"]
+    assert bound["transformations"] == [{"id": "filterByRefId", "options": {"include": "B"}}]
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
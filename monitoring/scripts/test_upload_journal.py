@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for the resumable upload journal
+"""
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+# Add the scripts directory to Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from upload_journal import UploadJournal, journal_key
+
+def _planned(*names):
+    return {journal_key("http://grafana:3000/", name): {"path": name, "hash": f"hash-{name}"} for name in names}
+
+def test_resume_returns_only_unfinished_items():
+    with tempfile.TemporaryDirectory() as directory:
+        journal = UploadJournal(Path(directory) / "upload.jsonl")
+        journal.start(_planned("a.json", "b.json", "c.json"))
+        journal.record(journal_key("http://grafana:3000", "a.json"), True, "hash-a.json", version=4)
+        journal.record(journal_key("http://grafana:3000", "b.json"), False, "hash-b.json", error="HTTP 502")
+
+        resumed = UploadJournal(journal.path)
+        incomplete = resumed.resume()
+        assert resumed.run_id == journal.run_id
+        assert sorted(item["path"] for item in incomplete.values()) == ["b.json", "c.json"]
+
+        resumed.record(journal_key("http://grafana:3000", "b.json"), True, "hash-b.json")
+        resumed.record(journal_key("http://grafana:3000", "c.json"), True, "hash-c.json")
+        assert UploadJournal(journal.path).resume() == {}
+
+def test_new_run_supersedes_previous_one():
+    with tempfile.TemporaryDirectory() as directory:
+        journal = UploadJournal(Path(directory) / "upload.jsonl")
+        journal.start(_planned("a.json"))
+        journal.run_id = None
+        journal.start(_planned("b.json"))
+
+        run = journal.last_run()
+        assert list(run.planned) == [journal_key("http://grafana:3000", "b.json")]
+        assert run.failed == {} and run.done == {}
+
+def test_torn_last_line_is_ignored():
+    with tempfile.TemporaryDirectory() as directory:
+        journal = UploadJournal(Path(directory) / "upload.jsonl")
+        journal.start(_planned("a.json", "b.json"))
+        journal.record(journal_key("http://grafana:3000", "a.json"), True, "hash-a.json")
+        with open(journal.path, 'a') as f:
+            f.write('{"event":"done","run":"')
+
+        assert list(UploadJournal(journal.path).resume()) == [journal_key("http://grafana:3000", "b.json")]
+
+def test_missing_journal_has_nothing_to_resume():
+    with tempfile.TemporaryDirectory() as directory:
+        assert UploadJournal(Path(directory) / "missing.jsonl").resume() == {}
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for skipping unchanged dashboard uploads
+"""
+import json
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+# Add the scripts directory to Python path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fake_grafana import FakeGrafana
+from upload_manifest import UploadManifest, dashboard_digest
+from upload_to_grafana import GrafanaUploader
+
+GET_DASHBOARD = "GET /api/dashboards/uid/:uid"
+SAVE_DASHBOARD = "POST /api/dashboards/db"
+
+def _uploader(fake, directory):
+    manifest = UploadManifest(Path(directory) / "manifest.json")
+    return GrafanaUploader(fake.url, "token", manifest=manifest)
+
+def _write_dashboard(directory, title):
+    path = Path(directory) / "nry-test.json"
+    path.write_text(json.dumps({"uid": "nry-test", "title": title, "tags": ["nestory"], "panels": []}))
+    return path
+
+def test_digest_ignores_id_and_version():
+    dashboard = {"uid": "a", "title": "A", "tags": ["nestory"], "version": 1}
+    digest = dashboard_digest(dashboard)
+    # As Grafana stores it
+    stored = {**dashboard, "id": 42, "version": 7}
+
+    assert dashboard_digest(stored) == digest
+    assert dashboard_digest({**dashboard, "title": "B"}) != digest
+    assert dashboard_digest(dashboard, folder_id=3) != digest
+
+def test_unchanged_dashboard_is_not_uploaded_again():
+    with FakeGrafana() as fake, tempfile.TemporaryDirectory() as directory:
+        uploader = _uploader(fake, directory)
+        path = _write_dashboard(directory, "Before")
+        assert uploader.upload_dashboard(str(path))["status"] == "success"
+        skipped = uploader.upload_dashboard(str(path))
+        assert skipped["status"] == "unchanged" and skipped["version"] == 1
+        assert fake.stats.by_route[SAVE_DASHBOARD] == 1
+        # The manifest decides; Grafana is not asked
+        assert GET_DASHBOARD not in fake.stats.by_route
+
+        _write_dashboard(directory, "After")
+        assert uploader.upload_dashboard(str(path))["version"] == 2
+
+def test_manifest_persists_between_runs():
+    with FakeGrafana() as fake, tempfile.TemporaryDirectory() as directory:
+        uploader = _uploader(fake, directory)
+        path = _write_dashboard(directory, "Title")
+        uploader.upload_dashboard(str(path))
+
+        again = _uploader(fake, directory)
+        assert again.manifest.entry(uploader.grafana_url, "nry-test")["version"] == 1
+        assert again.upload_dashboard(str(path))["status"] == "unchanged"
+        assert fake.stats.by_route[SAVE_DASHBOARD] == 1
+
+def test_changes_made_in_grafana_are_overwritten_when_verifying():
+    with FakeGrafana() as fake, tempfile.TemporaryDirectory() as directory:
+        uploader = _uploader(fake, directory)
+        path = _write_dashboard(directory, "Title")
+        uploader.upload_dashboard(str(path))
+
+        # Edited in the Grafana UI: the manifest still matches, the stored body does not
+        fake.state.dashboards["nry-test"]["dashboard"]["title"] = "Edited in the UI"
+        assert uploader.upload_dashboard(str(path))["status"] == "unchanged"
+        uploader.verify_remote = True
+        assert uploader.upload_dashboard(str(path))["status"] == "success"
+        assert fake.state.dashboards["nry-test"]["dashboard"]["title"] == "Title"
+
+        # Deleted in Grafana
+        fake.state.dashboards.clear()
+        assert uploader.upload_dashboard(str(path))["status"] == "success"
+        assert uploader.upload_dashboard(str(path))["status"] == "unchanged"
+        assert fake.stats.by_route[SAVE_DASHBOARD] == 3
+
+        # Pushed from another machine: no manifest entry, but Grafana already holds it
+        verified = GrafanaUploader(fake.url, "token", verify_remote=True,
+                                   manifest=UploadManifest(Path(directory) / "other.json"))
+        assert verified.upload_dashboard(str(path))["status"] == "unchanged"
+        assert verified.manifest.entry(verified.grafana_url, "nry-test")["version"] == 1
+
+def test_skip_unchanged_can_be_disabled():
+    with FakeGrafana() as fake, tempfile.TemporaryDirectory() as directory:
+        uploader = _uploader(fake, directory)
+        path = _write_dashboard(directory, "Title")
+        uploader.skip_unchanged = False
+        uploader.upload_dashboard(str(path))
+        assert uploader.upload_dashboard(str(path))["status"] == "success"
+        assert fake.stats.by_route[SAVE_DASHBOARD] == 2
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
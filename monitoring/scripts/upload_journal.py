@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Upload Journal
+Append-only log of planned, finished and failed dashboard uploads, so a deployment that
+dies halfway can be resumed without pushing what already landed
+"""
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Any, Optional
+
+from json_serializer import dumps
+
+JOURNAL_DIR = Path(__file__).parent.parent / ".cache" / "journal"
+
+def journal_key(grafana_url: str, item: str) -> str:
+    """Journal key of a dashboard or environment deployed to one Grafana instance"""
+    return f"{grafana_url.rstrip('/')}#{item}"
+
+@dataclass
+class JournalRun:
+    """One run reconstructed from the journal: what it planned and what landed"""
+    run_id: str
+    planned: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    done: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    failed: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def incomplete(self) -> Dict[str, Dict[str, Any]]:
+        """Planned items without a successful upload, by key"""
+        return {key: item for key, item in self.planned.items() if key not in self.done}
+
+class UploadJournal:
+    """Append-only JSON-lines journal of upload runs.
+
+    Every record is flushed and fsynced before the next upload starts, so a crash loses
+    at most the upload in flight. A torn last line is ignored on replay.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.run_id: Optional[str] = None
+        self.lock = threading.Lock()
+
+    @classmethod
+    def named(cls, name: str, journal_dir: Path = JOURNAL_DIR) -> 'UploadJournal':
+        """Journal of one deployment tool, e.g. upload-all"""
+        return cls(Path(journal_dir) / f"{name}.jsonl")
+
+    def _record(self, event: str, **fields) -> Dict[str, Any]:
+        return {"event": event, "run": self.run_id, "time": round(time.time(), 3), **fields}
+
+    def _append(self, *records: Dict[str, Any]):
+        """Durably append records, one JSON document per line"""
+        with self.lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write("".join(dumps(record, "compact") + "\n" for record in records))
+                f.flush()
+                os.fsync(f.fileno())
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Every readable record, oldest first"""
+        records = []
+        try:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # Only a crash mid-write leaves a partial line
+                        continue
+        except FileNotFoundError:
+            pass
+        return records
+
+    def last_run(self) -> Optional[JournalRun]:
+        """The most recently started run, replayed from the journal"""
+        run = None
+        for record in self.records():
+            if record["event"] == "run":
+                run = JournalRun(record["run"])
+            elif run is None or record.get("run") != run.run_id:
+                continue
+            elif record["event"] == "planned":
+                run.planned[record["key"]] = record
+            elif record["event"] == "done":
+                run.done[record["key"]] = record
+                run.failed.pop(record["key"], None)
+            elif record["event"] == "failed":
+                run.failed[record["key"]] = record
+        return run
+
+    def start(self, planned: Dict[str, Dict[str, Any]]):
+        """Begin a new run of the given items, each with at least a content hash"""
+        self.run_id = f"{time.strftime('%Y%m%dT%H%M%S')}-{os.getpid()}"
+        self._append(self._record("run", items=len(planned)),
+                     *(self._record("planned", key=key, **item) for key, item in planned.items()))
+
+    def resume(self) -> Dict[str, Dict[str, Any]]:
+        """Continue the last run; returns its incomplete items, empty if there is none"""
+        run = self.last_run()
+        if run is None:
+            return {}
+        self.run_id = run.run_id
+        incomplete = run.incomplete()
+        self._append(self._record("resumed", remaining=len(incomplete)))
+        return incomplete
+
+    def record(self, key: str, success: bool, content_hash: Optional[str] = None, version: Any = None,
+               error: Optional[str] = None):
+        """Record the outcome of one planned item"""
+        if success:
+            self._append(self._record("done", key=key, hash=content_hash, version=version))
+        else:
+            self._append(self._record("failed", key=key, hash=content_hash, error=error))
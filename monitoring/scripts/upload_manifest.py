@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Dashboard Upload Manifest
+Remembers the content hash of every dashboard last pushed to each Grafana instance, so
+unchanged dashboards are skipped instead of adding a version
+"""
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from build_cache import write_if_changed
+from json_serializer import content_hash
+
+MANIFEST_PATH = Path(__file__).parent.parent / ".cache" / "upload-manifest.json"
+HASH_LENGTH = 16
+
+def dashboard_digest(dashboard: Dict[str, Any], folder_id: int = 0) -> str:
+    """Hash of what an upload would store, or of what Grafana stores; id and version do not count"""
+    content = {key: value for key, value in dashboard.items() if key not in ("id", "version")}
+    return content_hash({"dashboard": content, "folderId": folder_id})[:HASH_LENGTH]
+
+class UploadManifest:
+    """Content hash and version of the dashboards last pushed, per Grafana URL and UID"""
+
+    VERSION = 1
+
+    def __init__(self, path: Path = MANIFEST_PATH):
+        self.path = Path(path)
+        self.instances: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        """Load the manifest, starting empty if it is unreadable or from another version"""
+        try:
+            with open(self.path, 'r') as f:
+                state = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        if state.get("version") == self.VERSION:
+            self.instances = state.get("instances", {})
+
+    def entry(self, grafana_url: str, uid: str) -> Dict[str, Any]:
+        """Hash, version and URL last pushed for uid to grafana_url; empty if never pushed"""
+        with self.lock:
+            return dict(self.instances.get(grafana_url, {}).get(uid, {}))
+
+    def record(self, grafana_url: str, uid: str, digest: str, version: Any = None, url: Optional[str] = None):
+        """Remember a successful upload and save the manifest"""
+        with self.lock:
+            self.instances.setdefault(grafana_url, {})[uid] = {"hash": digest, "version": version, "url": url}
+            self._save()
+
+    def forget(self, grafana_url: str, uid: str):
+        """Drop uid so its next upload is never skipped"""
+        with self.lock:
+            if self.instances.get(grafana_url, {}).pop(uid, None) is not None:
+                self._save()
+
+    def _save(self):
+        state = {"version": self.VERSION, "instances": self.instances}
+        write_if_changed(self.path, json.dumps(state, indent=2, sort_keys=True))
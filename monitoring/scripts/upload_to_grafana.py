@@ -3,24 +3,130 @@
 Upload dashboards to Grafana via API
 Handles both comprehensive and production dashboard templates
 """
-import json
-import requests
 import os
 import sys
+import threading
+import time
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, List, Any, Optional
+
+from json_serializer import load_json
+from grafana_client import DEFAULT_POOL_SIZE, GrafanaClient, retry_after_seconds
+from grafana_transport import TRANSPORTS, RequestException
+from bulk_upload import DEFAULT_CONCURRENCY, DEFAULT_RATE, print_upload_report, upload_many
+from library_panels import library_dir_for, load_library_elements, referenced_library_uids
+from upload_manifest import UploadManifest, dashboard_digest
+from upload_journal import UploadJournal, journal_key
+from dashboard_diff import diff_dashboards, fetch_remote_dashboard, print_plan, print_plan_summary
+from dashboard_inventory import DEFAULT_PAGE_SIZE, export_dashboards, iter_dashboards
 
 class GrafanaUploader:
     """Handles dashboard uploads to Grafana via API"""
     
-    def __init__(self, grafana_url: str, api_token: str):
+    def __init__(self, grafana_url: str, api_token: str, client: Optional[GrafanaClient] = None,
+                 pool_size: int = DEFAULT_POOL_SIZE, compress: bool = False,
+                 manifest: Optional[UploadManifest] = None, skip_unchanged: bool = True, transport: str = "auto",
+                 verify_remote: bool = False):
         self.grafana_url = grafana_url.rstrip('/')
         self.api_token = api_token
-        self.headers = {
-            'Authorization': f'Bearer {api_token}',
-            'Content-Type': 'application/json'
+        # Every request goes through one pool of keep-alive connections
+        self.client = client or GrafanaClient(grafana_url, api_token, pool_size=pool_size, compress=compress,
+                                              transport=transport)
+        # Library panels already published by this uploader; concurrent uploads publish them one at a time
+        self.published_library_panels = set()
+        self.library_lock = threading.Lock()
+        # Hash, version and URL of the dashboards last pushed, per Grafana URL
+        self.manifest = manifest or UploadManifest()
+        # Uploading a dashboard Grafana already holds unchanged would only add a version
+        self.skip_unchanged = skip_unchanged
+        # Compare with what Grafana stores instead of trusting the manifest, one GET per dashboard
+        self.verify_remote = verify_remote
+    
+    def remote_state(self, uid: str) -> Optional[Dict[str, Any]]:
+        """Content hash, version and URL of the dashboard Grafana stores under uid, or None if
+        there is none or it cannot be read. The hash covers the stored body, so edits made in the
+        Grafana UI count as changes."""
+        try:
+            response = self.client.get(f"/api/dashboards/uid/{uid}")
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()
+        except RequestException as e:
+            print(f"⚠️ Could not read {uid} from Grafana, uploading it: {e}")
+            return None
+        
+        stored = response.json()
+        meta = stored.get("meta", {})
+        return {
+            "hash": dashboard_digest(stored["dashboard"], meta.get("folderId") or 0),
+            "version": stored["dashboard"].get("version", meta.get("version")),
+            "url": meta.get("url")
         }
     
+    def upload_library_panel(self, element: Dict[str, Any], folder_id: int = 0,
+                             folder_uid: Optional[str] = None) -> Dict[str, Any]:
+        """Create or update a library panel, leaving it alone if its model is unchanged"""
+        elements_path = "/api/library-elements"
+        element_path = f"{elements_path}/{element['uid']}"
+        # Newer Grafana versions address folders by UID
+        folder = {"folderUid": folder_uid} if folder_uid else {"folderId": folder_id}
+        
+        try:
+            response = self.client.get(element_path)
+            if response.status_code == 404:
+                payload = {**element, **folder}
+                response = self.client.post(elements_path, payload)
+                status = "created"
+            else:
+                response.raise_for_status()
+                existing = response.json()["result"]
+                # Grafana adds its own keys to stored models; compare only the ones we send
+                existing_model = existing.get("model", {})
+                if existing.get("name") == element["name"] and \
+                        all(existing_model.get(key) == value for key, value in element["model"].items()):
+                    return {"success": True, "uid": element["uid"], "status": "unchanged",
+                            "version": existing.get("version", 1)}
+                
+                payload = {
+                    "name": element["name"],
+                    "model": element["model"],
+                    "kind": element["kind"],
+                    **folder,
+                    "version": existing["version"]
+                }
+                response = self.client.patch(element_path, payload)
+                status = "updated"
+            
+            response.raise_for_status()
+            result = response.json().get("result", {})
+            return {
+                "success": True,
+                "uid": result.get("uid", element["uid"]),
+                "status": status,
+                "version": result.get("version", 1)
+            }
+            
+        except RequestException as e:
+            return {
+                "success": False,
+                "uid": element["uid"],
+                "error": str(e),
+                "status_code": getattr(e.response, 'status_code', None)
+            }
+    
+    def publish_library_panels(self, dashboard_json: Dict[str, Any], dashboard_path: Path,
+                               folder_id: int = 0) -> List[Dict[str, Any]]:
+        """Publish the library panels a dashboard references, once per uploader"""
+        with self.library_lock:
+            uids = referenced_library_uids(dashboard_json.get("panels", [])) - self.published_library_panels
+            results = []
+            for element in load_library_elements(library_dir_for(dashboard_path), uids):
+                result = self.upload_library_panel(element, folder_id)
+                if result["success"]:
+                    self.published_library_panels.add(element["uid"])
+                results.append(result)
+            return results
+    
     def upload_dashboard(self, dashboard_path: str, folder_id: int = 0, overwrite: bool = True) -> Dict[str, Any]:
         """Upload a dashboard JSON file to Grafana"""
         dashboard_file = Path(dashboard_path)
@@ -28,8 +134,42 @@ class GrafanaUploader:
         if not dashboard_file.exists():
             raise FileNotFoundError(f"Dashboard file not found: {dashboard_path}")
         
-        with open(dashboard_file, 'r') as f:
-            dashboard_json = json.load(f)
+        dashboard_json = load_json(dashboard_file)
+        
+        # Referenced library panels must exist before the dashboard that uses them
+        library_results = self.publish_library_panels(dashboard_json, dashboard_file, folder_id)
+        failed = [result for result in library_results if not result["success"]]
+        if failed:
+            return {
+                "success": False,
+                "error": f"Library panel {failed[0]['uid']} failed: {failed[0]['error']}",
+                "status_code": failed[0].get("status_code")
+            }
+        
+        library_counts = {
+            status: sum(1 for r in library_results if r["status"] == status)
+            for status in ("created", "updated", "unchanged")
+        }
+        
+        uid = dashboard_json.get("uid")
+        digest = dashboard_digest(dashboard_json, folder_id)
+        # The manifest answers without a request; only verification asks Grafana what it stores
+        known = {}
+        if uid and self.skip_unchanged and self.verify_remote:
+            known = self.remote_state(uid) or {}
+            if known.get("hash") == digest:
+                self.manifest.record(self.grafana_url, uid, digest, known["version"], known["url"])
+        elif uid and self.skip_unchanged:
+            known = self.manifest.entry(self.grafana_url, uid)
+        if known.get("hash") == digest:
+            return {
+                "success": True,
+                "dashboard_uid": uid,
+                "dashboard_url": known.get("url") or "unknown",
+                "status": "unchanged",
+                "version": known.get("version") or "-",
+                "library_panels": library_counts
+            }
         
         # Prepare the upload payload
         payload = {
@@ -39,49 +179,63 @@ class GrafanaUploader:
             "message": f"Uploaded via automation - {dashboard_file.name}"
         }
         
-        # Upload to Grafana
-        upload_url = f"{self.grafana_url}/api/dashboards/db"
-        
         try:
-            response = requests.post(upload_url, headers=self.headers, json=payload, timeout=30)
+            # Saving with overwrite stores the same dashboard however often it is sent
+            response = self.client.post("/api/dashboards/db", payload, idempotent=overwrite)
             response.raise_for_status()
             
             result = response.json()
+            if uid:
+                self.manifest.record(self.grafana_url, uid, digest, result.get("version"), result.get("url"))
             return {
                 "success": True,
                 "dashboard_uid": result.get("uid", "unknown"),
                 "dashboard_url": result.get("url", "unknown"),
                 "status": result.get("status", "unknown"),
-                "version": result.get("version", 1)
+                "version": result.get("version", 1),
+                "library_panels": library_counts
             }
             
-        except requests.exceptions.RequestException as e:
+        except RequestException as e:
             return {
                 "success": False,
                 "error": str(e),
-                "status_code": getattr(e.response, 'status_code', None)
+                "status_code": getattr(e.response, 'status_code', None),
+                "retry_after": retry_after_seconds(e.response)
             }
     
-    def list_dashboards(self) -> Dict[str, Any]:
-        """List all dashboards in Grafana"""
-        list_url = f"{self.grafana_url}/api/search?type=dash-db"
+    def plan_dashboard(self, dashboard_path: str) -> Dict[str, Any]:
+        """Structural diff of a dashboard file against the copy stored in Grafana.
         
+        changes is None for a dashboard Grafana does not have yet.
+        """
+        dashboard_json = load_json(dashboard_path)
+        uid, title = dashboard_json.get("uid"), dashboard_json.get("title", "")
         try:
-            response = requests.get(list_url, headers=self.headers, timeout=30)
-            response.raise_for_status()
-            return {"success": True, "dashboards": response.json()}
-        except requests.exceptions.RequestException as e:
+            remote = fetch_remote_dashboard(self.client, uid) if uid else None
+        except RequestException as e:
+            return {"success": False, "uid": uid, "title": title, "error": str(e)}
+        changes = None if remote is None else diff_dashboards(dashboard_json, remote)
+        return {"success": True, "uid": uid, "title": title, "changes": changes}
+    
+    def list_dashboards(self, folder_uids: Optional[List[str]] = None,
+                        tags: Optional[List[str]] = None) -> Dict[str, Any]:
+        """List dashboards in Grafana, optionally only those in folder_uids or carrying tags.
+        
+        Collects every page; iterate dashboard_inventory.iter_dashboards to stream instead.
+        """
+        try:
+            return {"success": True, "dashboards": list(iter_dashboards(self.client, folder_uids, tags))}
+        except RequestException as e:
             return {"success": False, "error": str(e)}
     
     def health_check(self) -> Dict[str, Any]:
         """Check Grafana API connectivity"""
-        health_url = f"{self.grafana_url}/api/health"
-        
         try:
-            response = requests.get(health_url, timeout=10)
+            response = self.client.get("/api/health", timeout=10)
             response.raise_for_status()
             return {"success": True, "status": "healthy", "version": response.json().get("version", "unknown")}
-        except requests.exceptions.RequestException as e:
+        except RequestException as e:
             return {"success": False, "error": str(e)}
 
 def get_grafana_config() -> tuple[str, str]:
@@ -235,67 +389,22 @@ def show_grafana_cli_commands():
     print("     grafana cli plugins install grafana-piechart-panel")
     print()
 
-def upload_with_curl(dashboard_path: str, grafana_url: str, api_token: str, folder_id: int = 0) -> Dict[str, Any]:
-    """Upload dashboard using curl instead of requests library"""
-    import subprocess
-    import tempfile
-    
-    try:
-        dashboard_file = Path(dashboard_path)
-        if not dashboard_file.exists():
-            return {"success": False, "error": f"Dashboard file not found: {dashboard_path}"}
-        
-        with open(dashboard_file, 'r') as f:
-            dashboard_json = json.load(f)
-        
-        # Prepare upload payload
-        payload = {
-            "dashboard": dashboard_json,
-            "folderId": folder_id,
-            "overwrite": True,
-            "message": f"Uploaded via curl - {dashboard_file.name}"
-        }
-        
-        # Write payload to temporary file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as temp_file:
-            json.dump(payload, temp_file, indent=2)
-            temp_path = temp_file.name
-        
-        try:
-            # Execute curl command
-            curl_cmd = [
-                'curl', '-s', '-X', 'POST',
-                '-H', f'Authorization: Bearer {api_token}',
-                '-H', 'Content-Type: application/json',
-                '-d', f'@{temp_path}',
-                f'{grafana_url.rstrip("/")}/api/dashboards/db'
-            ]
-            
-            result = subprocess.run(curl_cmd, capture_output=True, text=True, timeout=30)
-            
-            if result.returncode == 0:
-                response_data = json.loads(result.stdout)
-                return {
-                    "success": True,
-                    "dashboard_uid": response_data.get("uid", "unknown"),
-                    "dashboard_url": response_data.get("url", "unknown"),
-                    "status": response_data.get("status", "unknown"),
-                    "version": response_data.get("version", 1),
-                    "method": "curl"
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": result.stderr or result.stdout,
-                    "method": "curl"
-                }
-                
-        finally:
-            # Clean up temporary file
-            os.unlink(temp_path)
-            
-    except (subprocess.TimeoutExpired, subprocess.SubprocessError, json.JSONDecodeError, FileNotFoundError) as e:
-        return {"success": False, "error": str(e), "method": "curl"}
+def plan_uploads(uploader: GrafanaUploader, paths: List[Path]) -> List[Path]:
+    """Print what uploading paths would change in Grafana; returns the paths that need an upload"""
+    print(f"📋 Comparing {len(paths)} dashboards with Grafana...\n")
+    needed, plans = [], []
+    for path in paths:
+        plan = uploader.plan_dashboard(str(path))
+        if not plan["success"]:
+            print(f"  ❌ {path.name}: could not fetch the remote dashboard: {plan['error']}")
+            needed.append(path)
+            continue
+        print_plan(plan["uid"], plan["title"], plan["changes"])
+        plans.append(plan["changes"])
+        if plan["changes"] != []:
+            needed.append(path)
+    print_plan_summary(plans)
+    return needed
 
 def check_grafana_plugins() -> Dict[str, Any]:
     """Check installed Grafana plugins using Grafana CLI"""
@@ -335,6 +444,12 @@ def get_macos_system_info() -> Dict[str, Any]:
     except Exception as e:
         return {"success": False, "error": str(e)}
 
+def print_library_panel_summary(result: Dict[str, Any]):
+    """One line on the library panels published with a dashboard, if it uses any"""
+    counts = result.get("library_panels", {})
+    if any(counts.values()):
+        print("📚 Library panels: " + ", ".join(f"{count} {status}" for status, count in counts.items()))
+
 def main():
     """Main upload function"""
     import argparse
@@ -348,8 +463,39 @@ def main():
     parser.add_argument("--grafana-url", type=str, help="Grafana URL (overrides config)")
     parser.add_argument("--api-token", type=str, help="Grafana API token (overrides config)")
     parser.add_argument("--store-token", type=str, help="Store API token in Keychain")
-    parser.add_argument("--use-curl", action="store_true", help="Use curl instead of requests library")
+    parser.add_argument("--transport", choices=TRANSPORTS, default="auto",
+                       help="HTTP transport: requests, the stdlib http.client, or auto to use requests when installed")
+    parser.add_argument("--use-curl", action="store_true", help="Deprecated alias for --transport http.client")
     parser.add_argument("--grafana-cli", action="store_true", help="Show Grafana CLI equivalent commands")
+    parser.add_argument("--glob", type=str, default=None,
+                       help="With --all, upload dashboards/ files matching this pattern, e.g. '*-prod.json'")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                       help=f"With --all or --export, requests in flight at once (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                       help=f"With --all, maximum uploads per second, 0 for no limit (default: {DEFAULT_RATE:g})")
+    parser.add_argument("--export", type=str, metavar="DIR",
+                       help="Download dashboards into DIR/<folder uid>/<uid>.json, --concurrency at a time")
+    parser.add_argument("--folder", action="append", metavar="UID",
+                       help="With --list or --export, only dashboards in this folder (repeatable)")
+    parser.add_argument("--tag", action="append",
+                       help="With --list or --export, only dashboards with this tag (repeatable, all must match)")
+    parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE,
+                       help=f"Search results per request for --list and --export (default: {DEFAULT_PAGE_SIZE})")
+    parser.add_argument("--plan", action="store_true",
+                       help="Show what uploading would change in Grafana, per panel, target and variable, and exit")
+    parser.add_argument("--sync", action="store_true",
+                       help="Compare with Grafana first and upload only the dashboards that differ")
+    parser.add_argument("--resume", action="store_true",
+                       help="With --all, upload only what the last interrupted --all run did not finish")
+    parser.add_argument("--force", action="store_true",
+                       help="Upload dashboards even when they match the last upload")
+    parser.add_argument("--verify-remote", action="store_true",
+                       help="Compare with the dashboards Grafana stores instead of the upload manifest, "
+                            "catching edits made in the Grafana UI and dashboards deleted there")
+    parser.add_argument("--pool-size", type=int, default=DEFAULT_POOL_SIZE,
+                       help=f"Keep-alive connections to Grafana (default: {DEFAULT_POOL_SIZE})")
+    parser.add_argument("--compress", action="store_true",
+                       help="Gzip request bodies (Grafana or its proxy must accept Content-Encoding: gzip)")
     
     args = parser.parse_args()
     
@@ -377,7 +523,12 @@ def main():
         print("💡 Set GRAFANA_API_TOKEN environment variable or use --api-token flag")
         sys.exit(1)
     
-    uploader = GrafanaUploader(grafana_url, api_token or "dummy")
+    # --use-curl predates the transports; the stdlib one keeps its no-requests promise without forking curl
+    transport = "http.client" if args.use_curl else args.transport
+    # Every concurrent upload needs its own pooled connection
+    uploader = GrafanaUploader(grafana_url, api_token or "dummy", pool_size=max(args.pool_size, args.concurrency),
+                               compress=args.compress, skip_unchanged=not args.force, transport=transport,
+                               verify_remote=args.verify_remote)
     
     print(f"🔗 Grafana URL: {grafana_url}")
     
@@ -410,14 +561,44 @@ def main():
     # List dashboards
     if args.list:
         print("📋 Listing existing dashboards...")
-        result = uploader.list_dashboards()
-        if result["success"]:
-            dashboards = result["dashboards"]
-            print(f"✅ Found {len(dashboards)} dashboards:")
-            for dash in dashboards:
-                print(f"   • {dash['title']} (UID: {dash['uid']})")
-        else:
-            print(f"❌ Failed to list dashboards: {result['error']}")
+        # Printed page by page as Grafana returns them
+        count = 0
+        try:
+            for dash in iter_dashboards(uploader.client, args.folder, args.tag, page_size=args.page_size):
+                count += 1
+                folder = f" in {dash['folderTitle']}" if dash.get("folderTitle") else ""
+                print(f"   • {dash['title']} (UID: {dash['uid']}){folder}")
+        except RequestException as e:
+            print(f"❌ Failed to list dashboards: {e}")
+            return
+        print(f"✅ Found {count} dashboards")
+        return
+    
+    # Export dashboards
+    if args.export:
+        export_dir = Path(args.export)
+        print(f"📦 Exporting dashboards to {export_dir}, {args.concurrency} at a time...")
+        started = time.perf_counter()
+        exported = written = failed = 0
+        try:
+            for result in export_dashboards(uploader.client, export_dir, args.folder, args.tag,
+                                            concurrency=args.concurrency, page_size=args.page_size):
+                if result["success"]:
+                    exported += 1
+                    written += result["written"]
+                    if exported % 100 == 0:
+                        print(f"   {exported} exported...")
+                else:
+                    failed += 1
+                    print(f"   ❌ {result['uid']} ({result['title']}): {result['error']}")
+        except RequestException as e:
+            print(f"❌ Failed to list dashboards: {e}")
+            sys.exit(1)
+        print(f"✅ Exported {exported} dashboards in {time.perf_counter() - started:.1f}s, "
+              f"{written} changed on disk" + (f", ❌ {failed} failed" if failed else ""))
+        uploader.client.print_stats()
+        if failed:
+            sys.exit(1)
         return
     
     # Upload dashboards
@@ -425,32 +606,61 @@ def main():
     
     if args.all:
         # Upload all generated dashboards
-        dashboard_files = list(dashboards_dir.glob("*.json"))
-        # Filter to only our generated templates (not legacy files)
-        template_files = [f for f in dashboard_files if f.name in ['comprehensive-dev.json', 'production-prod.json']]
+        if args.glob:
+            template_files = sorted(dashboards_dir.glob(args.glob))
+        else:
+            dashboard_files = list(dashboards_dir.glob("*.json"))
+            # Filter to only our generated templates (not legacy files)
+            template_files = [f for f in dashboard_files if f.name in ['comprehensive-dev.json', 'production-prod.json']]
         
         if not template_files:
             print("⚠️ No template dashboards found to upload")
             print("💡 Generate dashboards first: python3 scripts/dashboard_generator.py")
             return
         
-        print(f"📤 Uploading {len(template_files)} template dashboards...")
-        for dashboard_file in template_files:
-            print(f"\n📊 Uploading: {dashboard_file.name}")
-            
-            if args.use_curl:
-                result = upload_with_curl(str(dashboard_file), grafana_url, api_token, folder_id=args.folder_id)
-            else:
-                result = uploader.upload_dashboard(str(dashboard_file), folder_id=args.folder_id)
-            
-            if result["success"]:
-                method = result.get('method', 'requests')
-                print(f"✅ Success! Dashboard UID: {result['dashboard_uid']} (via {method})")
-                print(f"🔗 URL: {grafana_url}{result.get('dashboard_url', '')}")
-            else:
-                print(f"❌ Failed: {result['error']}")
-                if result.get('status_code'):
-                    print(f"   HTTP Status: {result['status_code']}")
+        # Journal every upload so a run that dies halfway can be resumed
+        journal = UploadJournal.named("upload-all")
+        if args.resume:
+            incomplete = journal.resume()
+            template_files = [Path(item["path"]) for item in incomplete.values()
+                              if item.get("grafana_url") == grafana_url]
+            if not template_files:
+                print(f"✅ Nothing to resume: the last --all run to {grafana_url} finished every dashboard")
+                return
+            print(f"🔁 Resuming run {journal.run_id}: {len(template_files)} dashboards left")
+        
+        if args.plan or args.sync:
+            template_files = plan_uploads(uploader, template_files)
+            if args.plan:
+                uploader.client.print_stats()
+                return
+            if not template_files:
+                print("✅ Every dashboard is up to date, nothing to upload")
+                return
+            # The plan compared against Grafana itself, which beats the content hashes
+            uploader.skip_unchanged = False
+            print()
+        
+        dashboards = {path: load_json(path) for path in template_files if path.exists()}
+        digests = {path: dashboard_digest(dashboard, args.folder_id) for path, dashboard in dashboards.items()}
+        if not args.resume:
+            journal.start({journal_key(grafana_url, path.name): {"path": str(path), "grafana_url": grafana_url,
+                                                                 "hash": digests.get(path)}
+                           for path in template_files})
+        
+        def journal_result(path: Path, result: Dict[str, Any]):
+            journal.record(journal_key(grafana_url, path.name), result["success"], digests.get(path),
+                           version=result.get("version"), error=result.get("error"))
+        
+        print(f"📤 Uploading {len(template_files)} dashboards, {args.concurrency} at a time...")
+        started = time.perf_counter()
+        outcomes = upload_many(uploader, template_files, concurrency=args.concurrency,
+                               rate=args.rate or None, folder_id=args.folder_id,
+                               on_outcome=lambda outcome: journal_result(outcome.path, outcome.result))
+        print_upload_report(outcomes, time.perf_counter() - started)
+        uploader.client.print_stats()
+        if not all(outcome.result["success"] for outcome in outcomes):
+            sys.exit(1)
     
     elif args.dashboard:
         # Upload specific dashboard
@@ -458,12 +668,23 @@ def main():
         if not dashboard_path.is_absolute():
             dashboard_path = dashboards_dir / dashboard_path
         
+        if args.plan or args.sync:
+            needed = plan_uploads(uploader, [dashboard_path])
+            if args.plan or not needed:
+                uploader.client.print_stats()
+                return
+            uploader.skip_unchanged = False
+            print()
+        
         print(f"📤 Uploading dashboard: {dashboard_path.name}")
         result = uploader.upload_dashboard(str(dashboard_path), folder_id=args.folder_id)
         
-        if result["success"]:
+        if result["success"] and result["status"] == "unchanged":
+            print(f"✅ Unchanged, not uploaded. Dashboard UID: {result['dashboard_uid']} (version {result['version']})")
+        elif result["success"]:
             print(f"✅ Success! Dashboard UID: {result['dashboard_uid']}")
             print(f"🔗 URL: {grafana_url}{result.get('dashboard_url', '')}")
+            print_library_panel_summary(result)
         else:
             print(f"❌ Failed: {result['error']}")
             if result.get('status_code'):
@@ -471,6 +692,9 @@ def main():
     
     else:
         parser.print_help()
+        return
+    
+    uploader.client.print_stats()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file